@@ -0,0 +1,5 @@
+"""
+Benchmarks of the mobiml loaders, preprocessors, transforms and samplers.
+
+Run ``python -m benchmarks --help`` from the repository root.
+"""
@@ -0,0 +1,88 @@
+import argparse
+import sys
+from os.path import join
+
+from benchmarks import runner
+
+DEFAULT_SCALES = "1e5,1e6"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Time and peak memory of mobiml stages at several data scales",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run benchmarks")
+    run_parser.add_argument(
+        "patterns", nargs="*", help="only run benchmarks whose name contains one"
+    )
+    run_parser.add_argument(
+        "--scales",
+        default=DEFAULT_SCALES,
+        help=f"comma-separated numbers of rows (default: {DEFAULT_SCALES})",
+    )
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument(
+        "--no-memory", action="store_true", help="skip the traced memory run"
+    )
+    run_parser.add_argument(
+        "--output", help="results JSON (default: .benchmarks/<commit>.json)"
+    )
+
+    list_parser = commands.add_parser("list", help="list benchmarks")
+    list_parser.add_argument("patterns", nargs="*")
+
+    compare_parser = commands.add_parser(
+        "compare", help="compare two results, exit 1 on regressions"
+    )
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=1.2, help="max. new/base ratio"
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "list":
+        for bench in runner.select(args.patterns):
+            max_rows = f" (max. {bench.max_rows:,} rows)" if bench.max_rows else ""
+            print(f"{bench.name}{max_rows}")
+        return 0
+
+    if args.command == "compare":
+        rows = runner.compare(
+            runner.load(args.base), runner.load(args.new), args.threshold
+        )
+        for row in rows:
+            ratios = [
+                "     n/a" if ratio is None else f"{ratio:7.2f}x"
+                for ratio in (row["time_ratio"], row["memory_ratio"])
+            ]
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['name']:<45} {row['rows']:>11,} {' '.join(ratios)}{flag}")
+        return 1 if any(row["regression"] for row in rows) else 0
+
+    import os
+    import warnings
+
+    from mobiml import instrumentation
+
+    # measure the stages, not their progress output
+    instrumentation.disable()
+    warnings.simplefilter("ignore")
+    os.environ.setdefault("TQDM_DISABLE", "1")
+    scales = [int(float(scale)) for scale in args.scales.split(",")]
+    results = runner.run(
+        runner.select(args.patterns), scales, args.repeat, not args.no_memory
+    )
+    output = args.output or join(
+        ".benchmarks", f"{results['environment']['commit']}.json"
+    )
+    runner.save(results, output)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+from mobiml.datasets import (
+    AISDK,
+    BrestAIS,
+    CopenhagenCyclists,
+    Dataset,
+    DelhiAirPollution,
+    MovebankGulls,
+    PortoTaxis,
+    PreprocessedBrestAIS,
+    SyntheticAIS,
+)
+
+from benchmarks.data import ais_dataset, sample_file, stored_file
+from benchmarks.runner import benchmark
+
+LOADERS = {
+    "aisdk": (AISDK, "test_aisdk_20180208_sample.csv"),
+    "brest_ais": (BrestAIS, "test_nari_dynamic.csv"),
+    "preprocessed_brest_ais": (
+        PreprocessedBrestAIS,
+        "test_nautilus_trajectories_preprocessed_100.csv",
+    ),
+    "porto_taxis": (PortoTaxis, "test_train.csv"),
+    "copenhagen_cyclists": (CopenhagenCyclists, "test_bike.csv"),
+    "movebank_gulls": (MovebankGulls, "test_gulls.csv"),
+    "delhi_air_pollution": (DelhiAirPollution, "test_2021-01-30_all.csv"),
+}
+
+
+def _register_loader(name, loader, sample, **kwargs):
+    def setup(n_rows):
+        return (sample_file(sample, n_rows, loader),)
+
+    def load(path):
+        loader(path, **kwargs)
+
+    load.__name__ = name
+    benchmark(setup)(load)
+
+
+for _name, (_loader, _sample) in LOADERS.items():
+    _register_loader(f"load_{_name}", _loader, _sample)
+_register_loader("load_aisdk_arrow", AISDK, LOADERS["aisdk"][1], engine="arrow")
+
+
+@benchmark(lambda n: (stored_file(n, ".parquet"),))
+def load_parquet(path):
+    Dataset(path)
+
+
+@benchmark(lambda n: (stored_file(n, ".feather"),))
+def load_feather(path):
+    Dataset(path)
+
+
+@benchmark(lambda n: (ais_dataset(n),))
+def to_gdf(data):
+    data.to_gdf()
+
+
+@benchmark(lambda n: (ais_dataset(n),), max_rows=1_000_000)
+def to_trajs(data):
+    data.to_trajs()
+
+
+@benchmark(lambda n: (ais_dataset(n),))
+def stats(data):
+    data.stats
+
+
+@benchmark(lambda n: (ais_dataset(n),))
+def compact(data):
+    data.compact()
+
+
+@benchmark(lambda n: (ais_dataset(n),))
+def sort_trajectories(data):
+    data.sort_trajectories()
+
+
+@benchmark(lambda n: (ais_dataset(n),))
+def query(data):
+    data.query(bbox=(10.0, 55.0, 11.0, 56.0))
+
+
+@benchmark(lambda n: (n,))
+def synthetic_ais(n_rows):
+    SyntheticAIS().frame(n_rows)
@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+from mobiml.preprocessing import (
+    AISValidator,
+    Normalizer,
+    StationaryClientExtractor,
+    TrajectoryDownsampler,
+    TrajectoryEnricher,
+    TrajectoryFilter,
+    TrajectorySplitter,
+)
+
+from benchmarks.data import ais_dataset, clients_gdf
+from benchmarks.runner import benchmark
+
+
+def data_setup(n_rows):
+    return (ais_dataset(n_rows),)
+
+
+@benchmark(data_setup)
+def downsampler_subsample(data):
+    TrajectoryDownsampler(data).subsample(min_dt_sec=60)
+
+
+@benchmark(data_setup)
+def filter_min_pts(data):
+    TrajectoryFilter(data).filter_min_pts(min_pts=100)
+
+
+@benchmark(data_setup)
+def filter_speed(data):
+    TrajectoryFilter(data).filter_speed(min_speed=1, max_speed=20)
+
+
+@benchmark(data_setup)
+def combined_filter(data):
+    (
+        TrajectoryFilter(data)
+        .speed(1, 20)
+        .bbox((9.0, 55.0, 12.0, 57.0))
+        .min_pts(100)
+        .min_duration(1800)
+        .min_length(1000)
+        .apply()
+    )
+
+
+@benchmark(data_setup)
+def enricher_add_speed(data):
+    TrajectoryEnricher(data).add_speed(overwrite=True, engine="native")
+
+
+@benchmark(data_setup)
+def enricher_add_features(data):
+    TrajectoryEnricher(data).add_features(
+        speed=True,
+        direction=True,
+        acceleration=True,
+        overwrite=True,
+        n_threads=1,
+        engine="native",
+    )
+
+
+@benchmark(data_setup, max_rows=1_000_000)
+def enricher_add_speed_movingpandas(data):
+    TrajectoryEnricher(data).add_speed(overwrite=True, engine="movingpandas")
+
+
+@benchmark(data_setup)
+def splitter_observation_gap(data):
+    TrajectorySplitter(data).split(
+        observation_gap=timedelta(minutes=15), engine="native"
+    )
+
+
+@benchmark(data_setup)
+def splitter_temporal(data):
+    TrajectorySplitter(data).split(temporal_split_mode="day", engine="native")
+
+
+@benchmark(data_setup)
+def splitter_max_duration_distance(data):
+    TrajectorySplitter(data).split(max_duration=timedelta(hours=1), max_distance=10_000)
+
+
+@benchmark(data_setup, max_rows=1_000_000)
+def splitter_observation_gap_movingpandas(data):
+    TrajectorySplitter(data).split(
+        observation_gap=timedelta(minutes=15), engine="movingpandas"
+    )
+
+
+@benchmark(data_setup)
+def normalizer(data):
+    Normalizer(data).normalize()
+
+
+@benchmark(data_setup)
+def ais_validator(data):
+    AISValidator(data).validate(min_dt_sec=1)
+
+
+@benchmark(lambda n: (ais_dataset(n), clients_gdf()), max_rows=10_000_000)
+def stationary_client_extractor(data, clients):
+    StationaryClientExtractor(data).extract(clients)
+
+
+def mobile_client_setup(n_rows):
+    data = ais_dataset(n_rows)
+    clients = data.copy()
+    clients.df = data.df[data.df["traj_id"] == 0]
+    return data, clients
+
+
+@benchmark(mobile_client_setup, max_rows=100_000, repeat=1)
+def mobile_client_extractor(data, clients):
+    from mobiml.preprocessing import MobileClientExtractor
+
+    MobileClientExtractor(data).extract(clients, antenna_radius_meters=5000)
@@ -0,0 +1,29 @@
+from mobiml.samplers import MoverSplitter, RandomTrajSampler, TemporalSplitter
+
+from benchmarks.data import ais_dataset, ais_gdf
+from benchmarks.runner import benchmark
+
+
+def data_setup(n_rows):
+    return (ais_dataset(n_rows),)
+
+
+@benchmark(data_setup)
+def random_sampler(data):
+    RandomTrajSampler(data).sample(n_cells=10, percent_sample=0.5, random_state=1)
+
+
+@benchmark(data_setup)
+def temporal_split(data):
+    TemporalSplitter(data).split(dev_size=0.2, test_size=0.1)
+
+
+@benchmark(data_setup)
+def temporal_split_at_timestamp(data):
+    TemporalSplitter(data).split_at_timestamp(timestamp=data.df["timestamp"].median())
+
+
+@benchmark(lambda n: (ais_gdf(n),))
+def mover_splitter(gdf):
+    splitter = MoverSplitter(gdf, mover_id="mover_id", mover_class="ship_type")
+    splitter.split(0.3, ["geometry", "traj_id", "mover_id"], "ship_type")
@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from mobiml.samplers import TemporalSplitter
+from mobiml.transforms import (
+    DeltaDatasetCreator,
+    ODAggregator,
+    TrajectoryAggregator,
+    TrajectoryCreator,
+)
+
+from benchmarks.data import ais_dataset, ais_gdf
+from benchmarks.runner import benchmark
+
+
+@benchmark(lambda n: (ais_gdf(n),), max_rows=1_000_000)
+def trajectory_creator(gdf):
+    TrajectoryCreator(gdf).get_trajs(gap_duration=timedelta(minutes=15))
+
+
+def split_setup(n_rows):
+    return (TemporalSplitter(ais_dataset(n_rows)).split(dev_size=0.25, test_size=0.25),)
+
+
+@benchmark(split_setup, max_rows=1_000_000)
+def delta_dataset(data):
+    DeltaDatasetCreator(data).get_delta_dataset("split", njobs=1)
+
+
+@benchmark(split_setup, max_rows=1_000_000)
+def windowed_dataset(data):
+    DeltaDatasetCreator(data).get_windowed_dataset("split", njobs=1)
+
+
+@benchmark(lambda n: (ais_dataset(n),), max_rows=1_000_000)
+def od_aggregator(data):
+    ODAggregator(data).get_od_for_h3(7, "1D")
+
+
+def aggregator_setup(n_rows):
+    gdf = ais_gdf(n_rows)
+    gdf["client"] = gdf["mover_id"] % 10
+    vessels = gdf.groupby("mover_id")[["ship_type"]].first()
+    return TrajectoryCreator(gdf, min_length=0).get_trajs(), vessels
+
+
+@benchmark(aggregator_setup, max_rows=1_000_000)
+def trajectory_aggregator(trajs, vessels):
+    TrajectoryAggregator(trajs, vessels).aggregate_trajs(h3_resolution=7)
@@ -0,0 +1,97 @@
+"""
+Benchmark inputs at a given number of rows.
+
+Frames are generated in memory and memoized per process. Loader inputs
+are written once to ``MOBIML_BENCHMARK_DATA`` (default: a directory in
+the system temp directory) by tiling the sample files in ``tests/data``,
+so the files have exactly the raw layout the loaders expect.
+"""
+
+import math
+import os
+import tempfile
+from functools import lru_cache
+from os.path import dirname, exists, join
+
+import numpy as np
+import pandas as pd
+
+from mobiml.datasets import Dataset, SyntheticAIS
+
+SAMPLES_DIR = join(dirname(dirname(os.path.abspath(__file__))), "tests", "data")
+DATA_DIR = os.environ.get(
+    "MOBIML_BENCHMARK_DATA", join(tempfile.gettempdir(), "mobiml-benchmarks")
+)
+BBOX = SyntheticAIS.bbox
+
+
+@lru_cache(maxsize=4)
+def ais_frame(n_rows, points_per_traj=500, seed=0) -> pd.DataFrame:
+    """
+    AIS-like points: two trajectories per vessel, 5-15 s reporting intervals
+    with occasional gaps, sorted by trajectory and timestamp.
+    """
+    return SyntheticAIS(seed=seed, points_per_traj=points_per_traj).frame(n_rows)
+
+
+def ais_dataset(n_rows) -> Dataset:
+    """Fresh Dataset sharing the memoized frame's column buffers"""
+    return Dataset(ais_frame(n_rows).copy(deep=False), crs=4326)
+
+
+def ais_gdf(n_rows):
+    return ais_dataset(n_rows).to_gdf()
+
+
+def clients_gdf(n_clients=20, radius=0.1, seed=1):
+    """Circular stationary client areas (e.g. antennas) within the AIS bbox"""
+    import geopandas as gpd
+
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(BBOX[0], BBOX[2], n_clients)
+    y = rng.uniform(BBOX[1], BBOX[3], n_clients)
+    return gpd.GeoDataFrame(
+        {"client": np.arange(n_clients)},
+        geometry=gpd.points_from_xy(x, y).buffer(radius),
+        crs=4326,
+    )
+
+
+def sample_file(name, n_rows, loader) -> str:
+    """
+    Path of a CSV with about ``n_rows`` points, tiled from a sample file.
+
+    ``loader`` is the Dataset class reading the file, used once to find the
+    number of points per CSV line of the sample.
+    """
+    path = join(DATA_DIR, f"{os.path.splitext(name)[0]}-{n_rows}.csv")
+    if exists(path):
+        return path
+    source = join(SAMPLES_DIR, name)
+    with open(source) as f:
+        header, *lines = [line.rstrip("\n") + "\n" for line in f]
+    points_per_line = len(loader(source).df) / len(lines)
+    n_lines = max(1, math.ceil(n_rows / points_per_line))
+    os.makedirs(DATA_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(header)
+        block = "".join(lines)
+        for _ in range(n_lines // len(lines)):
+            f.write(block)
+        f.write("".join(lines[: n_lines % len(lines)]))
+    os.replace(tmp_path, path)
+    return path
+
+
+def stored_file(n_rows, ext) -> str:
+    """Path of the AIS frame stored as Parquet or Feather"""
+    path = join(DATA_DIR, f"ais-{n_rows}{ext}")
+    if not exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        data = ais_dataset(n_rows)
+        if ext == ".parquet":
+            data.to_parquet(path)
+        else:
+            data.to_feather(path)
+    return path
@@ -0,0 +1,193 @@
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+BENCHMARKS = {}
+
+
+class Benchmark:
+    """
+    A registered benchmark.
+
+    ``setup(n_rows)`` builds the arguments of ``func`` and is not timed. It
+    is called again before every repeat, so benchmarks of methods that
+    modify their input always start from the same state.
+    """
+
+    def __init__(self, name, func, setup, max_rows=None, repeat=None) -> None:
+        self.name = name
+        self.func = func
+        self.setup = setup
+        self.max_rows = max_rows
+        self.repeat = repeat
+
+    def __repr__(self) -> str:
+        return f"Benchmark({self.name})"
+
+
+def benchmark(setup, max_rows=None, repeat=None, name=None):
+    """
+    Register a benchmark function.
+
+    Parameters
+    ----------
+    setup : callable
+        ``setup(n_rows)`` returns the tuple of arguments of the benchmark
+    max_rows : int
+        Larger scales are skipped, e.g. for per-trajectory Python code
+    repeat : int
+        Number of timed runs, overrides the runner default
+    name : str
+        Default: ``<module without bench_>.<function name>``
+    """
+
+    def decorator(func):
+        module = func.__module__.rsplit(".", 1)[-1].removeprefix("bench_")
+        bench_name = name or f"{module}.{func.__name__}"
+        BENCHMARKS[bench_name] = Benchmark(bench_name, func, setup, max_rows, repeat)
+        return func
+
+    return decorator
+
+
+def select(patterns=None) -> list:
+    """Registered benchmarks whose name contains any of the patterns"""
+    from benchmarks import (  # noqa F401
+        bench_datasets,
+        bench_preprocessing,
+        bench_samplers,
+        bench_transforms,
+    )
+
+    return [
+        bench
+        for name, bench in sorted(BENCHMARKS.items())
+        if not patterns or any(pattern in name for pattern in patterns)
+    ]
+
+
+def run_benchmark(bench, n_rows, repeat=3, memory=True) -> dict:
+    """Time ``bench`` at ``n_rows`` rows and measure its peak traced memory"""
+    result = {"name": bench.name, "rows": n_rows, "status": "ok"}
+    if bench.max_rows is not None and n_rows > bench.max_rows:
+        result["status"] = "skipped"
+        return result
+    times = []
+    try:
+        for _ in range(bench.repeat or repeat):
+            args = bench.setup(n_rows)
+            gc.collect()
+            start = time.perf_counter()
+            bench.func(*args)
+            times.append(time.perf_counter() - start)
+        if memory:
+            args = bench.setup(n_rows)
+            gc.collect()
+            tracemalloc.start()
+            try:
+                bench.func(*args)
+                result["peak_memory"] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    except Exception as error:  # report and continue with the other benchmarks
+        result["status"] = f"error: {type(error).__name__}: {error}"
+        return result
+    result["time"] = min(times)
+    result["time_median"] = statistics.median(times)
+    result["repeat"] = len(times)
+    result["rows_per_second"] = n_rows / result["time"] if result["time"] else None
+    return result
+
+
+def run(benchmarks, scales, repeat=3, memory=True, report=print) -> dict:
+    results = []
+    for bench in benchmarks:
+        for n_rows in scales:
+            result = run_benchmark(bench, n_rows, repeat, memory)
+            results.append(result)
+            report(format_result(result))
+    return {"environment": environment(), "results": results}
+
+
+def environment() -> dict:
+    import numpy
+    import pandas
+
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD") or "unknown",
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+    }
+
+
+def format_result(result) -> str:
+    name = f"{result['name']:<45} {result['rows']:>11,}"
+    if result["status"] != "ok":
+        return f"{name}  {result['status']}"
+    memory = result.get("peak_memory")
+    memory = f"{memory / 2**20:9.1f} MiB" if memory is not None else ""
+    return f"{name} {result['time']:10.4f} s {memory}"
+
+
+def compare(base, new, threshold=1.2) -> list:
+    """
+    Time and memory ratios new/base of the benchmarks run in both results.
+
+    Returns the rows of the comparison, with ``regression`` set where the
+    time or memory ratio exceeds ``threshold``.
+    """
+    base_results = {(r["name"], r["rows"]): r for r in base["results"]}
+    rows = []
+    for result in new["results"]:
+        old = base_results.get((result["name"], result["rows"]))
+        if old is None or result["status"] != "ok" or old["status"] != "ok":
+            continue
+        time_ratio = result["time"] / old["time"] if old["time"] else None
+        memory_ratio = None
+        if result.get("peak_memory") and old.get("peak_memory"):
+            memory_ratio = result["peak_memory"] / old["peak_memory"]
+        rows.append(
+            {
+                "name": result["name"],
+                "rows": result["rows"],
+                "time_ratio": time_ratio,
+                "memory_ratio": memory_ratio,
+                "regression": any(
+                    ratio is not None and ratio > threshold
+                    for ratio in (time_ratio, memory_ratio)
+                ),
+            }
+        )
+    return rows
+
+
+def load(path) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(results, path) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=1)
+
+
+def _git(*args) -> str:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
@@ -0,0 +1,33 @@
+import importlib
+
+
+def attach(package, attributes):
+    """
+    Lazily import the public names of a subpackage (PEP 562).
+
+    ``attributes`` maps each name to the submodule that defines it. The
+    submodule, and the optional dependencies it needs, are only imported
+    when the name is first accessed, so ``import mobiml.transforms`` does
+    not import h3 or movingpandas.
+
+    Returns
+    -------
+    (callable, callable, list)
+        ``__getattr__``, ``__dir__`` and ``__all__`` for the package module
+
+    Examples
+    --------
+    >>> __getattr__, __dir__, __all__ = attach(__name__, {"Foo": ".foo"})
+    """
+
+    def __getattr__(name):
+        if name not in attributes:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(attributes[name], package), name)
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    def __dir__():
+        return sorted(attributes)
+
+    return __getattr__, __dir__, list(attributes)
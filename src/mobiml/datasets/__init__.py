@@ -9,6 +9,15 @@ from .utils import (  # noqa F401
     unixtime_to_datetime,
 )
 from ._dataset import Dataset  # noqa F401
+from ._stats import DatasetStatistics  # noqa F401
+from ._index import PointIndex, TrajectoryIndex  # noqa F401
+from ._partitioned import PartitionedDataset  # noqa F401
+from .synthetic import (  # noqa F401
+    SyntheticTraffic,
+    SyntheticAIS,
+    SyntheticTaxis,
+    SyntheticCyclists,
+)
 from .aisdk import AISDK, PreprocessedAISDK, SHIPTYPE  # noqa F401
 from .brest_ais import BrestAIS, PreprocessedBrestAIS  # noqa F401
 from .copenhagen_cyclists import CopenhagenCyclists  # noqa F401
@@ -0,0 +1,211 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+from functools import lru_cache, wraps
+from glob import glob
+from os.path import abspath, dirname, exists, getsize, isdir, join
+
+from mobiml.datasets.utils import expand_path, is_geodataframe
+
+DEFAULT_CACHE_MAX_BYTES = 20 * 2**30
+# bump when the layout of cache entries changes
+CACHE_SCHEMA_VERSION = 1
+
+
+class IngestCache:
+    """
+    Content-addressed on-disk cache of normalized dataset frames.
+
+    Entries are keyed by the content hash of the source files, the dataset
+    class, the source code of the dataset modules (parsers and parsing
+    helpers) and its constructor arguments, so a parser change invalidates
+    old entries. Frames are stored as uncompressed Arrow IPC files and
+    reopened memory-mapped, so numeric columns are zero-copy, read-only
+    views of the cache file unless ``writable=True`` is passed to ``load``.
+    The least recently used entries are evicted once the cache exceeds
+    ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_CACHE_MAX_BYTES) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, cls, path, args, kwargs) -> str:
+        from mobiml import __version__
+
+        content = {
+            "class": f"{cls.__module__}.{cls.__qualname__}",
+            "version": __version__,
+            "schema": CACHE_SCHEMA_VERSION,
+            "parser": _parser_digest(cls),
+            "files": [self.file_digest(file) for file in _list_files(path)],
+            "args": repr(args),
+            "kwargs": repr(sorted(kwargs.items())),
+        }
+        return hashlib.sha256(json.dumps(content).encode()).hexdigest()
+
+    def file_digest(self, path) -> str:
+        """SHA-256 of the file content, memoized by path, size and mtime"""
+        stat = os.stat(path)
+        digests_path = join(self.cache_dir, "digests.json")
+        try:
+            with open(digests_path) as f:
+                digests = json.load(f)
+        except (OSError, ValueError):
+            digests = {}
+        file_id = [stat.st_size, stat.st_mtime_ns]
+        entry = digests.get(os.path.abspath(path))
+        if entry and entry[:2] == file_id:
+            return entry[2]
+
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(2**20), b""):
+                sha.update(block)
+        digests[os.path.abspath(path)] = file_id + [sha.hexdigest()]
+        _atomic_write(digests_path, json.dumps(digests).encode())
+        return sha.hexdigest()
+
+    def load(self, dataset, key, writable=False) -> bool:
+        """
+        Restore a cached dataset into ``dataset``, return False on cache miss.
+
+        Columns are read-only views of the memory-mapped cache file; with
+        ``writable=True``, they are copied into regular, writable arrays.
+        """
+        data_path, state_path = self._paths(key)
+        if not (os.path.exists(data_path) and os.path.exists(state_path)):
+            return False
+        with open(state_path, "rb") as f:
+            state = pickle.load(f)
+        if state.pop("_geo", False):
+            import geopandas as gpd
+
+            df = gpd.read_feather(data_path)
+        else:
+            import pyarrow as pa
+
+            table = pa.ipc.open_file(pa.memory_map(data_path)).read_all()
+            # consolidating into blocks copies the columns
+            df = table.to_pandas(split_blocks=not writable)
+        dataset.__dict__.update(state)
+        dataset.df = df
+        for path in (data_path, state_path):
+            os.utime(path)
+        return True
+
+    def store(self, dataset, key) -> None:
+        data_path, state_path = self._paths(key)
+        state = dataset.__getstate__()
+        state.pop("_df")
+        state["_geo"] = is_geodataframe(dataset.df)
+        tmp_path = f"{data_path}.{os.getpid()}.tmp"
+        if state["_geo"]:
+            dataset.df.to_feather(tmp_path, compression="uncompressed")
+        else:
+            import pyarrow as pa
+
+            table = pa.Table.from_pandas(dataset.df)
+            with pa.ipc.new_file(tmp_path, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, data_path)
+        _atomic_write(state_path, pickle.dumps(state))
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits max_bytes"""
+        if self.max_bytes is None:
+            return
+        entries = []
+        for data_path in glob(join(self.cache_dir, "*.arrow")):
+            state_path = data_path[: -len(".arrow")] + ".pickle"
+            size = getsize(data_path)
+            if os.path.exists(state_path):
+                size += getsize(state_path)
+            entries.append((os.stat(data_path).st_mtime_ns, size, data_path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, data_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for path in (data_path, data_path[: -len(".arrow")] + ".pickle"):
+                if os.path.exists(path):
+                    os.remove(path)
+            total -= size
+
+    def _paths(self, key):
+        path = join(self.cache_dir, key)
+        return f"{path}.arrow", f"{path}.pickle"
+
+
+def cached_init(init):
+    """
+    Make a Dataset ``__init__`` use the ingest cache if ``cache_dir`` is given.
+
+    The cache is only used when the data is loaded from a path. Nested
+    ``super().__init__`` calls do not see ``cache_dir`` and run uncached.
+    """
+
+    @wraps(init)
+    def wrapper(self, data, *args, **kwargs):
+        cache_dir = kwargs.pop("cache_dir", None)
+        max_bytes = kwargs.pop("cache_max_bytes", DEFAULT_CACHE_MAX_BYTES)
+        writable = kwargs.pop("cache_writable", False)
+        if cache_dir is None or not _is_source_path(data):
+            return init(self, data, *args, **kwargs)
+        cache = IngestCache(cache_dir, max_bytes)
+        key = cache.key(type(self), data, args, kwargs)
+        if cache.load(self, key, writable):
+            return
+        init(self, data, *args, **kwargs)
+        cache.store(self, key)
+
+    return wrapper
+
+
+@lru_cache(maxsize=None)
+def _parser_digest(cls) -> str:
+    """
+    SHA-256 of the source files of the mobiml classes in the MRO of cls and
+    of the modules of ``mobiml.datasets``, which hold the parsing helpers.
+    """
+    source_files = set(glob(join(dirname(abspath(__file__)), "*.py")))
+    for base in cls.__mro__:
+        if base.__module__.startswith("mobiml"):
+            try:
+                source_files.add(abspath(inspect.getsourcefile(base)))
+            except TypeError:
+                pass
+    sha = hashlib.sha256()
+    for source_file in sorted(source_files):
+        with open(source_file, "rb") as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+def _is_source_path(data) -> bool:
+    if not isinstance(data, str):
+        return False
+    files = _list_files(data)
+    return len(files) > 0 and all(exists(file) for file in files)
+
+
+def _list_files(path) -> list:
+    """List the files of a path, glob pattern or directory"""
+    files = []
+    for file_path in expand_path(path):
+        if isdir(file_path):
+            for root, _, names in sorted(os.walk(file_path)):
+                files.extend(join(root, name) for name in sorted(names))
+        else:
+            files.append(file_path)
+    return files
+
+
+def _atomic_write(path, content) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
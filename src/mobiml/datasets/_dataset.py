@@ -1,21 +1,34 @@
-from os.path import exists, splitext
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from os.path import exists, isdir, splitext
 
+import numpy as np
 import pandas as pd
-import geopandas as gpd
-from zipfile import ZipFile
 from copy import deepcopy
-from datetime import datetime
 
+from mobiml.datasets._cache import cached_init
+from mobiml.datasets._index import INDEX_SUFFIX, PointIndex, TrajectoryIndex
+from mobiml.datasets._parquet import read_parquet, write_parquet
+from mobiml.datasets._stats import STATS_SUFFIX, DatasetStatistics
+from mobiml.instrumentation import instrument
 from mobiml.datasets.utils import (
     MOVER_ID,
     TIMESTAMP,
     TRAJ_ID,
     COORDS,
     ROWNUM,
-    get_x_from_xy,
-    get_y_from_xy,
-    get_point_from_x_y,
-    get_point_from_xy,
+    compact_series,
+    concat_frames,
+    get_x_y_arrays_from_xy,
+    is_geodataframe,
+    list_lengths,
+    parse_number_lists,
+    expand_path,
+    list_csv_parts,
+    open_csv_part,
+    read_csv_arrow,
 )
 
 
@@ -28,14 +41,48 @@ class Dataset:
     timestamp = None
     speed = None
     crs = None
+    coord_dtype = np.float64
+    n_jobs = 1
+    csv_engine = "pandas"
+    csv_schema = None
+    csv_time_format = None
     running_number_added = False
+    compacted = False
+    dirty = frozenset()
+    _version = 0
 
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if "__init__" in cls.__dict__:
+            cls.__init__ = cached_init(cls.__init__)
+
+    @cached_init
     def __init__(self, data, *args, **kwargs) -> None:
+        """
+        Create a Dataset from a DataFrame or load it from a path.
+
+        Loading from a path accepts ``cache_dir`` to cache the normalized
+        frame on disk, keyed by the content of the source files, the parser
+        code and the constructor arguments. Repeated loads reopen the cached
+        Arrow file memory-mapped instead of parsing the source again; numeric
+        columns of a cached frame are then read-only, pass
+        ``cache_writable=True`` to copy them into writable arrays. The cache is
+        limited to ``cache_max_bytes`` (default 20 GiB), evicting the least
+        recently used entries.
+
+        With ``compact=True``, the frame is converted to compact dtypes after
+        loading, see ``compact``. With ``sort=True``, rows are sorted by
+        mover, trajectory and timestamp, see ``sort_trajectories``.
+        """
         self.name = kwargs.pop("name", self.name)
         self.timestamp = kwargs.pop("timestamp", self.timestamp)
         self.traj_id = kwargs.pop("traj_id", self.traj_id)
         self.mover_id = kwargs.pop("mover_id", self.mover_id)
         self.crs = kwargs.pop("crs", self.crs)
+        self.coord_dtype = np.dtype(kwargs.pop("coord_dtype", self.coord_dtype))
+        self.n_jobs = kwargs.pop("n_jobs", self.n_jobs)
+        compact = kwargs.pop("compact", False)
+        sort = kwargs.pop("sort", False)
 
         if type(data) == str:
             df = self.load_from_path(data, *args, **kwargs)
@@ -51,8 +98,85 @@ class Dataset:
                 df.rename(columns={self.mover_id: MOVER_ID}, inplace=True)
 
         self.df = df
+        self.set_coordinate_columns()
+        stored = self.__dict__.pop("_stored", {})
+        for name, value in stored.items():
+            if value.n_rows == len(self.df):
+                self._cached(name, lambda: value)
+        if compact:
+            self.compact()
+        if sort:
+            self.sort_trajectories()
+
+    @property
+    def df(self):
+        return self._df
+
+    @df.setter
+    def df(self, df):
+        self._df = df
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """
+        Discard the cached derived representations of ``df``.
+
+        Assigning ``df`` and adding, removing or filtering columns and rows
+        are detected automatically. Call this after modifying values of
+        ``df`` in place (e.g. ``data.df.loc[mask, "speed"] = 0``).
+        """
+        self._version += 1
+        self.__dict__.pop("_derived", None)
 
+    def _cached(self, name, build):
+        """
+        Return the cached result of ``build`` for the current state of ``df``.
+        """
+        state = self._cache_state()
+        derived = self.__dict__.setdefault("_derived", {})
+        if name in derived and derived[name][0] == state:
+            return derived[name][1]
+        value = build()
+        derived[name] = (state, value)
+        return value
+
+    def _cache_state(self) -> tuple:
+        df = self._df
+        return (self._version, id(df), df.shape, tuple(df.columns), self.crs)
+
+    def _peek_cached(self, name):
+        """Cached value for the current state of ``df`` or None, not building it"""
+        state = self._cache_state()
+        entry = self.__dict__.get("_derived", {}).get(name)
+        return entry[1] if entry is not None and entry[0] == state else None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_derived", None)
+        return state
+
+    @instrument()
     def load_from_path(self, path, *args, **kwargs):
+        """
+        Load the data from a file path or glob pattern.
+
+        CSVs are read with pandas by default. With ``engine="arrow"``, they are
+        read with the multithreaded pyarrow CSV reader, using the dataset's
+        ``csv_schema`` and ``csv_time_format`` to parse the columns into
+        compact types during the read.
+        """
+        if kwargs.get("engine") == "arrow":
+            self.csv_engine = kwargs.pop("engine")
+        paths = expand_path(path)
+        # a pattern without matches falls through to the missing file error
+        if len(paths) > 1 or (paths and paths[0] != path):
+            if all(splitext(p)[1] in [".csv", ".zip"] for p in paths):
+                return self.load_df_from_csv_parts(list_csv_parts(paths), **kwargs)
+            return concat_frames(
+                [self.load_from_path(p, *args, **kwargs) for p in paths],
+                ignore_index=True,
+            )
+
         if not exists(path):
             msg = (
                 f"Error reading from {path}: \r\n"
@@ -70,73 +194,481 @@ class Dataset:
             if nrows:
                 df = df.head(nrows)
         elif ext == ".csv":
-            df = pd.read_csv(path, *args, **kwargs)
+            df = self.read_csv(path, *args, **kwargs)
         elif ext == ".feather":
+            import geopandas as gpd
+
             df = gpd.read_feather(path, *args, **kwargs)
+            if not args and not kwargs:
+                self._stored = {}
+                if exists(path + STATS_SUFFIX):
+                    stats = DatasetStatistics.read_json(path + STATS_SUFFIX)
+                    self._stored["stats"] = stats
+                if exists(path + INDEX_SUFFIX):
+                    self._stored["point_index"] = PointIndex.load(path + INDEX_SUFFIX)
+        elif ext == ".parquet" or isdir(path):
+            df, meta = read_parquet(path, *args, **kwargs)
+            self.name = self.name or meta.get("name")
+            self.crs = self.crs or meta.get("crs")
+            if not args and not kwargs and "stats" in meta:
+                self._stored = {"stats": DatasetStatistics.from_dict(meta["stats"])}
         elif ext == ".zip":
             df = self.load_df_from_zip_archive(path)
         else:
+            import geopandas as gpd
+
             df = gpd.read_file(path, *args, **kwargs)
         return df
 
-    def copy(self):
-        return deepcopy(self)
+    def copy(self, deep=False):
+        """
+        Copy the dataset.
+
+        By default, the copy shares the column buffers of ``df`` with the
+        original, which takes O(columns) time and memory. Assigning ``df`` or
+        adding, replacing or dropping columns on either side does not affect
+        the other. Values modified in place (e.g. through ``df.loc``) are
+        visible to both unless pandas copy-on-write mode is enabled
+        (``pd.set_option("mode.copy_on_write", True)``); use ``deep=True`` for
+        a fully independent copy.
+        """
+        if deep:
+            return deepcopy(self)
+        dataset = object.__new__(type(self))
+        dataset.__dict__.update(self.__getstate__())
+        dataset._df = self._df.copy(deep=False)
+        return dataset
 
     def load_df_from_zip_archive(self, path) -> pd.DataFrame:
-        def load_single_csv(csv_name) -> pd.DataFrame:
-            print(f"{datetime.now()} Loading {csv_name} ...")
-            tmp_df = pd.read_csv(ZipFile(path).open(csv_name))
-            return tmp_df
-
-        df = pd.concat(
-            [load_single_csv(csv_name) for csv_name in ZipFile(path).namelist()],
-            ignore_index=True,
-        )
+        return self.load_df_from_csv_parts(list_csv_parts([path]))
+
+    def load_df_from_csv_parts(self, parts, **kwargs) -> pd.DataFrame:
+        """
+        Load and concatenate (path, member) CSV parts, see ``list_csv_parts``.
+
+        With ``n_jobs`` other than 1, the parts are parsed in a process pool
+        (``n_jobs=-1`` uses all CPUs). The output order always follows the
+        order of the parts.
+        """
+        n_jobs = os.cpu_count() if self.n_jobs == -1 else self.n_jobs
+        load_part = partial(self.load_csv_part, **kwargs)
+        if n_jobs == 1 or len(parts) < 2:
+            dfs = [load_part(part) for part in parts]
+        else:
+            with ProcessPoolExecutor(max_workers=min(n_jobs, len(parts))) as pool:
+                dfs = list(pool.map(load_part, parts))
+        df = concat_frames(dfs, ignore_index=True, copy=False)
         return df
 
+    def load_csv_part(self, part, **kwargs) -> pd.DataFrame:
+        with open_csv_part(*part) as csv_file:
+            return self.read_csv(csv_file, **kwargs)
+
+    def read_csv(self, path_or_buffer, *args, **kwargs) -> pd.DataFrame:
+        if self.csv_engine == "arrow":
+            return read_csv_arrow(
+                path_or_buffer,
+                self.csv_schema,
+                self.csv_time_format,
+                *args,
+                **kwargs,
+            )
+        return pd.read_csv(path_or_buffer, *args, **kwargs)
+
     def merge_xcol_and_ycol_to_xycol(self, xcol, ycol) -> None:
+        for col in [xcol, ycol]:
+            if pd.api.types.is_string_dtype(self.df[col]):
+                # lists read from CSV files arrive as strings
+                self.df[col] = self.df[col].apply(json.loads)
         self.df[COORDS] = self.df.apply(
             lambda row: list(zip(row[xcol], row[ycol])), axis=1
         )
         self.df.drop(columns=[xcol, ycol], inplace=True)
 
     def explode_coordinate_list(self, coords=COORDS) -> None:
-        self.df = self.df.explode(coords)
-        self.df[ROWNUM] = self.df.groupby(TRAJ_ID).cumcount()
+        """Explode a column of lists of (x, y) pairs into x/y points"""
+        counts = list_lengths(self.df[coords])
+        lists = self.df[coords][counts > 0].to_numpy()
+        xy = np.concatenate(lists).reshape(-1, 2) if len(lists) else np.empty((0, 2))
+        self.explode_flat_coordinates(xy[:, 0], xy[:, 1], counts, drop=[coords])
+
+    def explode_coordinate_lists(self, xcol, ycol) -> None:
+        """
+        Explode parallel columns of x and y coordinate lists into x/y points.
+
+        The columns may also contain the lists as strings (e.g. when read from
+        CSV). Lengths and offsets are computed once and the coordinates are
+        concatenated into flat arrays, without creating (x, y) tuples.
+        """
+        flat = []
+        for col in [xcol, ycol]:
+            if pd.api.types.is_string_dtype(self.df[col]):
+                flat.append(parse_number_lists(self.df[col], dtype=self.coord_dtype))
+            else:
+                counts = list_lengths(self.df[col])
+                lists = self.df[col][counts > 0].to_numpy()
+                values = np.concatenate(lists) if len(lists) else np.array([])
+                flat.append((values, counts))
+        (x, x_counts), (y, y_counts) = flat
+        if not np.array_equal(x_counts, y_counts):
+            raise ValueError(f"Lists in {xcol} and {ycol} differ in length")
+        self.explode_flat_coordinates(x, y, x_counts, drop=[xcol, ycol])
+
+    def explode_flat_coordinates(self, x, y, counts, drop=None) -> None:
+        """
+        Replace every row by ``counts[i]`` points with flat x/y coordinates.
+
+        This is the array-based equivalent of exploding a column of
+        coordinate lists: row attributes are repeated, and a running number is
+        added per row. As with ``DataFrame.explode``, rows with empty lists
+        become a single row with NaN coordinates.
+        """
+        counts = np.asarray(counts)
+        n_points = np.maximum(counts, 1)
+        rows = np.repeat(np.arange(len(self.df)), n_points)
+        starts = np.cumsum(n_points) - n_points
+        has_coords = np.repeat(counts > 0, n_points)
+        df = self.df.drop(columns=drop or []).iloc[rows]
+        df[ROWNUM] = np.arange(len(rows)) - np.repeat(starts, n_points)
+        for col, values in [("x", x), ("y", y)]:
+            coords = np.full(len(rows), np.nan, dtype=self.coord_dtype)
+            coords[has_coords] = values
+            df[col] = coords
+        self.df = df
         self.running_number_added = True
 
-    def to_df(self) -> pd.DataFrame:
-        df = self.df.copy()
-        if type(df) == gpd.GeoDataFrame:
-            df["x"] = df.geometry.x
-            df["y"] = df.geometry.y
-        elif not ("x" in df.columns) and not ("y" in df.columns):
-            df["x"] = get_x_from_xy(df)
-            df["y"] = get_y_from_xy(df)
-            df.drop(columns=[COORDS], inplace=True)
-        if self.running_number_added:
-            df.drop(columns=[ROWNUM], inplace=True)
-        return pd.DataFrame(df)
-
-    def to_gdf(self) -> gpd.GeoDataFrame:
-        df = self.df.copy()
-        if type(df) == gpd.GeoDataFrame:
-            return df
-        if COORDS in df.columns:
-            df["geometry"] = get_point_from_xy(df)
-            df.drop(columns=[COORDS], inplace=True)
+    def set_coordinate_columns(self, coords=None) -> None:
+        """
+        Store coordinates as contiguous x/y columns of dtype ``coord_dtype``.
+
+        If ``coords`` is given, this column of (x, y) pairs is split into x/y
+        and dropped. Datasets that carry a geometry column are left untouched.
+        """
+        if coords in self.df.columns and not is_geodataframe(self.df):
+            x, y = get_x_y_arrays_from_xy(self.df, coords, dtype=self.coord_dtype)
+            self.df = self.df.drop(columns=[coords])
+            self.df["x"] = x
+            self.df["y"] = y
+        for col in ["x", "y"]:
+            if col in self.df.columns and self.df[col].dtype != self.coord_dtype:
+                if pd.api.types.is_numeric_dtype(self.df[col]):
+                    self.df[col] = self.df[col].astype(self.coord_dtype)
+
+    def compact(self, coordinates=False, max_category_ratio=0.5) -> pd.DataFrame:
+        """
+        Convert the frame to memory-compact dtypes.
+
+        Integers are downcast to the smallest (unsigned) integer type that
+        holds their values, floats to float32, and string columns with
+        repeated values to categoricals. Trajectory and mover ids are never
+        made categorical.
+
+        Parameters
+        ----------
+        coordinates : bool
+            Also store x/y as float32 (default: keep ``coord_dtype``)
+        max_category_ratio : float
+            Maximum ratio of distinct values to rows for string columns to be
+            converted to categoricals
+
+        Returns
+        -------
+        pandas.DataFrame
+            Per-column dtypes and memory usage in bytes before and after
+
+        Examples
+        --------
+        >>> ais = AISDK("aisdk-2023-01-01.csv", compact=True)
+        >>> ais.compact(coordinates=True)
+        """
+        if coordinates:
+            self.coord_dtype = np.dtype(np.float32)
+        before = self.df.dtypes, self.df.memory_usage(deep=True, index=False)
+        df = self.df.copy(deep=False)
+        for col in df.columns:
+            if col in ["x", "y"]:
+                continue
+            df[col] = compact_series(
+                df[col],
+                categorical=col not in [TRAJ_ID, MOVER_ID],
+                max_category_ratio=max_category_ratio,
+            )
+        self.df = df
+        self.set_coordinate_columns()
+        self.compacted = True
+        after = self.df.dtypes, self.df.memory_usage(deep=True, index=False)
+        return pd.DataFrame(
+            {
+                "dtype_before": before[0],
+                "dtype_after": after[0],
+                "bytes_before": before[1],
+                "bytes_after": after[1],
+            }
+        )
+
+    def match_dtypes(self, df) -> pd.DataFrame:
+        """
+        Cast the columns of a frame derived from this dataset to its dtypes.
+
+        Preprocessors that rebuild the frame (e.g. from a TrajectoryCollection)
+        use this to keep compact dtypes. Columns that could not be cast are
+        left as they are. For compacted datasets, new float columns are stored
+        as float32.
+        """
+        for col in df.columns:
+            if col in ["x", "y"]:
+                dtype = self.coord_dtype
+            elif col in self.df.columns:
+                dtype = self.df[col].dtype
+            elif self.compacted and pd.api.types.is_float_dtype(df[col]):
+                dtype = np.dtype(np.float32)
+            else:
+                continue
+            if df[col].dtype == dtype or not _castable(df[col].dtype, dtype):
+                continue
+            if isinstance(dtype, pd.CategoricalDtype):
+                dtype = "category"
+            try:
+                df[col] = df[col].astype(dtype)
+            except (TypeError, ValueError):
+                pass
+        return df
+
+    def append(self, batch) -> None:
+        """
+        Append the points of another dataset, e.g. a new daily file.
+
+        Points of the batch replace existing points of the same mover (or
+        trajectory, for datasets without movers) and timestamp, so batches
+        that overlap at file boundaries do not create duplicates. Only
+        existing points within the time range and movers of the batch are
+        checked. The trajectories of the batch are added to ``dirty``, and the
+        statistics are updated from the batch alone if no points were
+        replaced.
+
+        Parameters
+        ----------
+        batch : Dataset or pandas.DataFrame
+            Points with the same (normalized) columns as this dataset
+        """
+        if not isinstance(batch, Dataset):
+            batch = Dataset(batch, crs=self.crs)
+        if is_geodataframe(self.df):
+            new = batch.to_gdf()
         else:
-            df["geometry"] = get_point_from_x_y(df)
-            df.drop(columns=["x", "y"], inplace=True)
-        if self.running_number_added:
-            df.drop(columns=[ROWNUM], inplace=True)
-        gdf = gpd.GeoDataFrame(df, crs=self.crs)
+            new = batch.to_df()
+        old = self.df
+        key = MOVER_ID if MOVER_ID in old.columns else TRAJ_ID
+        keys = [key, TIMESTAMP]
+
+        n_new = len(new)
+        new = new[~new.duplicated(keys, keep="last")]
+        replaced = np.zeros(len(old), dtype=bool)
+        if len(new) and len(old):
+            t0, t1 = new[TIMESTAMP].min(), new[TIMESTAMP].max()
+            candidates = np.flatnonzero(
+                old[TIMESTAMP].between(t0, t1).to_numpy()
+                & old[key].isin(new[key].unique()).to_numpy()
+            )
+            if len(candidates):
+                old_keys = pd.MultiIndex.from_frame(old[keys].iloc[candidates])
+                new_keys = pd.MultiIndex.from_frame(new[keys])
+                replaced[candidates[old_keys.isin(new_keys)]] = True
+
+        stats = self._peek_cached("stats")
+        self.df = pd.concat(
+            [old[~replaced] if replaced.any() else old, new],
+            ignore_index=isinstance(old.index, pd.RangeIndex),
+        )
+        self.dirty = self.dirty | set(new[TRAJ_ID].unique())
+        if stats is not None and not replaced.any() and len(new) == n_new:
+            x, y = self._get_x_y_arrays(new)
+            stats = stats.merge(DatasetStatistics.from_df(new, x, y))
+            self._cached("stats", lambda: stats)
+
+    def dirty_trajectories(self) -> "Dataset":
+        """Copy of the dataset with the trajectories changed by ``append``"""
+        dataset = self.copy()
+        dataset.df = self.df[self.df[TRAJ_ID].isin(list(self.dirty))]
+        return dataset
+
+    def mark_clean(self) -> None:
+        """Reset ``dirty`` after downstream results have been updated"""
+        self.dirty = frozenset()
+
+    def sort_trajectories(self) -> None:
+        """
+        Sort the rows by mover id, trajectory id and timestamp.
+
+        Afterwards, the rows of every trajectory and of every mover are
+        contiguous, see ``trajectory_index`` and ``mover_index``. The sort is
+        stable and the index labels are kept.
+        """
+        if self._is_sorted():
+            return
+        self.df = self.df.sort_values(self._sort_keys(), kind="mergesort")
+        self._cached("sorted", lambda: True)
+
+    def _sort_keys(self) -> list:
+        return [col for col in [MOVER_ID, TRAJ_ID, TIMESTAMP] if col in self.df]
+
+    def _is_sorted(self) -> bool:
+        """Whether the rows are sorted like ``sort_trajectories`` sorts them"""
+
+        def check():
+            keys = self._sort_keys()
+            if not keys or len(self.df) < 2:
+                return True
+            return pd.MultiIndex.from_frame(self.df[keys]).is_monotonic_increasing
+
+        return self._cached("sorted", check)
+
+    def _require_sorted(self) -> None:
+        if not self._is_sorted():
+            raise ValueError(
+                "The rows are not sorted by mover id, trajectory id and timestamp, "
+                "call sort_trajectories() first"
+            )
+
+    @property
+    def trajectory_index(self) -> TrajectoryIndex:
+        """
+        Offsets of the trajectories in ``df``.
+
+        Requires the rows to be sorted, see ``sort_trajectories``.
+        """
+        self._require_sorted()
+        return self._cached("trajectory_index", lambda: TrajectoryIndex(self.df))
+
+    @property
+    def mover_index(self) -> TrajectoryIndex:
+        """Offsets of the movers in sorted ``df``, see ``sort_trajectories``"""
+        self._require_sorted()
+        return self._cached("mover_index", lambda: TrajectoryIndex(self.df, [MOVER_ID]))
+
+    def trajectory(self, i) -> pd.DataFrame:
+        """Rows of the i-th trajectory in (mover id, trajectory id) order"""
+        return self.trajectory_index.trajectory(i)
+
+    def iter_trajectories(self):
+        """Iterate over (trajectory id, rows) in (mover id, trajectory id) order"""
+        return iter(self.trajectory_index)
+
+    @property
+    def point_index(self) -> PointIndex:
+        """
+        Grid, time and mover index of the rows, built on first use and kept
+        until ``df`` changes.
+        """
+        return self._cached("point_index", self._build_point_index)
+
+    def _build_point_index(self) -> PointIndex:
+        x, y = self._get_x_y_arrays()
+        t = movers = None
+        if TIMESTAMP in self.df.columns:
+            t = pd.DatetimeIndex(self.df[TIMESTAMP]).as_unit("ns").asi8
+        if MOVER_ID in self.df.columns:
+            movers = self.df[MOVER_ID].to_numpy()
+        return PointIndex(x, y, t, movers)
+
+    def query(self, bbox=None, time=None, movers=None) -> "Dataset":
+        """
+        Select the points within a bbox, time range and/or of some movers.
+
+        Uses ``point_index``, so repeated queries on the same data only touch
+        the matching grid cells and time and mover ranges.
+
+        Parameters
+        ----------
+        bbox : tuple
+            (min_x, min_y, max_x, max_y), inclusive
+        time : tuple
+            (t0, t1) time range, inclusive
+        movers : list
+            Mover ids
+
+        Returns
+        -------
+        Dataset
+            Copy of the dataset with the selected rows, in their original order
+
+        Examples
+        --------
+        >>> ais.query(bbox=(11.8, 55.6, 12.2, 55.8), time=(t0, t1))
+        """
+        if time is not None:
+            time = tuple(pd.Timestamp(t).as_unit("ns").value for t in time)
+        rows = self.point_index.query(bbox, time, movers)
+        dataset = self.copy()
+        dataset.df = self.df.iloc[rows]
+        return dataset
+
+    def _drop_cols(self, df) -> list:
+        cols = []
+        if COORDS in df.columns:
+            cols.append(COORDS)
+        if self.running_number_added and ROWNUM in df.columns:
+            cols.append(ROWNUM)
+        return cols
+
+    def _get_x_y_arrays(self, df=None):
+        df = self.df if df is None else df
+        if is_geodataframe(df):
+            return df.geometry.x.to_numpy(), df.geometry.y.to_numpy()
+        if "x" in df.columns and "y" in df.columns:
+            return df["x"].to_numpy(), df["y"].to_numpy()
+        return get_x_y_arrays_from_xy(df, dtype=self.coord_dtype)
+
+    def to_df(self) -> pd.DataFrame:
+        """
+        Return the points as a DataFrame with x/y columns.
+
+        The frame is built once per state of ``df`` and returned as a shallow
+        copy: adding or replacing columns is safe, modifying values in place
+        is not.
+        """
+        return self._cached("df", self._build_df).copy(deep=False)
+
+    def _build_df(self) -> pd.DataFrame:
+        df = self.df
+        x, y = self._get_x_y_arrays(df)
+        df = pd.DataFrame(df.drop(columns=self._drop_cols(df)))
+        if is_geodataframe(self.df) or "x" not in df.columns:
+            df["x"] = x
+            df["y"] = y
+        return df
+
+    def to_gdf(self):  # -> gpd.GeoDataFrame:
+        """
+        Return the points as a GeoDataFrame.
+
+        The frame is built once per state of ``df`` and returned as a shallow
+        copy, see ``to_df``.
+        """
+        return self._cached("gdf", self._build_gdf).copy(deep=False)
+
+    def _build_gdf(self):  # -> gpd.GeoDataFrame:
+        import geopandas as gpd
+
+        df = self.df
+        if is_geodataframe(df):
+            return df.copy()
+        x, y = self._get_x_y_arrays(df)
+        df = df.drop(columns=self._drop_cols(df) + ["x", "y"], errors="ignore")
+        gdf = gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(x, y), crs=self.crs)
         return gdf
 
     def to_trajs(self):  # -> mpd.TrajectoryCollection:
+        """
+        Return the trajectories as a movingpandas TrajectoryCollection.
+
+        Every call returns a new collection, so modifying its trajectories
+        does not affect later calls. The GeoDataFrame it is built from is
+        cached per state of ``df``, see ``to_gdf``.
+        """
         import movingpandas as mpd
 
-        gdf = self.to_gdf()
+        gdf = self._cached("gdf", self._build_gdf)
         trajs = mpd.TrajectoryCollection(
             gdf,
             traj_id_col=TRAJ_ID,
@@ -146,8 +678,52 @@ class Dataset:
         )
         return trajs
 
-    def to_feather(self, out_path) -> None:
+    def to_feather(self, out_path, index=False) -> None:
+        """
+        Write the dataset to a Feather file.
+
+        The statistics are written to ``<out_path>.stats.json``. With
+        ``index=True``, the point index is written to ``<out_path>.index.npz``
+        and reused when the file is loaded again.
+        """
         self.to_gdf().to_feather(out_path)
+        self.stats.to_json(out_path + STATS_SUFFIX)
+        if index:
+            self.point_index.save(out_path + INDEX_SUFFIX)
+
+    def to_parquet(self, out_path, partition_by=None, **kwargs) -> None:
+        """
+        Write the dataset points to a Parquet file or partitioned store.
+
+        Points are stored as x/y columns. Rows are sorted by mover (or
+        trajectory) and timestamp, so that the per-row-group min/max
+        statistics allow readers to skip data that does not match a time,
+        bbox or mover filter.
+
+        Parameters
+        ----------
+        out_path : str
+            Output file, or output directory if ``partition_by`` is given
+        partition_by : list
+            Columns to partition by, "date" is derived from the timestamp
+        sort_by : list
+            Columns to sort by before writing
+        row_group_size : int
+            Maximum number of rows per row group
+
+        Examples
+        --------
+        >>> ais.to_parquet("ais_store", partition_by=["date"])
+        >>> Dataset("ais_store", time=(t0, t1), bbox=bbox, movers=mmsis)
+        """
+        df = self.to_df()
+        if "geometry" in df.columns:
+            df = df.drop(columns=["geometry"])
+        crs = self.crs.to_string() if hasattr(self.crs, "to_string") else self.crs
+        stats = self.stats.to_dict()
+        write_parquet(
+            df, out_path, partition_by, name=self.name, crs=crs, stats=stats, **kwargs
+        )
 
     def plot(self, *args, **kwargs):
         title = kwargs.pop("title", None)
@@ -181,14 +757,37 @@ class Dataset:
         if self.crs != 4326:
             # TODO: reproject
             pass
-        df.loc[:, "x"], df.loc[:, "y"] = ds.utils.lnglat_to_meters(df.x, df.y)
+        df["x"], df["y"] = ds.utils.lnglat_to_meters(df.x, df.y)
         plot = df.hvplot.scatter(x="x", y="y", datashade=True, *args, **kwargs)
         return BG_TILES * plot
 
+    @property
+    def stats(self) -> DatasetStatistics:
+        """
+        Statistics of the points: bounds, time range, counts and per-column
+        min/max.
+
+        They are computed on first access and kept until ``df`` changes.
+        Datasets loaded unfiltered from Parquet or Feather files written by
+        mobiml use the statistics stored with the data instead of scanning it.
+        """
+        return self._cached("stats", self._compute_stats)
+
+    def _compute_stats(self) -> DatasetStatistics:
+        x, y = self._get_x_y_arrays()
+        return DatasetStatistics.from_df(self.df, x, y)
+
     def get_bounds(self):
-        df = self.to_df()
-        min_x = df.x.min()
-        min_y = df.y.min()
-        max_x = df.x.max()
-        max_y = df.y.max()
-        return (min_x, min_y, max_x, max_y)
+        return self.stats.bounds
+
+
+def _castable(from_dtype, to_dtype) -> bool:
+    """Whether a derived column may be cast back to a dataset column dtype"""
+    if isinstance(to_dtype, pd.CategoricalDtype):
+        return not pd.api.types.is_numeric_dtype(from_dtype)
+    if pd.api.types.is_numeric_dtype(to_dtype):
+        return pd.api.types.is_numeric_dtype(from_dtype) and not (
+            pd.api.types.is_float_dtype(from_dtype)
+            and pd.api.types.is_integer_dtype(to_dtype)
+        )
+    return False
@@ -0,0 +1,292 @@
+import numpy as np
+import pandas as pd
+
+from mobiml.datasets.utils import TRAJ_ID
+
+INDEX_SUFFIX = ".index.npz"
+
+
+class TrajectoryIndex:
+    """
+    Offsets of the contiguous runs of equal keys in a sorted frame.
+
+    For a frame sorted by trajectory id (and timestamp), the rows of the i-th
+    trajectory are ``df.iloc[offsets[i]:offsets[i + 1]]``, so per-trajectory
+    work is slicing instead of hash grouping. Iterating the index yields
+    (key, frame) pairs like a ``DataFrame.groupby``.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Frame sorted by ``keys``
+    keys : list
+        Key columns, a new segment starts wherever any of them changes
+
+    Examples
+    --------
+    >>> index = dataset.trajectory_index
+    >>> index.trajectory(0)
+    >>> n_points = index.lengths
+    >>> max_speed = index.reduce(dataset.df["speed"].to_numpy(), np.maximum)
+    """
+
+    def __init__(self, df, keys=(TRAJ_ID,)) -> None:
+        self.df = df
+        self.names = list(keys)
+        change = np.zeros(len(df), dtype=bool)
+        change[:1] = True
+        for key in self.names:
+            values = df[key].to_numpy()
+            change[1:] |= values[1:] != values[:-1]
+        starts = np.flatnonzero(change)
+        self.offsets = np.append(starts, len(df))
+        if len(self.names) == 1:
+            self.ids = pd.Index(df[self.names[0]].to_numpy()[starts])
+        else:
+            self.ids = pd.MultiIndex.from_frame(df[self.names].iloc[starts])
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.ids[i], self.trajectory(i)
+
+    def __repr__(self) -> str:
+        return f"TrajectoryIndex({self.names}, {len(self)} segments)"
+
+    @property
+    def starts(self) -> np.ndarray:
+        return self.offsets[:-1]
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def slice(self, i) -> slice:
+        return slice(self.offsets[i], self.offsets[i + 1])
+
+    def trajectory(self, i) -> pd.DataFrame:
+        """Rows of the i-th segment"""
+        return self.df.iloc[self.slice(i)]
+
+    def segment_ids(self) -> np.ndarray:
+        """Segment number of every row"""
+        return np.repeat(np.arange(len(self)), self.lengths)
+
+    def reduce(self, values, ufunc=np.add) -> np.ndarray:
+        """Reduce row values per segment with a numpy ufunc"""
+        values = np.asarray(values)
+        if len(self) == 0:
+            return values[:0]
+        return ufunc.reduceat(values, self.starts)
+
+    def cumsum(self, values) -> np.ndarray:
+        """Cumulative sum of row values, restarting at every segment"""
+        return segmented_cumsum(values, self.starts)
+
+    def first(self, values) -> np.ndarray:
+        """Value of the first row of every segment"""
+        return np.asarray(values)[self.starts]
+
+    def last(self, values) -> np.ndarray:
+        """Value of the last row of every segment"""
+        return np.asarray(values)[self.offsets[1:] - 1]
+
+    def repeat(self, values) -> np.ndarray:
+        """Broadcast per-segment values to the rows"""
+        return np.repeat(np.asarray(values), self.lengths)
+
+
+def segmented_cumsum(values, starts) -> np.ndarray:
+    """Cumulative sum restarting at the sorted segment ``starts``"""
+    values = np.asarray(values)
+    if len(values) == 0:
+        return np.cumsum(values)
+    total = np.cumsum(values)
+    offsets = total[starts] - values[starts]
+    lengths = np.diff(np.append(starts, len(values)))
+    return total - np.repeat(offsets, lengths)
+
+
+class PointIndex:
+    """
+    Grid index over point locations plus sorted time and mover indexes.
+
+    Points are bucketed into a regular grid of about ``points_per_cell``
+    points per cell over the data bounds; rows are stored ordered by cell,
+    so a bbox query only tests the points of the overlapped cells. Time and
+    mover queries are binary searches on sorted copies of the columns. All
+    queries return sorted row positions.
+
+    Parameters
+    ----------
+    x, y : numpy.ndarray
+        Point coordinates
+    t : numpy.ndarray
+        Timestamps as int64 nanoseconds, optional
+    movers : numpy.ndarray
+        Mover ids, optional
+    points_per_cell : int
+        Target number of points per grid cell
+    """
+
+    def __init__(self, x, y, t=None, movers=None, points_per_cell=64) -> None:
+        self.n_rows = len(x)
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        valid = ~(np.isnan(self.x) | np.isnan(self.y))
+        if valid.any():
+            min_x, max_x = self.x[valid].min(), self.x[valid].max()
+            min_y, max_y = self.y[valid].min(), self.y[valid].max()
+        else:
+            min_x = max_x = min_y = max_y = 0.0
+        n_cells = max(1, int(np.ceil(np.sqrt(valid.sum() / points_per_cell))))
+        self.grid = np.array(
+            [
+                min_x,
+                min_y,
+                (max_x - min_x) / n_cells or 1.0,
+                (max_y - min_y) / n_cells or 1.0,
+                n_cells,
+            ]
+        )
+        cells = np.full(self.n_rows, n_cells * n_cells, dtype=np.int64)
+        cells[valid] = self._cell(self.x[valid], self.y[valid])
+        self.cell_order = np.argsort(cells, kind="stable")
+        self.cell_offsets = np.searchsorted(
+            cells[self.cell_order], np.arange(n_cells * n_cells + 1)
+        )
+
+        self.time_order = self.times = None
+        if t is not None:
+            self.time_order = np.argsort(t, kind="stable")
+            self.times = np.asarray(t)[self.time_order]
+        self.mover_order = self.movers = None
+        if movers is not None:
+            self.mover_order = np.argsort(movers, kind="stable")
+            self.movers = np.asarray(movers)[self.mover_order]
+
+    def _cell_xy(self, x, y):
+        min_x, min_y, width, height, n_cells = self.grid
+        n_cells = int(n_cells)
+        ix = np.clip(((x - min_x) // width).astype(np.int64), 0, n_cells - 1)
+        iy = np.clip(((y - min_y) // height).astype(np.int64), 0, n_cells - 1)
+        return ix, iy
+
+    def _cell(self, x, y):
+        ix, iy = self._cell_xy(x, y)
+        return iy * int(self.grid[4]) + ix
+
+    def query_bbox(self, bbox) -> np.ndarray:
+        """Rows within the (min_x, min_y, max_x, max_y) bbox, inclusive"""
+        min_x, min_y, max_x, max_y = bbox
+        (ix0, ix1), (iy0, iy1) = self._cell_xy(
+            np.array([min_x, max_x]), np.array([min_y, max_y])
+        )
+        n_cells = int(self.grid[4])
+        parts = [
+            self.cell_order[
+                self.cell_offsets[iy * n_cells + ix0] : self.cell_offsets[
+                    iy * n_cells + ix1 + 1
+                ]
+            ]
+            for iy in range(iy0, iy1 + 1)
+        ]
+        rows = np.concatenate(parts) if parts else np.array([], dtype=np.int64)
+        x, y = self.x[rows], self.y[rows]
+        rows = rows[(x >= min_x) & (x <= max_x) & (y >= min_y) & (y <= max_y)]
+        return np.sort(rows)
+
+    def query_time(self, t0, t1) -> np.ndarray:
+        """Rows with t0 <= timestamp <= t1 (int64 nanoseconds)"""
+        if self.times is None:
+            raise ValueError("The index has no timestamps")
+        lo = np.searchsorted(self.times, t0, side="left")
+        hi = np.searchsorted(self.times, t1, side="right")
+        return np.sort(self.time_order[lo:hi])
+
+    def query_movers(self, movers) -> np.ndarray:
+        """Rows of the given movers"""
+        if self.movers is None:
+            raise ValueError("The index has no mover ids")
+        movers = np.asarray(movers)
+        if self.movers.dtype.kind == "U":
+            # stored mover ids are strings of any width
+            movers = movers.astype(str)
+        else:
+            movers = movers.astype(self.movers.dtype)
+        lo = np.searchsorted(self.movers, movers, side="left")
+        hi = np.searchsorted(self.movers, movers, side="right")
+        parts = [self.mover_order[a:b] for a, b in zip(lo, hi)]
+        rows = np.concatenate(parts) if parts else np.array([], dtype=np.int64)
+        return np.sort(rows)
+
+    def query(self, bbox=None, time=None, movers=None) -> np.ndarray:
+        """Rows matching all given conditions, see query_bbox/time/movers"""
+        rows = None
+        for condition, query in [
+            (bbox, self.query_bbox),
+            (time, lambda time: self.query_time(*time)),
+            (movers, self.query_movers),
+        ]:
+            if condition is None:
+                continue
+            selected = query(condition)
+            rows = selected if rows is None else _intersect(rows, selected)
+        if rows is None:
+            return np.arange(self.n_rows)
+        return rows
+
+    def save(self, path) -> None:
+        """
+        Store the index as an uncompressed .npz file.
+
+        Object mover ids are stored as strings, so the file loads without
+        pickle.
+        """
+        arrays = {
+            "x": self.x,
+            "y": self.y,
+            "grid": self.grid,
+            "cell_order": self.cell_order,
+            "cell_offsets": self.cell_offsets,
+        }
+        for name in ["time_order", "times", "mover_order", "movers"]:
+            if getattr(self, name) is not None:
+                arrays[name] = getattr(self, name)
+        if self.movers is not None and self.movers.dtype == object:
+            movers = self.movers.astype(str)
+            order = np.argsort(movers, kind="stable")
+            arrays["movers"] = movers[order]
+            arrays["mover_order"] = self.mover_order[order]
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path) -> "PointIndex":
+        index = cls.__new__(cls)
+        with np.load(path) as arrays:
+            for name in [
+                "x",
+                "y",
+                "grid",
+                "cell_order",
+                "cell_offsets",
+                "time_order",
+                "times",
+                "mover_order",
+                "movers",
+            ]:
+                setattr(index, name, arrays[name] if name in arrays else None)
+        index.n_rows = len(index.x)
+        return index
+
+
+def _intersect(a, b) -> np.ndarray:
+    """Intersection of two sorted arrays of unique row positions"""
+    if len(a) > len(b):
+        a, b = b, a
+    pos = np.searchsorted(b, a)
+    pos[pos == len(b)] = 0
+    return a[b[pos] == a] if len(b) else b
@@ -0,0 +1,115 @@
+import json
+from os.path import isdir
+
+import pandas as pd
+
+from mobiml.datasets.utils import MOVER_ID, TIMESTAMP, TRAJ_ID
+
+DATE = "date"
+METADATA_KEY = b"mobiml"
+
+
+def write_parquet(
+    df, out_path, partition_by=None, sort_by=None, row_group_size=100_000, **meta
+) -> None:
+    """
+    Write a point DataFrame with x/y columns to a Parquet file or store.
+
+    Rows are sorted by ``sort_by`` (default: mover or trajectory id, then
+    timestamp) so that the min/max statistics of each row group cover narrow
+    ranges of movers, times and locations. If ``partition_by`` is given, a
+    hive-partitioned directory is written; the special partition column "date"
+    is derived from the timestamp.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    if sort_by is None:
+        id_col = MOVER_ID if MOVER_ID in df.columns else TRAJ_ID
+        sort_by = [col for col in [id_col, TIMESTAMP] if col in df.columns]
+    df = df.sort_values(sort_by, kind="mergesort") if sort_by else df
+    if partition_by and DATE in partition_by and DATE not in df.columns:
+        df = df.assign(**{DATE: df[TIMESTAMP].dt.strftime("%Y-%m-%d")})
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), METADATA_KEY: json.dumps(meta).encode()}
+    )
+    if not partition_by:
+        pq.write_table(table, out_path, row_group_size=row_group_size)
+        return
+    ds.write_dataset(
+        table,
+        out_path,
+        format="parquet",
+        partitioning=list(partition_by),
+        partitioning_flavor="hive",
+        min_rows_per_group=min(row_group_size, len(df)),
+        max_rows_per_group=row_group_size,
+        existing_data_behavior="delete_matching",
+    )
+
+
+def read_parquet(
+    path, bbox=None, time=None, movers=None, columns=None
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Read a Parquet file or store written by ``write_parquet``.
+
+    The filters are pushed down to the reader, which skips partitions and
+    row groups whose min/max statistics do not match.
+
+    Parameters
+    ----------
+    path : str
+        Parquet file or directory
+    bbox : tuple
+        (min_x, min_y, max_x, max_y)
+    time : tuple
+        (t0, t1) time range, inclusive
+    movers : list
+        Mover ids to read
+    columns : list
+        Columns to read (default: all)
+
+    Returns
+    -------
+    (pandas.DataFrame, dict)
+        The points and the metadata that was stored with them
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(
+        path, format="parquet", partitioning="hive" if isdir(path) else None
+    )
+    names = dataset.schema.names
+    partition_names = dataset.partitioning.schema.names if dataset.partitioning else []
+    expr = None
+
+    def _and(a, b):
+        return b if a is None else a & b
+
+    if bbox is not None:
+        min_x, min_y, max_x, max_y = bbox
+        expr = _and(expr, (ds.field("x") >= min_x) & (ds.field("x") <= max_x))
+        expr = _and(expr, (ds.field("y") >= min_y) & (ds.field("y") <= max_y))
+    if time is not None:
+        t0, t1 = pd.Timestamp(time[0]), pd.Timestamp(time[1])
+        expr = _and(expr, (ds.field(TIMESTAMP) >= t0) & (ds.field(TIMESTAMP) <= t1))
+        if DATE in partition_names:
+            expr = _and(
+                expr,
+                (ds.field(DATE) >= t0.strftime("%Y-%m-%d"))
+                & (ds.field(DATE) <= t1.strftime("%Y-%m-%d")),
+            )
+    if movers is not None:
+        expr = _and(expr, ds.field(MOVER_ID).isin(list(movers)))
+
+    if columns is None:
+        columns = [col for col in names if col != DATE]
+    table = dataset.to_table(columns=columns, filter=expr)
+
+    metadata = dataset.schema.metadata or {}
+    meta = json.loads(metadata.get(METADATA_KEY, b"{}"))
+    return table.to_pandas(), meta
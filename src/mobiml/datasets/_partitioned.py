@@ -0,0 +1,381 @@
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+from os.path import basename, exists, isdir, join
+
+import numpy as np
+import pandas as pd
+
+from mobiml.datasets._dataset import Dataset
+from mobiml.datasets._parquet import METADATA_KEY, read_parquet
+from mobiml.datasets._stats import DatasetStatistics
+from mobiml.datasets.utils import MOVER_ID, TRAJ_ID
+
+MANIFEST = "_partitions.json"
+PARTITION_GLOB = "part-[0-9][0-9][0-9][0-9][0-9]"
+
+
+class PartitionedDataset:
+    """
+    Dataset stored as Parquet partitions on disk, hash-partitioned by mover.
+
+    All points of a mover (or, for datasets without movers, of a trajectory)
+    are in the same partition, so trajectories never straddle partitions and
+    preprocessors can run on one partition at a time. Every partition is a
+    directory ``part-XXXXX`` of Parquet files written by ``Dataset.to_parquet``.
+
+    Examples
+    --------
+    >>> chunks = AISDK.iter_chunks("aisdk-2018-02.zip", bbox=bbox)
+    >>> ais = PartitionedDataset.from_chunks(chunks, "ais_store", n_partitions=64)
+    >>> ais = ais.map_partitions(TrajectoryFilter, "filter_min_pts", min_pts=100)
+    >>> ais = ais.map_partitions(
+    ...     TrajectorySplitter,
+    ...     "split",
+    ...     observation_gap=timedelta(hours=1),
+    ...     engine="native",
+    ...     n_jobs=8,
+    ... )
+    >>> sample = ais.partition(0).to_trajs()
+    """
+
+    def __init__(self, path) -> None:
+        manifest_path = join(path, MANIFEST)
+        if not exists(manifest_path):
+            raise ValueError(f"{path} is not a partitioned dataset")
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        self.path = path
+        self.n_partitions = manifest["n_partitions"]
+        self.key = manifest["key"]
+        self.name = manifest.get("name")
+        self.crs = manifest.get("crs")
+        # version of every partition, and of the input partitions the
+        # partitions were computed from by map_partitions
+        self.versions = manifest.get("versions", {})
+        self.sources = manifest.get("sources", {})
+
+    def _save_manifest(self) -> None:
+        manifest = {
+            "n_partitions": self.n_partitions,
+            "key": self.key,
+            "name": self.name,
+            "crs": self.crs,
+            "versions": self.versions,
+            "sources": self.sources,
+        }
+        tmp_path = join(self.path, f"{MANIFEST}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, join(self.path, MANIFEST))
+
+    def _bump(self, name) -> None:
+        self.versions[name] = self.versions.get(name, 0) + 1
+
+    def __len__(self) -> int:
+        return len(self.partition_paths)
+
+    def __iter__(self):
+        for path in self.partition_paths:
+            yield self._load(path)
+
+    def __repr__(self) -> str:
+        return f"PartitionedDataset({self.path}, {len(self)} partitions)"
+
+    @property
+    def partition_paths(self) -> list:
+        """Paths of the non-empty partitions"""
+        return sorted(
+            path
+            for path in glob(join(self.path, PARTITION_GLOB))
+            if isdir(path) and glob(join(path, "*.parquet"))
+        )
+
+    def partition(self, i) -> Dataset:
+        """Load the i-th non-empty partition"""
+        return self._load(self.partition_paths[i])
+
+    def _load(self, path) -> Dataset:
+        dataset = Dataset(path)
+        dataset.name = dataset.name or self.name
+        dataset.crs = dataset.crs or self.crs
+        return dataset
+
+    @classmethod
+    def create(cls, path, n_partitions=16, key=MOVER_ID, name=None, crs=None):
+        """Create an empty partitioned dataset at ``path``"""
+        os.makedirs(path, exist_ok=True)
+        if hasattr(crs, "to_string"):
+            crs = crs.to_string()
+        manifest = {"n_partitions": n_partitions, "key": key, "name": name, "crs": crs}
+        with open(join(path, MANIFEST), "w") as f:
+            json.dump(manifest, f)
+        return cls(path)
+
+    @classmethod
+    def open_or_create(cls, path, n_partitions=16, key=MOVER_ID, name=None, crs=None):
+        """Open the partitioned dataset at ``path``, creating it if needed"""
+        if exists(join(path, MANIFEST)):
+            return cls(path)
+        return cls.create(path, n_partitions, key, name, crs)
+
+    @classmethod
+    def from_dataset(cls, dataset, path, n_partitions=16) -> "PartitionedDataset":
+        """Partition an in-memory dataset to ``path``"""
+        return cls.from_chunks([dataset], path, n_partitions)
+
+    @classmethod
+    def from_chunks(cls, chunks, path, n_partitions=16) -> "PartitionedDataset":
+        """
+        Partition an iterable of datasets to ``path``, one chunk at a time.
+
+        Memory use is bounded by the chunk size, e.g. with chunks from
+        ``AISDK.iter_chunks``.
+        """
+        pds = None
+        for chunk in chunks:
+            if pds is None:
+                key = MOVER_ID if MOVER_ID in chunk.df.columns else TRAJ_ID
+                pds = cls.create(path, n_partitions, key, chunk.name, chunk.crs)
+            pds.write_chunk(chunk)
+        if pds is None:
+            raise ValueError("No chunks to partition")
+        return pds
+
+    def partition_ids(self, df) -> np.ndarray:
+        """Partition number of every row, by the hash of the partition key"""
+        values = df[self.key].to_numpy()
+        if np.issubdtype(values.dtype, np.integer):
+            # the same ids must hash the same in compact and default dtypes
+            values = values.astype(np.int64)
+        hashes = pd.util.hash_array(values)
+        return (hashes % np.uint64(self.n_partitions)).astype(np.int64)
+
+    def write_chunk(self, dataset) -> list:
+        """
+        Write the rows of a dataset to their partitions as new files.
+
+        Returns the numbers of the partitions that were written to.
+        """
+        written = self._write_files(dataset)
+        for part in written:
+            self._bump(basename(self._partition_dir(part)))
+        self._save_manifest()
+        return written
+
+    def _write_files(self, dataset, file_name=None) -> list:
+        """
+        Write the rows of a dataset to new files in their partitions.
+
+        Files are numbered per partition unless ``file_name`` is given, which
+        lets several processes write to the partitions concurrently. The
+        manifest is not updated.
+        """
+        df = dataset.df
+        part_ids = self.partition_ids(df)
+        order = np.argsort(part_ids, kind="stable")
+        offsets = np.searchsorted(
+            part_ids[order], np.arange(self.n_partitions + 1), side="left"
+        )
+        written = []
+        for part in range(self.n_partitions):
+            rows = order[offsets[part] : offsets[part + 1]]
+            if len(rows) == 0:
+                continue
+            part_data = dataset.copy()
+            part_data.df = df.iloc[rows]
+            part_dir = self._partition_dir(part)
+            if file_name is None:
+                part_data.to_parquet(_next_file(part_dir))
+            else:
+                os.makedirs(part_dir, exist_ok=True)
+                part_data.to_parquet(join(part_dir, file_name))
+            written.append(part)
+        return written
+
+    def append(self, batch) -> list:
+        """
+        Merge a batch of new points, e.g. a daily file, into the partitions.
+
+        Every affected partition is loaded, merged with its part of the batch
+        using ``Dataset.append`` (replacing points of the same mover and
+        timestamp) and rewritten. Other partitions are not touched. The
+        versions of the rewritten partitions are increased, so that
+        ``map_partitions(..., incremental=True)`` recomputes only them.
+
+        Returns the numbers of the partitions that were changed.
+        """
+        df = batch.df
+        part_ids = self.partition_ids(df)
+        changed = []
+        for part in np.unique(part_ids):
+            part_batch = batch.copy()
+            part_batch.df = df[part_ids == part]
+            part_dir = self._partition_dir(part)
+            if glob(join(part_dir, "*.parquet")):
+                data = self._load(part_dir)
+                data.append(part_batch)
+            else:
+                data = part_batch
+            _replace_partition(part_dir, data)
+            self._bump(basename(part_dir))
+            changed.append(int(part))
+        self._save_manifest()
+        return changed
+
+    def _partition_dir(self, part) -> str:
+        return join(self.path, f"part-{part:05d}")
+
+    def map_partitions(
+        self, cls, method, *args, out_path=None, n_jobs=1, incremental=False, **kwargs
+    ) -> "PartitionedDataset":
+        """
+        Run a preprocessor method on every partition and store the results.
+
+        Every partition is loaded as a ``Dataset``, processed with
+        ``getattr(cls(dataset), method)(*args, **kwargs)`` and the resulting
+        dataset is written to the corresponding partition of ``out_path``.
+        With ``n_jobs`` other than 1, partitions are processed in a process
+        pool (``n_jobs=-1`` uses all CPUs). Only the partitions being
+        processed are held in memory.
+
+        Preprocessors that depend on global properties of the data must be
+        given them explicitly, e.g. ``Normalizer.normalize(bounds=...,
+        speed_max=...)`` with bounds from ``get_bounds()``.
+
+        Parameters
+        ----------
+        cls : class
+            Preprocessor class, e.g. TrajectoryFilter
+        method : str
+            Name of the method to call, e.g. "filter_min_pts"
+        out_path : str
+            Output directory (default: replace the partitions in place)
+        n_jobs : int
+            Number of worker processes
+        incremental : bool
+            Only process the partitions that changed (e.g. by ``append``)
+            since ``out_path`` was last computed from them
+
+        Returns
+        -------
+        PartitionedDataset
+        """
+        in_place = out_path is None or os.path.abspath(out_path) == os.path.abspath(
+            self.path
+        )
+        if in_place and incremental:
+            raise ValueError("Incremental map_partitions requires an out_path")
+        if in_place:
+            out = self
+        else:
+            out = PartitionedDataset.open_or_create(
+                out_path, self.n_partitions, self.key, self.name, self.crs
+            )
+        paths = self.partition_paths
+        if incremental:
+            paths = [
+                path
+                for path in paths
+                if out.sources.get(basename(path)) != self.versions.get(basename(path))
+            ]
+        tasks = [
+            (path, join(out.path, basename(path)), self.crs, cls, method, args, kwargs)
+            for path in paths
+        ]
+        n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+        if n_jobs == 1 or len(tasks) < 2:
+            for task in tasks:
+                _map_partition(task)
+        else:
+            with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as pool:
+                list(pool.map(_map_partition, tasks))
+        for path in paths:
+            name = basename(path)
+            out._bump(name)
+            if not in_place:
+                out.sources[name] = self.versions.get(name, 0)
+        out._save_manifest()
+        return out
+
+    @property
+    def stats(self) -> DatasetStatistics:
+        """
+        Statistics of all partitions, merged from the statistics stored in
+        the Parquet files.
+
+        Only the id columns of partitions with several files are read, to
+        count their distinct trajectories and movers.
+        """
+        stats = DatasetStatistics(n_trajs=0, n_movers=0)
+        for path in self.partition_paths:
+            stats = stats.merge(_partition_stats(path), disjoint=True)
+        return stats
+
+    def get_bounds(self):
+        return self.stats.bounds
+
+    def to_dataset(self) -> Dataset:
+        """Load all partitions into one in-memory dataset"""
+        dataset = Dataset(join(self.path, PARTITION_GLOB))
+        dataset.name = self.name
+        dataset.crs = self.crs
+        return dataset
+
+
+def _map_partition(task) -> None:
+    in_path, out_path, crs, cls, method, args, kwargs = task
+    dataset = Dataset(in_path)
+    dataset.crs = dataset.crs or crs
+    result = getattr(cls(dataset), method)(*args, **kwargs)
+    result.crs = result.crs or dataset.crs
+    _replace_partition(out_path, result)
+
+
+def _replace_partition(out_path, dataset) -> None:
+    """Atomically replace a partition directory by a single-file partition"""
+    tmp_path = f"{out_path}.tmp"
+    old_path = f"{out_path}.old"
+    for path in (tmp_path, old_path):
+        if exists(path):
+            shutil.rmtree(path)
+    os.makedirs(tmp_path)
+    if len(dataset.df):
+        dataset.to_parquet(join(tmp_path, "00000.parquet"))
+    if exists(out_path):
+        os.replace(out_path, old_path)
+    os.replace(tmp_path, out_path)
+    if exists(old_path):
+        shutil.rmtree(old_path)
+
+
+def _next_file(partition_dir) -> str:
+    os.makedirs(partition_dir, exist_ok=True)
+    n_files = len(glob(join(partition_dir, "*.parquet")))
+    return join(partition_dir, f"{n_files:05d}.parquet")
+
+
+def _partition_stats(path) -> DatasetStatistics:
+    import pyarrow.parquet as pq
+
+    files = sorted(glob(join(path, "*.parquet")))
+    stats = None
+    for file in files:
+        metadata = pq.read_schema(file).metadata or {}
+        meta = json.loads(metadata.get(METADATA_KEY, b"{}"))
+        if "stats" in meta:
+            file_stats = DatasetStatistics.from_dict(meta["stats"])
+        else:
+            file_stats = Dataset(file).stats
+        stats = file_stats if stats is None else stats.merge(file_stats)
+    if len(files) > 1:
+        names = pq.read_schema(files[0]).names
+        columns = [col for col in [TRAJ_ID, MOVER_ID] if col in names]
+        ids, _ = read_parquet(path, columns=columns)
+        if TRAJ_ID in ids.columns:
+            stats.n_trajs = ids[TRAJ_ID].nunique()
+        if MOVER_ID in ids.columns:
+            stats.n_movers = ids[MOVER_ID].nunique()
+    return stats
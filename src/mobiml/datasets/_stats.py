@@ -0,0 +1,201 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from mobiml.datasets.utils import MOVER_ID, TIMESTAMP, TRAJ_ID
+
+STATS_SUFFIX = ".stats.json"
+
+
+class DatasetStatistics:
+    """
+    Summary statistics of a dataset's points.
+
+    Statistics are computed in one pass over the frame and can be merged, so
+    that datasets built from several parts (e.g. appends) do not have to be
+    scanned again. They are stored with Parquet and Feather outputs.
+
+    Attributes
+    ----------
+    bounds : tuple
+        (min_x, min_y, max_x, max_y), None if there are no coordinates
+    time_range : tuple
+        (min, max) timestamp, None if there are no timestamps
+    n_rows : int
+        Number of points
+    n_trajs : int
+        Number of distinct trajectories, None if unknown
+    n_movers : int
+        Number of distinct movers, None if unknown
+    columns : dict
+        (min, max) per numeric column
+    """
+
+    def __init__(
+        self,
+        bounds=None,
+        time_range=None,
+        n_rows=0,
+        n_trajs=None,
+        n_movers=None,
+        columns=None,
+        traj_ids=None,
+        mover_ids=None,
+    ) -> None:
+        self.bounds = bounds
+        self.time_range = time_range
+        self.n_rows = n_rows
+        self.n_trajs = n_trajs
+        self.n_movers = n_movers
+        self.columns = columns or {}
+        # distinct ids are kept in memory to merge exact counts, but not stored
+        self._traj_ids = traj_ids
+        self._mover_ids = mover_ids
+
+    def __repr__(self) -> str:
+        return (
+            f"DatasetStatistics(n_rows={self.n_rows}, n_trajs={self.n_trajs}, "
+            f"n_movers={self.n_movers}, bounds={self.bounds}, "
+            f"time_range={self.time_range})"
+        )
+
+    @classmethod
+    def from_df(cls, df, x=None, y=None) -> "DatasetStatistics":
+        """Compute the statistics of a point frame with coordinate arrays x/y"""
+        if x is None and "x" in df.columns:
+            x, y = df["x"].to_numpy(), df["y"].to_numpy()
+        bounds = None
+        if x is not None and len(x) and not np.isnan(x).all():
+            bounds = (np.nanmin(x), np.nanmin(y), np.nanmax(x), np.nanmax(y))
+            bounds = tuple(float(v) for v in bounds)
+
+        time_range = None
+        if TIMESTAMP in df.columns and df[TIMESTAMP].notna().any():
+            time_range = (df[TIMESTAMP].min(), df[TIMESTAMP].max())
+
+        ids = {}
+        for col in [TRAJ_ID, MOVER_ID]:
+            ids[col] = pd.unique(df[col].dropna()) if col in df.columns else None
+
+        columns = {}
+        for col in df.columns:
+            series = df[col]
+            if (
+                col in ["x", "y"]
+                or not pd.api.types.is_numeric_dtype(series)
+                or pd.api.types.is_bool_dtype(series)
+                or not series.notna().any()
+            ):
+                continue
+            columns[col] = (_scalar(series.min()), _scalar(series.max()))
+
+        return cls(
+            bounds=bounds,
+            time_range=time_range,
+            n_rows=len(df),
+            n_trajs=None if ids[TRAJ_ID] is None else len(ids[TRAJ_ID]),
+            n_movers=None if ids[MOVER_ID] is None else len(ids[MOVER_ID]),
+            columns=columns,
+            traj_ids=ids[TRAJ_ID],
+            mover_ids=ids[MOVER_ID],
+        )
+
+    def merge(self, other, disjoint=False) -> "DatasetStatistics":
+        """
+        Statistics of the union of the points of both statistics.
+
+        With ``disjoint=True``, the two sides are known to share no
+        trajectories and movers, so distinct counts can be added up even if
+        the ids are not available.
+        """
+        if self.bounds is None or other.bounds is None:
+            bounds = self.bounds or other.bounds
+        else:
+            bounds = tuple(
+                min(a, b) if i < 2 else max(a, b)
+                for i, (a, b) in enumerate(zip(self.bounds, other.bounds))
+            )
+        if self.time_range is None or other.time_range is None:
+            time_range = self.time_range or other.time_range
+        else:
+            time_range = (
+                min(self.time_range[0], other.time_range[0]),
+                max(self.time_range[1], other.time_range[1]),
+            )
+
+        columns = dict(self.columns)
+        for col, (col_min, col_max) in other.columns.items():
+            if col in columns:
+                col_min = min(columns[col][0], col_min)
+                col_max = max(columns[col][1], col_max)
+            columns[col] = (col_min, col_max)
+
+        traj_ids = _merge_ids(self._traj_ids, other._traj_ids)
+        mover_ids = _merge_ids(self._mover_ids, other._mover_ids)
+        n_trajs = _merge_count(traj_ids, self.n_trajs, other.n_trajs, disjoint)
+        n_movers = _merge_count(mover_ids, self.n_movers, other.n_movers, disjoint)
+        return DatasetStatistics(
+            bounds=bounds,
+            time_range=time_range,
+            n_rows=self.n_rows + other.n_rows,
+            n_trajs=n_trajs,
+            n_movers=n_movers,
+            columns=columns,
+            traj_ids=traj_ids,
+            mover_ids=mover_ids,
+        )
+
+    def to_dict(self) -> dict:
+        time_range = None
+        if self.time_range is not None:
+            time_range = [pd.Timestamp(t).isoformat() for t in self.time_range]
+        return {
+            "bounds": None if self.bounds is None else list(self.bounds),
+            "time_range": time_range,
+            "n_rows": self.n_rows,
+            "n_trajs": self.n_trajs,
+            "n_movers": self.n_movers,
+            "columns": {col: list(v) for col, v in self.columns.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, d) -> "DatasetStatistics":
+        time_range = d.get("time_range")
+        if time_range is not None:
+            time_range = tuple(pd.Timestamp(t) for t in time_range)
+        return cls(
+            bounds=None if d.get("bounds") is None else tuple(d["bounds"]),
+            time_range=time_range,
+            n_rows=d.get("n_rows", 0),
+            n_trajs=d.get("n_trajs"),
+            n_movers=d.get("n_movers"),
+            columns={col: tuple(v) for col, v in d.get("columns", {}).items()},
+        )
+
+    def to_json(self, path) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def read_json(cls, path) -> "DatasetStatistics":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def _merge_ids(a, b):
+    if a is None or b is None:
+        return None
+    return pd.unique(np.concatenate([a, b]))
+
+
+def _merge_count(ids, a, b, disjoint):
+    if ids is not None:
+        return len(ids)
+    if disjoint and a is not None and b is not None:
+        return a + b
+    return None
+
+
+def _scalar(value):
+    return value.item() if hasattr(value, "item") else value
@@ -1,11 +1,14 @@
+import logging
 import pandas as pd
-from datetime import datetime
-from zipfile import ZipFile
+from os.path import exists, splitext
 
 from mobiml.datasets import Dataset, SPEED, DIRECTION, MOVER_ID, TIMESTAMP, TRAJ_ID
+from mobiml.datasets.utils import expand_path, iter_csv_chunks
 
 SHIPTYPE = "ship_type"
 
+logger = logging.getLogger(__name__)
+
 
 class AISDK(Dataset):
     name = "Danish AIS (AISDK)"
@@ -27,6 +30,17 @@ class AISDK(Dataset):
         "Ship type",
     ]
     TIME_FORMAT = "%d/%m/%Y %H:%M:%S"
+    csv_schema = {
+        "# Timestamp": "timestamp[s]",
+        "Type of mobile": "dictionary",
+        "MMSI": "uint32",
+        "Navigational status": "dictionary",
+        "SOG": "float32",
+        "COG": "float32",
+        "Name": "dictionary",
+        "Ship type": "dictionary",
+    }
+    csv_time_format = TIME_FORMAT
 
     def __init__(
         self,
@@ -36,6 +50,7 @@ class AISDK(Dataset):
         max_lon=None,
         max_lat=None,
         *args,
+        filter_invalid=True,
         **kwargs,
     ) -> None:
         self.min_lon = min_lon
@@ -43,19 +58,11 @@ class AISDK(Dataset):
         self.max_lon = max_lon
         self.max_lat = max_lat
         super().__init__(path, *args, **kwargs)
-        if (
-            (self.min_lat is not None)
-            & (self.max_lat is not None)
-            & (self.min_lon is not None)
-            & (self.max_lon is not None)
-        ):
-            self.df = self.df[
-                (self.df.Latitude >= self.min_lat)
-                & (self.df.Latitude <= self.max_lat)
-                & (self.df.Longitude >= self.min_lon)
-                & (self.df.Longitude <= self.max_lon)
-            ]
-        self.df = self.df[self.df.SOG > 0]
+        if filter_invalid and not _is_csv_source(path):
+            # records read from CSV files are already filtered by read_csv
+            self.df = filter_ais_records(
+                self.df, self.min_lon, self.min_lat, self.max_lon, self.max_lat
+            )
         self.df.rename(
             columns={
                 "# Timestamp": "t",
@@ -88,34 +95,86 @@ class AISDK(Dataset):
                 del self.df[col]
             else:
                 pass
-        print(f"{datetime.now()} Loaded Dataframe with {len(self.df)} rows.")
-
-    def load_df_from_zip_archive(self, path) -> pd.DataFrame:
-        """Load the AIS records from all CSVs in the provided ZIP archive path"""
-
-        def load_single_csv(csv_name) -> pd.DataFrame:
-            print(f"{datetime.now()} Loading {csv_name} ...")
-            tmp_df = pd.read_csv(ZipFile(path).open(csv_name), usecols=self.COLS)
-            if (
-                (self.min_lat is not None)
-                & (self.max_lat is not None)
-                & (self.min_lon is not None)
-                & (self.max_lon is not None)
-            ):
-                tmp_df = tmp_df[
-                    (tmp_df.Latitude >= self.min_lat)
-                    & (tmp_df.Latitude <= self.max_lat)
-                    & (tmp_df.Longitude >= self.min_lon)
-                    & (tmp_df.Longitude <= self.max_lon)
-                ]
-            tmp_df = tmp_df[tmp_df.SOG > 0]
-            return tmp_df
-
-        df = pd.concat(
-            [load_single_csv(csv_name) for csv_name in ZipFile(path).namelist()],
-            ignore_index=True,
+        self.set_coordinate_columns()
+        logger.info("Loaded Dataframe with %d rows.", len(self.df))
+
+    def read_csv(self, path_or_buffer, *args, **kwargs) -> pd.DataFrame:
+        """Read the AIS records of a CSV file, see ``filter_ais_records``"""
+        kwargs.setdefault("usecols", self.COLS)
+        df = super().read_csv(path_or_buffer, *args, **kwargs)
+        return filter_ais_records(
+            df, self.min_lon, self.min_lat, self.max_lon, self.max_lat
+        )
+
+    @classmethod
+    def iter_chunks(cls, path, chunksize=1_000_000, bbox=None, *args, **kwargs):
+        """
+        Iterate over the AIS records in a CSV file or ZIP archive in chunks.
+
+        Records are parsed ``chunksize`` rows at a time, restricted to the
+        columns in ``AISDK.COLS`` and filtered by ``bbox`` and ``SOG > 0``
+        before being normalized, so memory use is bounded by the chunk size
+        rather than the size of the archive.
+
+        Parameters
+        ----------
+        path : str
+            Path or glob pattern of AISDK CSV files or ZIP archives
+        chunksize : int
+            Number of CSV rows to parse at a time
+        bbox : tuple
+            Optional (min_lon, min_lat, max_lon, max_lat) filter
+
+        Yields
+        ------
+        AISDK
+            Normalized dataset for every non-empty chunk
+
+        Examples
+        --------
+        >>> for batch in AISDK.iter_chunks("aisdk-2018-02.zip", bbox=(8, 54, 13, 58)):
+        ...     TrajectoryFilter(batch).filter_min_pts(min_pts=2)
+        """
+        paths = expand_path(path)
+        if not paths or not all(exists(p) for p in paths):
+            raise ValueError(
+                f"Error reading from {path}: \r\n"
+                + f"Please specify the path to the '{cls.name}' file {cls.file_name}"
+            )
+        bbox = bbox if bbox is not None else (None, None, None, None)
+        for chunk in iter_csv_chunks(path, chunksize=chunksize, usecols=cls.COLS):
+            chunk = filter_ais_records(chunk, *bbox)
+            if len(chunk) > 0:
+                yield cls(
+                    chunk.reset_index(drop=True), *args, filter_invalid=False, **kwargs
+                )
+
+
+def _is_csv_source(path) -> bool:
+    """Whether the data is loaded from CSV files or ZIP archives of CSVs"""
+    return isinstance(path, str) and all(
+        splitext(p)[1] in [".csv", ".zip"] for p in expand_path(path)
+    )
+
+
+def filter_ais_records(
+    df, min_lon=None, min_lat=None, max_lon=None, max_lat=None
+) -> pd.DataFrame:
+    """Keep the raw AIS records within the bounding box that have SOG > 0"""
+    mask = df.SOG > 0
+    if (
+        (min_lat is not None)
+        & (max_lat is not None)
+        & (min_lon is not None)
+        & (max_lon is not None)
+    ):
+        mask &= (
+            (df.Latitude >= min_lat)
+            & (df.Latitude <= max_lat)
+            & (df.Longitude >= min_lon)
+            & (df.Longitude <= max_lon)
         )
-        return df
+    return df[mask]
 
 
 class PreprocessedAISDK(Dataset):
@@ -1,7 +1,10 @@
-import os
+import logging
 import pandas as pd
 
 from mobiml.datasets import Dataset, SPEED, DIRECTION, MOVER_ID, TIMESTAMP
+from mobiml.datasets.utils import mid_mask
+
+logger = logging.getLogger(__name__)
 
 
 class BrestAIS(Dataset):
@@ -11,6 +14,14 @@ class BrestAIS(Dataset):
     traj_id = "sourcemmsi"
     mover_id = "sourcemmsi"
     crs = 4326
+    csv_schema = {
+        "sourcemmsi": "uint32",
+        "navigationalstatus": "int8",
+        "speedoverground": "float32",
+        "courseoverground": "float32",
+        "trueheading": "int16",
+        "ts": "int64",
+    }
 
     def __init__(self, path, *args, **kwargs) -> None:
         apply_mid_filter = kwargs.pop("filter_invalid_mmsis", False)
@@ -28,22 +39,15 @@ class BrestAIS(Dataset):
         )
         self.df[TIMESTAMP] = pd.to_datetime(self.df["t"], unit="s")
         self.df.drop(columns=["t"], inplace=True)
+        self.set_coordinate_columns()
 
         if apply_mid_filter:
             self.filter_by_mid()
 
-        print(f"Loaded Dataframe with {len(self.df)} rows.")
+        logger.info("Loaded Dataframe with %d rows.", len(self.df))
 
     def filter_by_mid(self):
-        wd = os.path.dirname(os.path.realpath(__file__))
-        mid_whitelist = pd.read_csv(os.path.join(wd, "ais_mid_whitelist.csv"))
-        self.df = self.df.loc[
-            self.df[MOVER_ID]
-            .astype(str)
-            .str.zfill(9)
-            .str[:3]
-            .isin(mid_whitelist.MID.astype(str))
-        ].copy()
+        self.df = self.df.loc[mid_mask(self.df[MOVER_ID])].copy()
 
 
 class PreprocessedBrestAIS(Dataset):
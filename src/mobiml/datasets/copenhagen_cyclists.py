@@ -1,7 +1,18 @@
+import logging
 from datetime import datetime, timedelta
 
+import numpy as np
+
 from mobiml.datasets import Dataset, ROWNUM, TIMESTAMP
 
+# some educated guessing going on here:
+# the paper states that the video covers 2021-06-09 07:00-08:00
+T0 = datetime(2021, 6, 9, 7, 0, 0)
+FRAME_DURATION = timedelta(seconds=2)
+
+
+logger = logging.getLogger(__name__)
+
 
 class CopenhagenCyclists(Dataset):
     name = "Copenhagen Cyclists"
@@ -14,16 +25,11 @@ class CopenhagenCyclists(Dataset):
     def __init__(self, path, drop_extra_cols=True, *args, **kwargs) -> None:
         super().__init__(path, *args, **kwargs)
 
-        def _compute_datetime(row) -> datetime:
-            # some educated guessing going on here:
-            # the paper states that the video covers 2021-06-09 07:00-08:00
-            t0 = datetime(2021, 6, 9, 7, 0, 0)
-            offset = (row["frame_in"] + row[ROWNUM]) * timedelta(seconds=2)
-            return t0 + offset
-
-        self.merge_xcol_and_ycol_to_xycol("xs_640x360", "ys_640x360")
-        self.explode_coordinate_list()
-        self.df[TIMESTAMP] = self.df.apply(_compute_datetime, axis=1)
+        self.explode_coordinate_lists("xs_640x360", "ys_640x360")
+        frames = self.df["frame_in"].to_numpy() + self.df[ROWNUM].to_numpy()
+        self.df[TIMESTAMP] = np.datetime64(T0, "ns") + frames * np.timedelta64(
+            FRAME_DURATION, "ns"
+        )
         self.df.drop(columns=["frame_in"], inplace=True)
         if drop_extra_cols:
             self.df.drop(
@@ -39,4 +45,4 @@ class CopenhagenCyclists(Dataset):
                 ],
                 inplace=True,
             )
-        print(f"Loaded Dataframe with {len(self.df)} rows.")
+        logger.info("Loaded Dataframe with %d rows.", len(self.df))
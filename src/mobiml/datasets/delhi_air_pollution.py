@@ -1,5 +1,9 @@
+import logging
+
 from mobiml.datasets import Dataset, TIMESTAMP
 
+logger = logging.getLogger(__name__)
+
 
 class DelhiAirPollution(Dataset):
     name = "Delhi Air Pollution"
@@ -8,6 +12,14 @@ class DelhiAirPollution(Dataset):
     traj_id = "deviceId"
     mover_id = "deviceId"
     crs = 4326
+    csv_schema = {
+        "uid": "string",
+        "dateTime": "string",
+        "deviceId": "string",
+        "pm1_0": "float32",
+        "pm2_5": "float32",
+        "pm10": "float32",
+    }
 
     def __init__(self, path, *args, **kwargs) -> None:
         super().__init__(path, *args, **kwargs)
@@ -21,5 +33,6 @@ class DelhiAirPollution(Dataset):
             inplace=True,
         )
         self.df.drop(columns=["Unnamed: 0"], inplace=True)
+        self.set_coordinate_columns()
 
-        print(f"Loaded Dataframe with {len(self.df)} rows.")
+        logger.info("Loaded Dataframe with %d rows.", len(self.df))
@@ -1,5 +1,9 @@
+import logging
+
 from mobiml.datasets import Dataset
 
+logger = logging.getLogger(__name__)
+
 
 class MovebankGulls(Dataset):
     name = "Movebank Migrating Gulls"
@@ -23,4 +27,4 @@ class MovebankGulls(Dataset):
                 ],
                 inplace=True,
             )
-        print(f"Loaded Dataframe with {len(self.df)} rows.")
+        logger.info("Loaded Dataframe with %d rows.", len(self.df))
@@ -1,12 +1,16 @@
-from datetime import timedelta
+import logging
+import numpy as np
 
 from mobiml.datasets import (
     Dataset,
     TIMESTAMP,
-    COORDS,
     ROWNUM,
-    unixtime_to_datetime,
 )
+from mobiml.datasets.utils import parse_number_lists, unixtime_to_local_datetime
+
+SAMPLING_INTERVAL_SEC = 15
+
+logger = logging.getLogger(__name__)
 
 
 class PortoTaxis(Dataset):
@@ -16,18 +20,26 @@ class PortoTaxis(Dataset):
     traj_id = "TRIP_ID"
     mover_id = "TAXI_ID"
     crs = 4326
+    csv_schema = {
+        "TRIP_ID": "uint64",
+        "CALL_TYPE": "dictionary",
+        "TAXI_ID": "uint32",
+        "TIMESTAMP": "int64",
+        "DAY_TYPE": "dictionary",
+        "MISSING_DATA": "bool",
+        "POLYLINE": "string",
+    }
 
     def __init__(self, path, *args, **kwargs) -> None:
         super().__init__(path, *args, **kwargs)
 
-        def _compute_datetime(row):
-            t0 = unixtime_to_datetime(row["TIMESTAMP"])
-            offset = row[ROWNUM] * timedelta(seconds=15)
-            return t0 + offset
-
-        self.df.POLYLINE = self.df.POLYLINE.apply(eval)  # string to list
-        self.df.rename(columns={"POLYLINE": COORDS}, inplace=True)
-        self.explode_coordinate_list()
-        self.df[TIMESTAMP] = self.df.apply(_compute_datetime, axis=1)
+        xy, counts = parse_number_lists(self.df.POLYLINE, dtype=self.coord_dtype)
+        self.explode_flat_coordinates(
+            xy[0::2], xy[1::2], counts // 2, drop=["POLYLINE"]
+        )
+        unix_time = self.df["TIMESTAMP"].to_numpy(dtype=np.int64) + (
+            self.df[ROWNUM].to_numpy() * SAMPLING_INTERVAL_SEC
+        )
+        self.df[TIMESTAMP] = unixtime_to_local_datetime(unix_time)
         self.df.drop(columns=["TIMESTAMP"], inplace=True)
-        print(f"Loaded Dataframe with {len(self.df)} rows.")
+        logger.info("Loaded Dataframe with %d rows.", len(self.df))
@@ -0,0 +1,376 @@
+"""
+Synthetic AIS-like, taxi-like and cyclist-like trajectories.
+
+Generators produce points with the normalized columns of a ``Dataset``
+(trajectory and mover id, timestamp, x/y, speed and direction), so that
+loaders, preprocessors and benchmarks can be exercised at any scale without
+real data. Points are generated in chunks of whole movers, with a random
+generator seeded per chunk, so the output only depends on the parameters,
+the seed and the chunk size. Large datasets are written chunk by chunk,
+optionally in parallel, to a ``PartitionedDataset``.
+
+Examples
+--------
+>>> ais = SyntheticAIS(seed=1).generate(1_000_000)
+>>> taxis = SyntheticTaxis(bbox=(-8.7, 41.1, -8.5, 41.2), outlier_ratio=0.001)
+>>> store = SyntheticAIS().to_parquet("ais_store", 100_000_000, n_jobs=8)
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from os.path import basename
+
+import numpy as np
+import pandas as pd
+
+from mobiml.datasets._dataset import Dataset
+from mobiml.datasets._index import segmented_cumsum
+from mobiml.datasets._partitioned import PartitionedDataset
+from mobiml.datasets.utils import (
+    DIRECTION,
+    MOVER_ID,
+    SPEED,
+    TIMESTAMP,
+    TRAJ_ID,
+)
+from mobiml.instrumentation import instrument
+
+METERS_PER_DEGREE = 111_320
+KNOTS = 1852 / 3600
+KMH = 1 / 3.6
+
+logger = logging.getLogger(__name__)
+
+
+class SyntheticTraffic:
+    """
+    Generator of random-walk trajectories with realistic sampling.
+
+    Every mover has ``trajs_per_mover`` consecutive trajectories of
+    ``points_per_traj`` points, separated by breaks. Points are reported
+    every ``interval`` seconds, with occasional gaps. Each trajectory has a
+    cruise speed drawn from the speed profile and changes its heading by a
+    random turn at every point. Positions are kept within ``bbox`` by
+    reflecting at its borders, except for the outliers, which are displaced
+    by ``outlier_distance`` meters.
+
+    Subclasses configure the generator with class attributes, which can be
+    overridden per instance with keyword arguments.
+
+    Parameters
+    ----------
+    seed : int
+        Seed of the random generator
+    **kwargs
+        Overrides of the class attributes below
+
+    Attributes
+    ----------
+    bbox : tuple
+        (min x, min y, max x, max y) of the start positions
+    crs : int
+        CRS of the coordinates; with 4326, steps in meters are converted to
+        degrees, otherwise coordinates are in meters
+    interval : tuple
+        Min and max reporting interval in seconds
+    gap_probability : float
+        Probability of a reporting gap before a point
+    gap : tuple
+        Min and max gap duration in seconds
+    trip_break : tuple
+        Min and max time between consecutive trajectories of a mover, seconds
+    speed : tuple
+        Mean, standard deviation, min and max cruise speed in ``speed_unit``
+    speed_jitter : float
+        Relative standard deviation of the speed around the cruise speed
+    speed_unit : float
+        Meters per second of one unit of the speed column
+    turn : float
+        Standard deviation of the heading change per point in degrees
+    outlier_ratio : float
+        Share of points displaced by ``outlier_distance`` meters
+    first_mover_id : int
+        Id of the first mover, None for datasets without mover ids
+    categories : dict
+        Categorical mover attributes, e.g. {"ship_type": ["Cargo", "Tanker"]}
+    """
+
+    name = "Synthetic traffic"
+    crs = None
+    bbox = (0.0, 0.0, 10_000.0, 10_000.0)
+    start = "2024-01-01"
+    period_days = 1.0
+    points_per_traj = 100
+    trajs_per_mover = 1
+    interval = (1, 1)
+    gap_probability = 0.0
+    gap = (60, 600)
+    trip_break = (600, 3600)
+    speed = (10.0, 3.0, 0.0, 30.0)
+    speed_jitter = 0.1
+    speed_unit = 1.0
+    turn = 10.0
+    outlier_ratio = 0.0
+    outlier_distance = 10_000.0
+    first_mover_id = 1
+    categories = {}
+
+    def __init__(self, seed=0, **kwargs) -> None:
+        self.seed = seed
+        for key, value in kwargs.items():
+            if key.startswith("_") or not hasattr(type(self), key):
+                raise TypeError(f"Unknown parameter {key!r}")
+            setattr(self, key, value)
+        if self.points_per_traj < 1 or self.trajs_per_mover < 1:
+            raise ValueError("points_per_traj and trajs_per_mover must be positive")
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(seed={self.seed})"
+
+    @property
+    def points_per_mover(self) -> int:
+        return self.points_per_traj * self.trajs_per_mover
+
+    def chunks(self, n_points, chunk_size=1_000_000) -> list:
+        """
+        (chunk number, first mover, number of points) of every chunk.
+
+        Chunks contain whole movers, about ``chunk_size`` points each.
+        """
+        movers_per_chunk = max(1, chunk_size // self.points_per_mover)
+        rows_per_chunk = movers_per_chunk * self.points_per_mover
+        return [
+            (i, i * movers_per_chunk, min(rows_per_chunk, n_points - first_row))
+            for i, first_row in enumerate(range(0, n_points, rows_per_chunk))
+        ]
+
+    def frame(self, n_points, chunk_size=1_000_000) -> pd.DataFrame:
+        """Points as a DataFrame sorted by mover, trajectory and timestamp"""
+        frames = [self.chunk(*chunk) for chunk in self.chunks(n_points, chunk_size)]
+        if not frames:
+            return self.chunk(0, 0, 0)
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    @instrument()
+    def generate(self, n_points, chunk_size=1_000_000) -> Dataset:
+        """Generate ``n_points`` points in memory"""
+        return self._dataset(self.frame(n_points, chunk_size))
+
+    def iter_chunks(self, n_points, chunk_size=1_000_000):
+        """Yield the points as datasets of about ``chunk_size`` points"""
+        for chunk in self.chunks(n_points, chunk_size):
+            yield self._dataset(self.chunk(*chunk))
+
+    @instrument()
+    def to_parquet(
+        self, path, n_points, chunk_size=1_000_000, n_partitions=16, n_jobs=1
+    ) -> PartitionedDataset:
+        """
+        Generate ``n_points`` points into a new PartitionedDataset at ``path``.
+
+        Every chunk is generated and written to its partitions by a worker,
+        so memory use is bounded by ``n_jobs`` chunks. With ``n_jobs=-1``,
+        all CPUs are used.
+        """
+        if os.path.isdir(path) and os.listdir(path):
+            raise ValueError(f"{path} is not empty")
+        key = TRAJ_ID if self.first_mover_id is None else MOVER_ID
+        pds = PartitionedDataset.create(path, n_partitions, key, self.name, self.crs)
+        tasks = [(self, path, chunk) for chunk in self.chunks(n_points, chunk_size)]
+        n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+        if n_jobs == 1 or len(tasks) < 2:
+            results = list(map(_write_chunk, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as pool:
+                results = list(pool.map(_write_chunk, tasks))
+        for written in results:
+            for part in written:
+                pds._bump(basename(pds._partition_dir(part)))
+        pds._save_manifest()
+        logger.info(
+            "Generated %d points in %d chunks to %s", n_points, len(tasks), path
+        )
+        return pds
+
+    def chunk(self, number, first_mover, n_points) -> pd.DataFrame:
+        """Generate the points of a chunk starting with the mover ``first_mover``"""
+        rng = np.random.default_rng([self.seed, number])
+        row = np.arange(n_points)
+        local_traj = row // self.points_per_traj
+        n_trajs = int(local_traj[-1]) + 1 if n_points else 0
+        traj = first_mover * self.trajs_per_mover + local_traj
+        starts = np.arange(n_trajs) * self.points_per_traj
+        lengths = np.diff(np.append(starts, n_points))
+
+        dt = self._intervals(rng, starts, n_points)
+        t = self._timestamps(rng, dt, traj, starts, lengths)
+        speed, direction = self._motion(rng, starts, lengths)
+        x, y = self._positions(rng, speed, direction, dt, starts, lengths)
+
+        mover = traj // self.trajs_per_mover
+        columns = {TRAJ_ID: traj}
+        if self.first_mover_id is not None:
+            columns[MOVER_ID] = self.first_mover_id + mover
+        columns.update(
+            {
+                TIMESTAMP: t,
+                "x": x,
+                "y": y,
+                SPEED: speed.astype(np.float32),
+                DIRECTION: direction.astype(np.float32),
+            }
+        )
+        for col, values in self.categories.items():
+            columns[col] = pd.Categorical.from_codes(mover % len(values), values)
+        return pd.DataFrame(columns)
+
+    def _intervals(self, rng, starts, n_points) -> np.ndarray:
+        """Seconds since the previous point, 0 at trajectory starts"""
+        dt = rng.integers(self.interval[0], self.interval[1] + 1, n_points)
+        gaps = rng.random(n_points) < self.gap_probability
+        dt[gaps] = rng.integers(self.gap[0], self.gap[1] + 1, gaps.sum())
+        dt[starts] = 0
+        return dt
+
+    def _timestamps(self, rng, dt, traj, starts, lengths) -> np.ndarray:
+        n_points, n_trajs = len(traj), len(starts)
+        elapsed = segmented_cumsum(dt, starts)
+        if n_points == 0:
+            return np.array([], dtype="datetime64[ns]")
+
+        # consecutive trajectories of a mover are separated by a break
+        durations = elapsed[starts + lengths - 1]
+        breaks = rng.integers(self.trip_break[0], self.trip_break[1] + 1, n_trajs)
+        traj_mover = traj[starts] // self.trajs_per_mover
+        mover_starts = np.flatnonzero(np.diff(traj_mover, prepend=-1))
+        spans = durations + breaks
+        offsets = segmented_cumsum(spans, mover_starts) - spans
+        period = max(1, int(self.period_days * 86400))
+        t0 = rng.integers(0, period, len(mover_starts))
+        mover_lengths = np.diff(np.append(mover_starts, n_trajs))
+        traj_t0 = np.repeat(t0, mover_lengths) + offsets
+        seconds = np.repeat(traj_t0, lengths) + elapsed
+        return np.datetime64(self.start, "ns") + seconds * np.timedelta64(1, "s")
+
+    def _motion(self, rng, starts, lengths):
+        n_points, n_trajs = int(lengths.sum()), len(starts)
+        mean, std, min_speed, max_speed = self.speed
+        cruise = rng.normal(mean, std, n_trajs)
+        jitter = 1 + rng.normal(0, self.speed_jitter, n_points)
+        speed = np.clip(np.repeat(cruise, lengths) * jitter, min_speed, max_speed)
+        turn = rng.normal(0, self.turn, n_points)
+        turn[starts] = rng.uniform(0, 360, n_trajs)
+        direction = np.mod(segmented_cumsum(turn, starts), 360)
+        return speed, direction
+
+    def _positions(self, rng, speed, direction, dt, starts, lengths):
+        n_points, n_trajs = len(speed), len(starts)
+        min_x, min_y, max_x, max_y = self.bbox
+        geographic = self.crs == 4326
+        step = speed * self.speed_unit * dt
+        rad = np.radians(direction)
+        dy = step * np.cos(rad)
+        if geographic:
+            dy = dy / METERS_PER_DEGREE
+        y0 = rng.uniform(min_y, max_y, n_trajs)
+        y = _reflect(
+            np.repeat(y0, lengths) + segmented_cumsum(dy, starts), min_y, max_y
+        )
+        dx = step * np.sin(rad)
+        if geographic:
+            dx = dx / (METERS_PER_DEGREE * np.cos(np.radians(y)))
+        x0 = rng.uniform(min_x, max_x, n_trajs)
+        x = _reflect(
+            np.repeat(x0, lengths) + segmented_cumsum(dx, starts), min_x, max_x
+        )
+
+        outliers = np.flatnonzero(rng.random(n_points) < self.outlier_ratio)
+        if len(outliers):
+            angle = rng.uniform(0, 2 * np.pi, len(outliers))
+            jump_y = self.outlier_distance * np.cos(angle)
+            jump_x = self.outlier_distance * np.sin(angle)
+            if geographic:
+                jump_x /= METERS_PER_DEGREE * np.cos(np.radians(y[outliers]))
+                jump_y /= METERS_PER_DEGREE
+            x[outliers] += jump_x
+            y[outliers] += jump_y
+        return x, y
+
+    def _dataset(self, df) -> Dataset:
+        return Dataset(df, name=self.name, crs=self.crs)
+
+
+class SyntheticAIS(SyntheticTraffic):
+    """Vessels in the Danish waters reporting every 5-15 s, speeds in knots"""
+
+    name = "Synthetic AIS"
+    crs = 4326
+    bbox = (8.0, 54.0, 13.0, 58.0)
+    start = "2018-02-01"
+    period_days = 20.0
+    points_per_traj = 500
+    trajs_per_mover = 2
+    interval = (5, 15)
+    gap_probability = 0.002
+    gap = (600, 3600)
+    trip_break = (3600, 6 * 3600)
+    speed = (12.0, 4.0, 0.1, 30.0)
+    speed_unit = KNOTS
+    turn = 3.0
+    outlier_distance = 50_000.0
+    first_mover_id = 219_000_000
+    categories = {"ship_type": ["Cargo", "Tanker", "Fishing", "Passenger", "Sailing"]}
+
+
+class SyntheticTaxis(SyntheticTraffic):
+    """Taxi trips in Porto reported every 15 s, speeds in km/h"""
+
+    name = "Synthetic Taxis"
+    crs = 4326
+    bbox = (-8.70, 41.10, -8.55, 41.20)
+    start = "2013-07-01"
+    period_days = 365.0
+    points_per_traj = 50
+    trajs_per_mover = 20
+    interval = (15, 15)
+    gap_probability = 0.001
+    gap = (60, 300)
+    trip_break = (300, 3600)
+    speed = (30.0, 10.0, 0.0, 90.0)
+    speed_jitter = 0.3
+    speed_unit = KMH
+    turn = 20.0
+    outlier_distance = 5_000.0
+    first_mover_id = 20_000_001
+
+
+class SyntheticCyclists(SyntheticTraffic):
+    """Cyclists crossing a 640x360 pixel video frame, sampled every 2 s"""
+
+    name = "Synthetic Cyclists"
+    crs = None
+    bbox = (0.0, 0.0, 640.0, 360.0)
+    start = "2021-06-09 07:00"
+    period_days = 1 / 24
+    points_per_traj = 30
+    interval = (2, 2)
+    speed = (10.0, 3.0, 0.0, 25.0)
+    turn = 5.0
+    outlier_distance = 100.0
+    first_mover_id = None
+
+
+def _reflect(values, low, high) -> np.ndarray:
+    """Fold values into [low, high] by reflecting them at the borders"""
+    width = high - low
+    if width <= 0:
+        return np.full_like(values, low)
+    folded = np.mod(values - low, 2 * width)
+    return low + np.where(folded > width, 2 * width - folded, folded)
+
+
+def _write_chunk(task) -> list:
+    generator, path, (number, first_mover, n_points) = task
+    dataset = generator._dataset(generator.chunk(number, first_mover, n_points))
+    return PartitionedDataset(path)._write_files(dataset, f"{number:05d}.parquet")
@@ -1,5 +1,13 @@
+import glob
+import logging
+import sys
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from shapely.geometry import Point
+from functools import lru_cache
+from os.path import dirname, join, realpath, splitext
+from zipfile import ZipFile
+import numpy as np
 import pandas as pd
 
 TRAJ_ID = "traj_id"
@@ -9,13 +17,28 @@ COORDS = "coordinates"
 ROWNUM = "running_number"
 SPEED = "speed"
 DIRECTION = "direction"
+MID_WHITELIST = join(dirname(realpath(__file__)), "ais_mid_whitelist.csv")
+
+logger = logging.getLogger(__name__)
 
 
 def unixtime_to_datetime(unix_time) -> datetime:
     return datetime.fromtimestamp(unix_time)
 
 
-def create_point(xy) -> Point:
+def unixtime_to_local_datetime(unix_time) -> np.ndarray:
+    """Vectorized ``unixtime_to_datetime``, i.e. naive datetimes in local time"""
+    t = pd.to_datetime(unix_time, unit="s")
+    if time.timezone != 0 or time.daylight:
+        from dateutil.tz import tzlocal
+
+        t = t.tz_localize("UTC").tz_convert(tzlocal()).tz_localize(None)
+    return t.to_numpy()
+
+
+def create_point(xy):  # -> shapely.Point
+    from shapely.geometry import Point
+
     try:
         return Point(xy)
     except TypeError:  # when there are nan values in the input data
@@ -37,9 +60,298 @@ def get_y_from_xy(df, xycol=COORDS) -> pd.Series:
     return df[xycol].apply(lambda xy: val_or_none(xy, 1))
 
 
+def get_x_y_arrays_from_xy(df, xycol=COORDS, dtype=np.float64):
+    """
+    Split a column of (x, y) pairs into two contiguous arrays.
+
+    Missing or malformed pairs (e.g. NaN after exploding an empty list) are
+    returned as NaN.
+    """
+    coords = df[xycol].to_numpy()
+    n = len(coords)
+    valid = np.fromiter(
+        (isinstance(xy, (list, tuple, np.ndarray)) and len(xy) >= 2 for xy in coords),
+        dtype=bool,
+        count=n,
+    )
+    x = np.full(n, np.nan, dtype=dtype)
+    y = np.full(n, np.nan, dtype=dtype)
+    if valid.any():
+        xy = np.array([xy[:2] for xy in coords[valid]], dtype=dtype)
+        x[valid] = xy[:, 0]
+        y[valid] = xy[:, 1]
+    return x, y
+
+
+def compact_series(series, categorical=True, max_category_ratio=0.5) -> pd.Series:
+    """
+    Downcast a numeric series, or convert a string series with repeated values
+    to a categorical. Other series are returned unchanged.
+    """
+    if pd.api.types.is_bool_dtype(series) or isinstance(
+        series.dtype, pd.CategoricalDtype
+    ):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        unsigned = len(series) == 0 or series.min() >= 0
+        return pd.to_numeric(series, downcast="unsigned" if unsigned else "integer")
+    if pd.api.types.is_float_dtype(series):
+        return series.astype(np.float32)
+    if (
+        categorical
+        and pd.api.types.is_object_dtype(series)
+        and pd.api.types.infer_dtype(series, skipna=True) == "string"
+        and series.nunique() <= max_category_ratio * len(series)
+    ):
+        return series.astype("category")
+    return series
+
+
+def list_lengths(series) -> np.ndarray:
+    """Length of the list in every row, 0 for missing values"""
+    return np.fromiter(
+        (len(v) if isinstance(v, (list, tuple, np.ndarray)) else 0 for v in series),
+        dtype=np.int64,
+        count=len(series),
+    )
+
+
+def parse_number_lists(series, dtype=np.float64):
+    """
+    Parse a column of list strings, e.g. "[1.5, 2]" or "[[-8.6,41.1],[-8.6,41.2]]".
+
+    All strings are parsed in one pass, without creating Python lists.
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray)
+        The flat values of all lists and the number of values per row
+    """
+    text = series.astype(str)
+    nonempty = text.str.contains(r"\d", regex=True).to_numpy()
+    counts = np.where(nonempty, text.str.count(",").to_numpy() + 1, 0)
+    joined = ",".join(text[nonempty]).translate({ord("["): " ", ord("]"): " "})
+    values = np.fromstring(joined, dtype=dtype, sep=",") if joined else np.array([])
+    if len(values) != counts.sum():
+        raise ValueError(f"Cannot parse the lists in column {series.name}")
+    return values.astype(dtype, copy=False), counts
+
+
+@lru_cache(maxsize=None)
+def mid_lookup(path=MID_WHITELIST) -> np.ndarray:
+    """
+    Boolean lookup array of the valid Maritime Identification Digits (MIDs).
+
+    ``mid_lookup()[mid]`` is True for the MIDs listed in the whitelist CSV.
+    The file is read once per process.
+    """
+    mids = pd.read_csv(path, usecols=["MID"])["MID"].to_numpy(dtype=np.int64)
+    lookup = np.zeros(1000, dtype=bool)
+    lookup[mids] = True
+    return lookup
+
+
+def mmsi_to_mid(mmsi) -> np.ndarray:
+    """
+    MID of MMSIs, i.e. the first 3 digits of the 9-digit zero-padded MMSI.
+
+    Computed with integer arithmetic, MMSIs with more than 9 digits use
+    their first 3 digits. Missing and negative MMSIs get -1.
+    """
+    values = np.asarray(mmsi)
+    if values.dtype.kind in "iu":
+        values = values.astype(np.int64, copy=False)
+        valid = values >= 0
+    else:
+        values = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(
+            dtype=np.float64, na_value=np.nan
+        )
+        valid = np.isfinite(values) & (values >= 0)
+        values = np.where(valid, values, 0).astype(np.int64)
+    n_digits = np.maximum(
+        np.searchsorted(10 ** np.arange(19, dtype=np.int64), values, side="right"),
+        9,
+    )
+    return np.where(valid, values // 10 ** (n_digits - 3), -1)
+
+
+def mid_mask(mmsi) -> np.ndarray:
+    """True where the MID of the MMSI is in the whitelist"""
+    mid = mmsi_to_mid(mmsi)
+    lookup = mid_lookup()
+    in_range = (mid >= 0) & (mid < len(lookup))
+    return in_range & lookup[np.where(in_range, mid, 0)]
+
+
 def get_point_from_xy(df, xycol=COORDS) -> pd.Series:
-    return df[xycol].apply(create_point)
+    import shapely
+
+    x, y = get_x_y_arrays_from_xy(df, xycol)
+    return pd.Series(shapely.points(x, y), index=df.index)
 
 
 def get_point_from_x_y(df, xcol="x", ycol="y") -> pd.Series:
-    return df.apply(lambda row: Point(row[xcol], row[ycol]), axis=1)
+    import shapely
+
+    points = shapely.points(
+        np.asarray(df[xcol], dtype=np.float64), np.asarray(df[ycol], dtype=np.float64)
+    )
+    return pd.Series(points, index=df.index)
+
+
+def is_geodataframe(df) -> bool:
+    """isinstance check that does not import geopandas if it is not loaded yet"""
+    gpd = sys.modules.get("geopandas")
+    return gpd is not None and isinstance(df, gpd.GeoDataFrame)
+
+
+def expand_path(path) -> list:
+    """Return the sorted list of files matching a path or glob pattern"""
+    if glob.has_magic(path):
+        return sorted(glob.glob(path))
+    return [path]
+
+
+def list_csv_parts(paths) -> list:
+    """
+    List the (path, member) CSV parts of CSV files and ZIP archives.
+
+    ``member`` is the name of a CSV in a ZIP archive, or None for CSV files.
+    The order of the parts is the order of ``paths`` and of the archive members.
+    """
+    parts = []
+    for path in paths:
+        if splitext(path)[1] == ".zip":
+            with ZipFile(path) as zip_file:
+                parts.extend((path, csv_name) for csv_name in zip_file.namelist())
+        else:
+            parts.append((path, None))
+    return parts
+
+
+@contextmanager
+def open_csv_part(path, member=None):
+    """Open a CSV part, i.e. a CSV file path or a CSV member of a ZIP archive"""
+    if member is None:
+        yield path
+        return
+    logger.info("Loading %s ...", member)
+    with ZipFile(path) as zip_file:
+        with zip_file.open(member) as csv_file:
+            yield csv_file
+
+
+def concat_frames(frames, **kwargs) -> pd.DataFrame:
+    """
+    Concatenate frames, keeping categorical columns categorical.
+
+    ``pd.concat`` falls back to object dtype for categoricals with different
+    categories, so the categories of such columns are unified first.
+    """
+    frames = list(frames)
+    for col in frames[0].columns if len(frames) > 1 else []:
+        dtypes = [frame[col].dtype for frame in frames if col in frame.columns]
+        if len(dtypes) < len(frames) or not all(
+            isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes
+        ):
+            continue
+        if all(dtype == dtypes[0] for dtype in dtypes):
+            continue
+        categories = (
+            dtypes[0].categories.append([d.categories for d in dtypes[1:]]).unique()
+        )
+        for i, frame in enumerate(frames):
+            frames[i] = frame = frame.copy(deep=False)
+            frame[col] = frame[col].cat.set_categories(categories)
+    return pd.concat(frames, **kwargs)
+
+
+def read_csv_arrow(
+    source, schema=None, time_format=None, usecols=None, nrows=None
+) -> pd.DataFrame:
+    """
+    Read a CSV using the multithreaded pyarrow CSV reader.
+
+    Parameters
+    ----------
+    source : str or file-like object
+        CSV to read
+    schema : dict
+        Column types by column name, as pyarrow type aliases (e.g. "uint32",
+        "float32", "timestamp[s]") or "dictionary" for dictionary-encoded
+        strings. Columns that are not in the CSV are ignored.
+    time_format : str
+        strptime format of timestamp columns (in addition to ISO 8601)
+    usecols : list
+        Columns to read
+    nrows : int
+        Number of rows to read
+
+    Returns
+    -------
+    pandas.DataFrame
+        Dictionary-encoded columns are returned as categoricals
+    """
+    import pyarrow as pa
+    from pyarrow import csv
+
+    column_types = {col: _arrow_type(name) for col, name in (schema or {}).items()}
+    convert_options = csv.ConvertOptions(
+        column_types=column_types,
+        timestamp_parsers=[time_format, csv.ISO8601] if time_format else None,
+        include_columns=list(usecols) if usecols is not None else None,
+        strings_can_be_null=True,
+    )
+    if nrows is None:
+        table = csv.read_csv(source, convert_options=convert_options)
+    else:
+        batches = []
+        n = 0
+        with csv.open_csv(source, convert_options=convert_options) as reader:
+            for batch in reader:
+                batches.append(batch)
+                n += batch.num_rows
+                if n >= nrows:
+                    break
+            table = pa.Table.from_batches(batches, schema=reader.schema)
+        table = table.slice(0, nrows)
+    df = table.to_pandas(coerce_temporal_nanoseconds=True)
+    # match the names pandas gives to columns without header
+    df.columns = [
+        col if col != "" else f"Unnamed: {i}" for i, col in enumerate(df.columns)
+    ]
+    return df
+
+
+def _arrow_type(name):
+    import pyarrow as pa
+
+    if name == "dictionary":
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.type_for_alias(name)
+
+
+def iter_csv_chunks(path, chunksize=None, **kwargs):
+    """
+    Yield DataFrames read from CSV files or from all CSVs in ZIP archives.
+
+    ``path`` may be a glob pattern. Every ZIP archive is only opened once. If
+    ``chunksize`` is None, every CSV is yielded as a whole.
+    """
+    for file_path in expand_path(path):
+        if splitext(file_path)[1] != ".zip":
+            yield from _read_csv(file_path, chunksize, **kwargs)
+            continue
+        with ZipFile(file_path) as zip_file:
+            for csv_name in zip_file.namelist():
+                logger.info("Loading %s ...", csv_name)
+                with zip_file.open(csv_name) as csv_file:
+                    yield from _read_csv(csv_file, chunksize, **kwargs)
+
+
+def _read_csv(path_or_buffer, chunksize=None, **kwargs):
+    if chunksize is None:
+        yield pd.read_csv(path_or_buffer, **kwargs)
+    else:
+        with pd.read_csv(path_or_buffer, chunksize=chunksize, **kwargs) as reader:
+            yield from reader
@@ -0,0 +1,276 @@
+"""
+Per-stage instrumentation of mobiml pipelines.
+
+Stages (loading, filtering, enriching, ...) are wrapped with the
+``instrument`` decorator or the ``stage`` context manager. Every invocation
+produces a record with its wall and CPU time, rows in/out, memory use and
+key parameters, which is passed to the registered hooks, e.g. a
+``JsonLinesWriter`` or a ``PrometheusTextfileWriter``. Progress messages go
+to the ``mobiml`` logger.
+
+Examples
+--------
+>>> from mobiml import instrumentation
+>>> instrumentation.add_hook(instrumentation.JsonLinesWriter("stages.jsonl"))
+>>> instrumentation.log_to_console()
+>>> ais = TrajectoryFilter(ais).filter_min_pts(min_pts=10)
+>>> instrumentation.disable()  # no records and no log messages, e.g. in hot loops
+"""
+
+import inspect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+logger = logging.getLogger("mobiml")
+logger.addHandler(logging.NullHandler())
+
+_hooks = []
+_enabled = True
+_level = logging.NOTSET
+_local = threading.local()
+_console_handler = None
+_PARAM_TYPES = (bool, int, float, str, type(None))
+
+
+def enable() -> None:
+    """Record stages and emit log messages (the default)"""
+    global _enabled
+    if not _enabled:
+        logger.setLevel(_level)
+    _enabled = True
+
+
+def disable() -> None:
+    """Switch off stage records and all mobiml log messages"""
+    global _enabled, _level
+    if _enabled:
+        _level = logger.level
+    _enabled = False
+    logger.setLevel(logging.CRITICAL + 1)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def add_hook(hook) -> None:
+    """Call ``hook(record)`` with the record dict of every finished stage"""
+    _hooks.append(hook)
+
+
+def remove_hook(hook) -> None:
+    _hooks.remove(hook)
+
+
+def log_to_console(level=logging.INFO) -> None:
+    """
+    Print mobiml log messages with a timestamp, like the former progress output.
+
+    Repeated calls replace the console handler instead of adding another one.
+    """
+    global _console_handler
+    if _console_handler is not None:
+        logger.removeHandler(_console_handler)
+    _console_handler = logging.StreamHandler()
+    _console_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    logger.addHandler(_console_handler)
+    logger.setLevel(level)
+
+
+@contextmanager
+def stage(name, /, rows_in=None, **params):
+    """
+    Record a stage invocation.
+
+    Yields the record dict, so that the stage can set ``rows_out`` or add
+    other fields before it is passed to the hooks. ``name`` is positional
+    only, so that a ``name`` parameter can be recorded. Nothing is measured
+    while instrumentation is disabled.
+    """
+    if not _enabled:
+        yield {}
+        return
+    stack = _stack()
+    record = {
+        "stage": name,
+        "parent": stack[-1]["stage"] if stack else None,
+        "start": datetime.now(timezone.utc).isoformat(),
+        "rows_in": rows_in,
+        "rows_out": None,
+        "params": params,
+    }
+    stack.append(record)
+    rss = current_rss()
+    wall, cpu = time.perf_counter(), time.process_time()
+    status = "error"
+    try:
+        yield record
+        status = "ok"
+    finally:
+        stack.pop()
+        record["wall_time"] = time.perf_counter() - wall
+        record["cpu_time"] = time.process_time() - cpu
+        rss_after = current_rss()
+        record["rss_delta"] = (
+            rss_after - rss if rss is not None and rss_after is not None else None
+        )
+        record["max_rss"] = max_rss()
+        record["status"] = status
+        logger.debug("%s finished in %.3f s", name, record["wall_time"])
+        for hook in list(_hooks):
+            hook(record)
+
+
+def instrument(name=None):
+    """
+    Decorate a function or method as a stage.
+
+    Methods are recorded as ``<class name>.<method name>``. Rows in are
+    taken from ``self.data`` (a Dataset or frame) if present, rows out from
+    the returned Dataset, frame or collection. Scalar arguments are recorded
+    as the stage parameters.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        is_method = next(iter(signature.parameters), None) == "self"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            bound = signature.bind_partial(*args, **kwargs)
+            params = {
+                key: value
+                for key, value in bound.arguments.items()
+                if key != "self" and isinstance(value, _PARAM_TYPES)
+            }
+            stage_name = name or func.__qualname__
+            rows_in = None
+            if is_method and args:
+                stage_name = name or f"{type(args[0]).__name__}.{func.__name__}"
+                rows_in = count_rows(getattr(args[0], "data", None))
+            with stage(stage_name, rows_in=rows_in, **params) as record:
+                result = func(*args, **kwargs)
+                record["rows_out"] = count_rows(result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def count_rows(obj):
+    """Number of rows of a Dataset, frame or TrajectoryCollection, else None"""
+    if obj is None:
+        return None
+    df = getattr(obj, "df", None)
+    if df is not None and hasattr(df, "__len__"):
+        return len(df)
+    if hasattr(obj, "shape"):
+        return obj.shape[0]
+    if hasattr(obj, "trajectories"):
+        return sum(len(traj.df) for traj in obj.trajectories)
+    return None
+
+
+def current_rss():
+    """Current resident set size of the process in bytes, None if unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):  # not on Linux
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def max_rss():
+    """
+    High-water mark of the resident set size of the process in bytes, i.e. the
+    largest RSS since the process started, None if unavailable
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _stack() -> list:
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+class JsonLinesWriter:
+    """Hook appending every stage record as a JSON line to ``path``"""
+
+    def __init__(self, path) -> None:
+        self.path = path
+
+    def __call__(self, record) -> None:
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+
+class PrometheusTextfileWriter:
+    """
+    Hook keeping per-stage totals in a Prometheus textfile.
+
+    The file is rewritten atomically after every stage, for the node
+    exporter's textfile collector.
+    """
+
+    METRICS = [
+        ("calls", "counter", "Number of stage invocations"),
+        ("wall_seconds", "counter", "Total wall time of the stage"),
+        ("cpu_seconds", "counter", "Total CPU time of the stage"),
+        ("rows_in", "counter", "Total rows passed into the stage"),
+        ("rows_out", "counter", "Total rows returned by the stage"),
+        ("rss_delta_bytes", "gauge", "Change of resident memory during the stage"),
+        ("max_rss_bytes", "gauge", "Process high-water resident memory"),
+    ]
+
+    def __init__(self, path, prefix="mobiml_stage") -> None:
+        self.path = path
+        self.prefix = prefix
+        self.totals = {}
+
+    def __call__(self, record) -> None:
+        totals = self.totals.setdefault(
+            record["stage"], {metric: 0 for metric, _, _ in self.METRICS}
+        )
+        totals["calls"] += 1
+        totals["wall_seconds"] += record["wall_time"]
+        totals["cpu_seconds"] += record["cpu_time"]
+        totals["rows_in"] += record["rows_in"] or 0
+        totals["rows_out"] += record["rows_out"] or 0
+        totals["rss_delta_bytes"] = record["rss_delta"] or 0
+        totals["max_rss_bytes"] = record["max_rss"] or 0
+        self.write()
+
+    def write(self) -> None:
+        lines = []
+        for metric, kind, help_text in self.METRICS:
+            full_name = f"{self.prefix}_{metric}"
+            if kind == "counter":
+                full_name += "_total"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for stage_name, totals in sorted(self.totals.items()):
+                lines.append(f'{full_name}{{stage="{stage_name}"}} {totals[metric]}')
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.path)
@@ -1,14 +1,15 @@
-import warnings
+from mobiml._lazy import attach
 
-from .traj_downsampler import TrajectoryDownsampler  # noqa F401
-from .traj_filter import TrajectoryFilter  # noqa F401
-from .traj_enricher import TrajectoryEnricher  # noqa F401
-from .traj_splitter import TrajectorySplitter  # noqa F401
-from .normalizer import Normalizer  # noqa F401
-
-from .stationary_client_extractor import StationaryClientExtractor  # noqa F401
-
-try:
-    from .mobile_client_extractor import MobileClientExtractor  # noqa F401
-except ImportError as e:
-    warnings.warn(e.msg, UserWarning)
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "TrajectoryDownsampler": ".traj_downsampler",
+        "TrajectoryFilter": ".traj_filter",
+        "TrajectoryEnricher": ".traj_enricher",  # requires movingpandas
+        "TrajectorySplitter": ".traj_splitter",  # requires movingpandas
+        "Normalizer": ".normalizer",
+        "AISValidator": ".ais_validator",
+        "StationaryClientExtractor": ".stationary_client_extractor",
+        "MobileClientExtractor": ".mobile_client_extractor",  # requires pymeos
+    },
+)
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+from mobiml.datasets import Dataset, SPEED, DIRECTION, MOVER_ID, TIMESTAMP
+from mobiml.datasets.utils import mid_mask
+from mobiml.instrumentation import instrument
+from .utils import chain_mask
+
+# AIS reports 102.3 knots as "speed not available" and 360 as "course not available"
+SOG_MAX = 102.2
+COG_MAX = 360.0
+
+
+class AISValidator:
+    """
+    Drop invalid AIS messages in one vectorized pass.
+
+    The rules are evaluated on whole columns and combined into a single row
+    mask, so the frame is only filtered (copied) once. Per-rule counts of
+    the rejected rows are available in ``report`` after ``validate``.
+
+    Rules
+    -----
+    mid
+        The MID of the mover id (MMSI) is not in the whitelist
+    x, y
+        Longitude outside [-180, 180], latitude outside [-90, 90] or missing
+    speed
+        SOG outside [0, 102.2] knots, incl. "not available" (102.3)
+    direction
+        COG outside [0, 360), incl. "not available" (360)
+    duplicate
+        Same mover and timestamp as an earlier valid message
+    near_duplicate
+        Same mover and less than ``min_dt_sec`` after the previous kept message
+
+    A row failing several rules is counted under each of them. Duplicates
+    are only searched among rows that pass the other rules, so an invalid
+    message never shadows a valid one.
+    """
+
+    def __init__(self, data: Dataset) -> None:
+        self.data = data
+        self.report = None
+
+    @instrument()
+    def validate(
+        self,
+        mids=True,
+        ranges=True,
+        duplicates=True,
+        min_dt_sec=0,
+    ) -> Dataset:
+        """
+        Drop the messages that fail the selected rules.
+
+        Parameters
+        ----------
+        mids : bool
+            Check the MID of the mover ids against the whitelist
+        ranges : bool
+            Check the coordinate, speed and direction ranges
+        duplicates : bool
+            Drop repeated (mover, timestamp) messages, keeping the first
+        min_dt_sec : float
+            Also drop messages of a mover less than ``min_dt_sec`` seconds
+            after its previous kept message (0 disables the check)
+
+        Returns
+        ----------
+        Dataset
+
+        Examples
+        ----------
+        >>> ais = AISValidator(ais).validate(min_dt_sec=1)
+        """
+        df = self.data.df
+        counts = {"rows": len(df)}
+        valid = np.ones(len(df), dtype=bool)
+
+        def apply(rule, rule_valid):
+            nonlocal valid
+            counts[rule] = int(len(rule_valid) - np.count_nonzero(rule_valid))
+            valid &= rule_valid
+
+        if mids:
+            apply("mid", mid_mask(df[MOVER_ID]))
+        if ranges:
+            x, y = self.data._get_x_y_arrays()
+            apply("x", (x >= -180) & (x <= 180))
+            apply("y", (y >= -90) & (y <= 90))
+            if SPEED in df.columns:
+                speed = df[SPEED].to_numpy(dtype=np.float64, na_value=np.nan)
+                apply("speed", (speed >= 0) & (speed <= SOG_MAX))
+            if DIRECTION in df.columns:
+                direction = df[DIRECTION].to_numpy(dtype=np.float64, na_value=np.nan)
+                apply("direction", (direction >= 0) & (direction < COG_MAX))
+        if duplicates or min_dt_sec:
+            duplicate, near = duplicate_masks(
+                df[MOVER_ID], df[TIMESTAMP], valid, min_dt_sec
+            )
+            if duplicates:
+                apply("duplicate", ~duplicate)
+            if min_dt_sec:
+                apply("near_duplicate", ~near)
+
+        counts["dropped"] = int(len(df) - np.count_nonzero(valid))
+        self.report = pd.Series(counts, name="rows")
+        if counts["dropped"]:
+            self.data.df = df[valid]
+        return self.data
+
+
+def duplicate_masks(movers, timestamps, candidates=None, min_dt_sec=0):
+    """
+    Exact and near duplicate (mover, timestamp) messages.
+
+    Rows are ordered by mover and timestamp with a stable lexsort, so of a
+    group of equal messages the first in the frame is kept. Only rows where
+    ``candidates`` is True take part.
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray)
+        Masks of the exact duplicates and of the messages less than
+        ``min_dt_sec`` after the previous kept message of the same mover,
+        see ``chain_mask``
+    """
+    n = len(movers)
+    rows = np.arange(n) if candidates is None else np.flatnonzero(candidates)
+    codes = pd.factorize(movers)[0][rows]
+    t = pd.DatetimeIndex(timestamps).as_unit("ns").asi8[rows]
+    order = np.lexsort((t, codes))
+    codes, t = codes[order], t[order]
+    same_mover = np.zeros(len(rows), dtype=bool)
+    same_mover[1:] = codes[1:] == codes[:-1]
+    dt = np.zeros(len(rows), dtype=np.int64)
+    dt[1:] = np.diff(t)
+
+    duplicate = np.zeros(n, dtype=bool)
+    near = np.zeros(n, dtype=bool)
+    duplicate[rows[order]] = same_mover & (dt == 0)
+    if min_dt_sec:
+        offsets = np.append(np.flatnonzero(~same_mover), len(rows))
+        kept = chain_mask(offsets, [t], [int(round(min_dt_sec * 1e9))])
+        near[rows[order]] = ~kept & (dt > 0)
+    return duplicate, near
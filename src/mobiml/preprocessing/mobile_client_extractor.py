@@ -1,6 +1,8 @@
+import logging
+
 import pandas as pd
-from datetime import datetime
 from mobiml.datasets import Dataset, TIMESTAMP
+from mobiml.instrumentation import instrument
 
 try:
     from pymeos import pymeos_initialize, TGeogPointInst, TGeogPointSeq
@@ -11,33 +13,37 @@ except ImportError as error:
     ) from error
 
 
+logger = logging.getLogger(__name__)
+
+
 class MobileClientExtractor:
     def __init__(self, data: Dataset) -> None:
         self.data = data
 
+    @instrument()
     def extract(self, clients: Dataset, antenna_radius_meters, n_threads=4) -> Dataset:
         pymeos_initialize()  # Don't remove. Necessary for the correct functioning of PyMEOS  # noqa E501
         self.n_threads = n_threads
         self.antenna_radius_meters = antenna_radius_meters
 
-        print(f"{datetime.now()} Creating PyMEOS points ...")
+        logger.info("Creating PyMEOS points ...")
         ais = self.data.to_gdf()
         ais["pymeos_pt"] = ais.apply(
             lambda row: TGeogPointInst(point=row["geometry"], timestamp=row[TIMESTAMP]),
             axis=1,
         )
 
-        print(f"{datetime.now()} Creating client trajectories ...")
+        logger.info("Creating client trajectories ...")
         mpd_tc = clients.to_trajs()
         client_trajs = self.create_pymeos_trajectories(mpd_tc)
 
-        print(f"{datetime.now()} Calculating spatiotemporal intersections ...")
+        logger.info("Calculating spatiotemporal intersections ...")
 
         results = []
         n = len(client_trajs)
         i = 1
         for traj_id, traj in client_trajs.items():
-            print(f"{i}/{n}: {traj_id}")
+            logger.debug("%d/%d: %s", i, n, traj_id)
             mmsi = traj_id if type(traj_id) is int else int(traj_id.split("_")[0])
             tmp = ais.copy()
             tmp["dist"] = tmp.apply(
@@ -51,11 +57,11 @@ class MobileClientExtractor:
         self.gdf = pd.concat(results)
         self.gdf.drop(columns=["pymeos_pt"], inplace=True)
         dataset = self.data.copy()
-        dataset.df = self.gdf
+        dataset.df = self.data.match_dtypes(self.gdf)
         return dataset
 
     def create_pymeos_trajectories(self, tc):
-        print(f"{datetime.now()} Creating PyMEOS trajectories ...")
+        logger.info("Creating PyMEOS trajectories ...")
         pymeos_traj = {}
         for traj in tc.trajectories:
             wkt = self.extract_wkt_from_traj_vectorized(traj)
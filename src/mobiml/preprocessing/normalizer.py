@@ -1,11 +1,13 @@
 from mobiml.datasets import Dataset, SPEED, DIRECTION
+from mobiml.instrumentation import instrument
 
 
 class Normalizer:
     def __init__(self, data: Dataset) -> None:
         self.data = data
 
-    def normalize(self, speed_max=None, replace=False) -> Dataset:
+    @instrument()
+    def normalize(self, speed_max=None, replace=False, bounds=None) -> Dataset:
         """
         Normalizes latitude, longitude, speed, direction values in dataset.
 
@@ -18,6 +20,9 @@ class Normalizer:
         replace : boolean
                 When ``replace=False`` (default) writes output to new columns.
                 When ``replace=True`` overwrites values in columns.
+        bounds : tuple
+                (min_x, min_y, max_x, max_y) to normalize to, e.g. the bounds of
+                all partitions of a PartitionedDataset (default: dataset bounds).
 
         Returns
         ----------
@@ -28,7 +33,9 @@ class Normalizer:
         >>> ais = BrestAIS(r"../examples/data/nari_dynamic.csv", nrows=1000)
         >>> ais = Normalizer(ais).normalize(speed_max=5.0, replace=True)
         """
-        LON_MIN, LAT_MIN, LON_MAX, LAT_MAX = self.data.get_bounds()
+        if bounds is None:
+            bounds = self.data.get_bounds()
+        LON_MIN, LAT_MIN, LON_MAX, LAT_MAX = bounds
         data = self.data.to_df()
 
         if replace is False:
@@ -42,12 +49,8 @@ class Normalizer:
             speed_col_name = SPEED
             direction_col_name = DIRECTION
 
-        data[x_col_name] = data["x"].apply(
-            lambda x: (x - LON_MIN) / (LON_MAX - LON_MIN)
-        )
-        data[y_col_name] = data["y"].apply(
-            lambda x: (x - LAT_MIN) / (LAT_MAX - LAT_MIN)
-        )
+        data[x_col_name] = (data["x"] - LON_MIN) / (LON_MAX - LON_MIN)
+        data[y_col_name] = (data["y"] - LAT_MIN) / (LAT_MAX - LAT_MIN)
 
         if SPEED in data.columns:
             if speed_max is None:
@@ -55,8 +58,10 @@ class Normalizer:
             else:
                 pass
             SPEED_MAX = speed_max
-            data.loc[data[SPEED] > SPEED_MAX, speed_col_name] = SPEED_MAX
-            data[speed_col_name] = data[SPEED] / SPEED_MAX
+            speed = data[SPEED]
+            if replace:
+                speed = speed.clip(upper=SPEED_MAX)
+            data[speed_col_name] = speed / SPEED_MAX
         else:
             pass
 
@@ -65,4 +70,7 @@ class Normalizer:
         else:
             pass
 
-        return Dataset(data)
+        data = self.data.match_dtypes(data)
+        return Dataset(
+            data, coord_dtype=self.data.coord_dtype, compact=self.data.compacted
+        )
@@ -1,19 +1,23 @@
-from datetime import datetime
+import logging
 
 from mobiml.datasets import Dataset
+from mobiml.instrumentation import instrument
+
+logger = logging.getLogger(__name__)
 
 
 class StationaryClientExtractor:
     def __init__(self, data: Dataset) -> None:
         self.data = data
 
+    @instrument()
     def extract(self, clients_gdf) -> Dataset:
-        print(f"{datetime.now()} Converting to GeoDataFrame ...")
+        logger.info("Converting to GeoDataFrame ...")
         gdf = self.data.to_gdf()
-        print(f"{datetime.now()} Computing overlay ...")
+        logger.info("Computing overlay ...")
         gdf = gdf.overlay(clients_gdf)
         dataset = self.data.copy()
-        dataset.df = gdf
+        dataset.df = self.data.match_dtypes(gdf)
         return dataset
 
     def to_feather(self, out_path) -> None:
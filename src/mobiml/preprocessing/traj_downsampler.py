@@ -2,35 +2,79 @@ import pandas as pd
 import numpy as np
 from mobiml.datasets.utils import TIMESTAMP, TRAJ_ID
 from mobiml.datasets._dataset import Dataset
-from tqdm.auto import tqdm
+from mobiml.datasets._index import TrajectoryIndex
+from mobiml.instrumentation import instrument
+from .utils import chain_mask, is_sorted
 
 
 class TrajectoryDownsampler:
+    """
+    Thin out the points of every trajectory to a minimum time interval.
+
+    A point is kept if at least ``min_dt_sec`` seconds have passed since the
+    last kept point of its trajectory; the first point is always kept. The
+    keep mask of all trajectories is computed in one pass over the rows
+    sorted by trajectory and timestamp, so the frame is only filtered once.
+
+    For partitioned datasets, partitions can be downsampled in parallel:
+
+    >>> ais.map_partitions(
+    ...     TrajectoryDownsampler, "subsample", min_dt_sec=10, n_jobs=8
+    ... )
+    """
+
     def __init__(self, data: Dataset) -> None:
         self.data = data
 
+    @instrument()
     def subsample(self, min_dt_sec=10) -> Dataset:
-        tqdm.pandas()
-        df_clean = (
-            self.data.df.sort_values(TIMESTAMP, kind="mergesort")
-            .groupby(TRAJ_ID)
-            .progress_apply(lambda l: self._subsample_trajectory(l.copy(), min_dt_sec))
-            .reset_index(level=0, drop=True)
-        )
-        self.data.df = df_clean
+        """
+        Drop points less than ``min_dt_sec`` after the last kept point.
+
+        The result is sorted by trajectory id and timestamp (stable, index
+        labels are kept). Rows without trajectory id are dropped.
+        """
+        df = self.data.df
+        ids = df[TRAJ_ID]
+        if ids.hasnans:
+            df = df[ids.notna()]
+        t = pd.DatetimeIndex(df[TIMESTAMP]).as_unit("ns").asi8
+        if not is_sorted(df[TRAJ_ID].to_numpy(), t):
+            df = df.sort_values([TRAJ_ID, TIMESTAMP], kind="mergesort")
+            t = pd.DatetimeIndex(df[TIMESTAMP]).as_unit("ns").asi8
+        offsets = TrajectoryIndex(df).offsets
+        self.data.df = df[subsample_mask(t, offsets, min_dt_sec)]
         return self.data
 
     def _subsample_trajectory(
         self, traj_df: pd.DataFrame, min_dt_sec=10
     ) -> pd.DataFrame:
-        # Based on: https://stackoverflow.com/a/56904899
-        sumlm = np.frompyfunc(lambda a, b: a + b if a < min_dt_sec else b, 2, 1)
+        """Downsample the rows of a single trajectory sorted by timestamp"""
+        t = pd.DatetimeIndex(traj_df[TIMESTAMP]).as_unit("ns").asi8
+        return traj_df[subsample_mask(t, [0, len(traj_df)], min_dt_sec)]
+
 
-        traj_dt = traj_df[TIMESTAMP].diff().dt.total_seconds()
+def subsample_mask(t, offsets, min_dt_sec=10) -> np.ndarray:
+    """
+    Rows kept by downsampling to ``min_dt_sec``.
 
-        import warnings
+    Starting at the first point of every trajectory, the next kept point is
+    the first one at least ``min_dt_sec`` later, see ``chain_mask``.
 
-        with warnings.catch_warnings(record=True):
-            traj_dt_sumlm = sumlm.accumulate(traj_dt, dtype=int)
+    Parameters
+    ----------
+    t : numpy.ndarray
+        Timestamps as int64 nanoseconds, sorted within every trajectory
+    offsets : numpy.ndarray
+        Trajectory offsets, the rows of trajectory i are
+        ``offsets[i]:offsets[i + 1]``
+    min_dt_sec : float
+        Minimum time between kept points in seconds
 
-        return traj_df.drop(traj_dt_sumlm.loc[traj_dt_sumlm < min_dt_sec].index)
+    Returns
+    -------
+    numpy.ndarray
+        Boolean keep mask
+    """
+    min_dt = int(round(min_dt_sec * 1e9))
+    return chain_mask(offsets, [np.asarray(t, dtype=np.int64)], [min_dt])
@@ -1,51 +1,365 @@
-from movingpandas.unit_utils import UNITS
+import logging
 
-from mobiml.datasets import Dataset
-from .utils import trajectorycollection_to_df
+import numpy as np
+import pandas as pd
+from movingpandas.unit_utils import UNITS, get_conversion
+
+from mobiml.datasets import Dataset, DIRECTION, SPEED, TIMESTAMP, TRAJ_ID
+from mobiml.datasets._index import TrajectoryIndex
+from mobiml.instrumentation import instrument
+from .utils import (
+    is_latlon,
+    is_sorted,
+    measure_distances,
+    resolve_engine,
+    trajectorycollection_to_df,
+)
+
+DISTANCE = "distance"
+TIMEDELTA = "timedelta"
+ACCELERATION = "acceleration"
+ANGULAR_DIFFERENCE = "angular_difference"
+TURN_RATE = "turn_rate"
+
+logger = logging.getLogger(__name__)
 
 
 class TrajectoryEnricher:
+    """
+    Add movement features to the points of every trajectory.
+
+    With ``engine="native"``, features are computed in one vectorized pass
+    over the x/y/timestamp arrays sorted by trajectory and timestamp. Values
+    follow movingpandas: distances and speeds between lon/lat coordinates are
+    geodesic (WGS84) meters, otherwise in CRS units, converted to ``units``
+    like in movingpandas; directions are compass bearings; the first point of
+    a trajectory takes the speed, direction and acceleration of the second
+    point. Unlike movingpandas, all rows are kept and keep their index labels:
+    rows are sorted by trajectory id and timestamp, points with the same
+    timestamp as their predecessor get a NaN speed (unless they are at the
+    same position) and single-point trajectories get NaN values.
+
+    ``engine="movingpandas"`` computes the features with a movingpandas
+    TrajectoryCollection instead. It is still the default, with a
+    FutureWarning, unless native-only features are requested; the default
+    will change to ``"native"`` in a future release.
+    """
+
     def __init__(self, data: Dataset) -> None:
         self.data = data
 
-    def add_speed(self, **kwargs) -> Dataset:
-        print("Adding speed ...")
-        trajs = self.data.to_trajs()
-        trajs.add_speed(**kwargs)
-        df = trajectorycollection_to_df(trajs)
-        self.data.df = df
-        return self.data
+    @instrument()
+    def add_speed(
+        self,
+        overwrite=False,
+        name=SPEED,
+        units=UNITS(),
+        n_threads=1,
+        engine=None,
+        **kwargs,
+    ) -> Dataset:
+        """
+        Add a speed column, see ``TrajectoryCollection.add_speed``.
 
-    def add_direction(self, **kwargs) -> Dataset:
-        print("Adding direction")
-        trajs = self.data.to_trajs()
-        trajs.add_direction(**kwargs)
-        df = trajectorycollection_to_df(trajs)
-        self.data.df = df
-        return self.data
+        Other keyword arguments are passed to movingpandas and are not
+        supported by the native engine.
+        """
+        logger.info("Adding speed ...")
+        if resolve_engine(engine, "TrajectoryEnricher.add_speed") == "movingpandas":
+            trajs = self.data.to_trajs()
+            trajs.add_speed(
+                overwrite=overwrite,
+                name=name,
+                units=units,
+                n_threads=n_threads,
+                **kwargs,
+            )
+            return self._set_trajs(trajs)
+        _no_movingpandas_kwargs(kwargs)
+        return self._add_native({"speed": name}, overwrite, speed_units=units)
+
+    @instrument()
+    def add_direction(
+        self, overwrite=False, name=DIRECTION, n_threads=1, engine=None, **kwargs
+    ) -> Dataset:
+        """
+        Add a direction column, see ``TrajectoryCollection.add_direction``.
 
+        Other keyword arguments are passed to movingpandas and are not
+        supported by the native engine.
+        """
+        logger.info("Adding direction ...")
+        if resolve_engine(engine, "TrajectoryEnricher.add_direction") == "movingpandas":
+            trajs = self.data.to_trajs()
+            trajs.add_direction(
+                overwrite=overwrite, name=name, n_threads=n_threads, **kwargs
+            )
+            return self._set_trajs(trajs)
+        _no_movingpandas_kwargs(kwargs)
+        return self._add_native({"direction": name}, overwrite)
+
+    @instrument()
     def add_features(self, n_threads=5, **kwargs) -> Dataset:
+        """
+        Add several features at once.
+
+        Parameters
+        ----------
+        speed, direction, acceleration : bool
+            Add the speed, direction and acceleration columns
+        distance, timedelta, angular_difference, turn_rate : bool
+            Add the distance to, time since and absolute heading change since
+            the previous point, and the heading change per second (native
+            engine only)
+        speed_units, acceleration_units : tuple
+            movingpandas UNITS of speed and acceleration
+        overwrite : bool
+            Replace existing columns
+        engine : str
+            "native" or "movingpandas" (default, unless native-only features
+            are requested)
+        """
         speed = kwargs.pop("speed", False)
         direction = kwargs.pop("direction", False)
         speed_units = kwargs.pop("speed_units", UNITS())
         acceleration = kwargs.pop("acceleration", False)
         acceleration_units = kwargs.pop("acceleration_units", UNITS())
         overwrite = kwargs.pop("overwrite", False)
-        print("Preparing trajectories ...")
+        engine = kwargs.pop("engine", None)
+        extra = {
+            feature: name
+            for feature, name in [
+                ("distance", DISTANCE),
+                ("timedelta", TIMEDELTA),
+                ("angular_difference", ANGULAR_DIFFERENCE),
+                ("turn_rate", TURN_RATE),
+            ]
+            if kwargs.pop(feature, False)
+        }
+        if engine is None and extra:
+            engine = "native"
+        engine = resolve_engine(engine, "TrajectoryEnricher.add_features")
+        if engine == "native":
+            features = dict(extra)
+            if speed:
+                features["speed"] = SPEED
+            if direction:
+                features["direction"] = DIRECTION
+            if acceleration:
+                features["acceleration"] = ACCELERATION
+            logger.info("Adding %s ...", ", ".join(features))
+            return self._add_native(
+                features, overwrite, speed_units, acceleration_units
+            )
+
+        if extra:
+            raise ValueError(f"{', '.join(extra)} require the native engine")
+        logger.info("Preparing trajectories ...")
         trajs = self.data.to_trajs()
         if speed:
-            print("Adding speed ...")
+            logger.info("Adding speed ...")
             trajs.add_speed(units=speed_units, overwrite=overwrite, n_threads=n_threads)
         if direction:
-            print("Adding direction ...")
+            logger.info("Adding direction ...")
             trajs.add_direction(overwrite=overwrite, n_threads=n_threads)
         if acceleration:
-            print("Adding acceleration ...")
+            logger.info("Adding acceleration ...")
             trajs.add_acceleration(
                 units=acceleration_units,
                 overwrite=overwrite,
                 n_threads=n_threads,
             )
+        return self._set_trajs(trajs)
+
+    def _set_trajs(self, trajs) -> Dataset:
         df = trajectorycollection_to_df(trajs)
-        self.data.df = df
+        self.data.df = self.data.match_dtypes(df)
         return self.data
+
+    def _add_native(
+        self, features, overwrite, speed_units=UNITS(), acceleration_units=UNITS()
+    ) -> Dataset:
+        """Add the features (feature -> column name) with the native engine"""
+        df = self.data.df
+        for name in features.values():
+            if name in df.columns and not overwrite:
+                raise RuntimeError(
+                    f"Dataset already has a column named {name}! Use overwrite=True "
+                    "to overwrite existing values or update the name arg."
+                )
+        t = pd.DatetimeIndex(df[TIMESTAMP]).as_unit("ns").asi8
+        if not is_sorted(df[TRAJ_ID].to_numpy(), t):
+            df = df.sort_values([TRAJ_ID, TIMESTAMP], kind="mergesort")
+            t = pd.DatetimeIndex(df[TIMESTAMP]).as_unit("ns").asi8
+        x, y = self.data._get_x_y_arrays(df)
+        offsets = TrajectoryIndex(df).offsets
+        values = movement_features(
+            x,
+            y,
+            t,
+            offsets,
+            features,
+            is_latlon(self.data.crs),
+            self._crs_units(),
+            speed_units,
+            acceleration_units,
+        )
+        df = df.assign(**{features[feature]: v for feature, v in values.items()})
+        self.data.df = self.data.match_dtypes(df)
+        return self.data
+
+    def _crs_units(self):
+        if self.data.crs is None:
+            return None
+        from pyproj import CRS
+
+        return CRS.from_user_input(self.data.crs).axis_info[0].unit_name
+
+
+def movement_features(
+    x,
+    y,
+    t,
+    offsets,
+    features,
+    latlon=False,
+    crs_units=None,
+    speed_units=UNITS(),
+    acceleration_units=UNITS(),
+) -> dict:
+    """
+    Movement features of points sorted by trajectory and timestamp.
+
+    Parameters
+    ----------
+    x, y : numpy.ndarray
+        Coordinates
+    t : numpy.ndarray
+        Timestamps as int64 nanoseconds
+    offsets : numpy.ndarray
+        Trajectory offsets, the rows of trajectory i are
+        ``offsets[i]:offsets[i + 1]``
+    features : iterable
+        Any of "distance", "timedelta", "speed", "direction", "acceleration",
+        "angular_difference" and "turn_rate"
+    latlon : bool
+        Coordinates are longitude/latitude, distances are geodesic meters
+    crs_units : str
+        Name of the CRS axis unit, for unit conversions
+    speed_units, acceleration_units : tuple
+        movingpandas UNITS
+
+    Returns
+    -------
+    dict
+        Feature name -> array of values
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    t = np.asarray(t, dtype=np.int64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    n = len(x)
+    starts, ends = offsets[:-1], offsets[1:]
+    starts = starts[ends > starts]
+    first = np.zeros(n, dtype=bool)
+    first[starts] = True
+    features = set(features)
+    result = {}
+
+    dt = np.full(n, np.nan)
+    dt[1:] = np.diff(t) / 1e9
+    dt[first] = np.nan
+    same = np.zeros(n, dtype=bool)
+    same[1:] = (x[1:] == x[:-1]) & (y[1:] == y[:-1])
+    same[first] = False
+
+    if "timedelta" in features:
+        delta = np.zeros(n, dtype=np.int64)
+        delta[1:] = np.diff(t)
+        delta = delta.astype("timedelta64[ns]")
+        delta[first] = np.timedelta64("NaT")
+        result["timedelta"] = delta
+
+    distance = None
+    if {"distance", "speed", "acceleration"} & features:
+        distance = np.zeros(n)
+        if n > 1:
+            distance[1:] = measure_distances(x[:-1], y[:-1], x[1:], y[1:], latlon)
+        distance[first | same] = 0.0
+    if "distance" in features:
+        conversion = get_conversion(UNITS(), crs_units)
+        result["distance"] = distance * conversion.crs / conversion.distance
+
+    speed = None
+    if "speed" in features:
+        speed = _speed(distance, dt, same, get_conversion(speed_units, crs_units))
+        result["speed"] = _first_from_second(speed, starts, offsets)
+    if "acceleration" in features:
+        conversion = get_conversion(acceleration_units, crs_units)
+        accel_speed = _first_from_second(
+            _speed(distance, dt, same, conversion), starts, offsets
+        )
+        acceleration = np.full(n, np.nan)
+        acceleration[1:] = np.diff(accel_speed) / dt[1:] * conversion.time2
+        result["acceleration"] = _first_from_second(acceleration, starts, offsets)
+
+    if {"direction", "angular_difference", "turn_rate"} & features:
+        direction = np.zeros(n)
+        if n > 1:
+            direction[1:] = _bearings(x[:-1], y[:-1], x[1:], y[1:], latlon)
+        direction[first | same] = 0.0
+        direction = _first_from_second(direction, starts, offsets)
+        if "direction" in features:
+            result["direction"] = direction
+        if {"angular_difference", "turn_rate"} & features:
+            change = np.zeros(n)
+            change[1:] = np.abs(np.diff(direction))
+            change = np.where(change > 180, np.abs(change - 360), change)
+            change[first] = 0.0
+            if "angular_difference" in features:
+                result["angular_difference"] = change
+            if "turn_rate" in features:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    turn_rate = np.where(change == 0, 0.0, change / dt)
+                turn_rate[first] = 0.0
+                result["turn_rate"] = turn_rate
+    return result
+
+
+def _speed(distance, dt, same, conversion) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speed = distance * conversion.crs / conversion.distance / dt * conversion.time
+    speed[same] = 0.0
+    speed[np.isinf(speed)] = np.nan
+    return speed
+
+
+def _first_from_second(values, starts, offsets) -> np.ndarray:
+    """Set the first value of every trajectory to its second value"""
+    lengths = np.diff(offsets)
+    lengths = lengths[lengths > 0]
+    has_second = lengths > 1
+    values[starts[has_second]] = values[starts[has_second] + 1]
+    values[starts[~has_second]] = np.nan
+    return values
+
+
+def _bearings(x0, y0, x1, y1, latlon=False) -> np.ndarray:
+    """Compass bearings in degrees [0, 360) like movingpandas"""
+    if latlon:
+        lat0, lat1 = np.radians(y0), np.radians(y1)
+        delta_lon = np.radians(x1 - x0)
+        bx = np.sin(delta_lon) * np.cos(lat1)
+        by = np.cos(lat0) * np.sin(lat1) - np.sin(lat0) * np.cos(lat1) * np.cos(
+            delta_lon
+        )
+        return (np.degrees(np.arctan2(bx, by)) + 360) % 360
+    azimuth = np.degrees(np.arctan2(x1 - x0, y1 - y0))
+    return np.where(azimuth < 0, azimuth + 360, azimuth)
+
+
+def _no_movingpandas_kwargs(kwargs) -> None:
+    if kwargs:
+        raise TypeError(
+            f"{', '.join(kwargs)} are only supported with engine='movingpandas'"
+        )
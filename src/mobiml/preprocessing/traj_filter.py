@@ -1,31 +1,179 @@
-from mobiml.datasets import Dataset, SPEED
-from tqdm.auto import tqdm
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
 
-from mobiml.datasets.utils import TRAJ_ID
+from mobiml.datasets import Dataset, SPEED
+from mobiml.datasets.utils import TIMESTAMP, TRAJ_ID
+from mobiml.instrumentation import instrument, stage
+from .utils import is_latlon, is_sorted, measure_distances
 
 
 class TrajectoryFilter:
+    """
+    Filter points and trajectories by combined predicates.
+
+    Predicates are collected with the builder methods and evaluated together
+    by ``apply`` into one boolean row mask, so the frame is filtered (copied)
+    at most once however many predicates there are. Point predicates
+    (``speed``, ``bbox``, ``time_range``) are evaluated first; trajectory
+    predicates (``min_pts``, ``max_pts``, ``min_duration``, ``min_length``)
+    are evaluated on the remaining points of every trajectory.
+
+    Examples
+    --------
+    >>> ais = (
+    ...     TrajectoryFilter(ais)
+    ...     .speed(min_speed=0.5, max_speed=30)
+    ...     .bbox((8.0, 54.0, 13.0, 58.0))
+    ...     .min_pts(100)
+    ...     .min_duration(timedelta(minutes=30))
+    ...     .apply()
+    ... )
+    """
+
     def __init__(self, data: Dataset) -> None:
         self.data = data
+        self.predicates = {}
 
-    def filter_min_pts(self, min_pts=10) -> Dataset:
-        tqdm.pandas()
-        vessels_points = self.data.df[TRAJ_ID].value_counts()
-
-        filtered = self.data.df.loc[
-            self.data.df[TRAJ_ID].isin(
-                vessels_points.loc[vessels_points >= min_pts].index
-            )
-        ].copy()
-        self.data.df = filtered
+    def min_pts(self, min_pts=10) -> "TrajectoryFilter":
+        """Keep trajectories with at least ``min_pts`` points"""
+        self.predicates["min_pts"] = min_pts
+        return self
+
+    def max_pts(self, max_pts) -> "TrajectoryFilter":
+        """Keep trajectories with at most ``max_pts`` points"""
+        self.predicates["max_pts"] = max_pts
+        return self
+
+    def speed(self, min_speed=None, max_speed=None) -> "TrajectoryFilter":
+        """Keep points with a speed within [min_speed, max_speed]"""
+        self.predicates["speed"] = (min_speed, max_speed)
+        return self
+
+    def bbox(self, bbox) -> "TrajectoryFilter":
+        """Keep points within the (min x, min y, max x, max y) bbox"""
+        self.predicates["bbox"] = tuple(bbox)
+        return self
+
+    def time_range(self, start=None, end=None) -> "TrajectoryFilter":
+        """Keep points with a timestamp within [start, end]"""
+        self.predicates["time_range"] = (start, end)
+        return self
+
+    def min_duration(self, duration) -> "TrajectoryFilter":
+        """Keep trajectories lasting at least ``duration`` (timedelta or seconds)"""
+        if not isinstance(duration, timedelta):
+            duration = timedelta(seconds=duration)
+        self.predicates["min_duration"] = duration
+        return self
+
+    def min_length(self, length) -> "TrajectoryFilter":
+        """
+        Keep trajectories at least ``length`` long, in meters for lon/lat
+        coordinates and in CRS units otherwise.
+        """
+        self.predicates["min_length"] = length
+        return self
+
+    def mask(self) -> np.ndarray:
+        """Boolean mask of the rows passing all predicates"""
+        df = self.data.df
+        predicates = self.predicates
+        mask = np.ones(len(df), dtype=bool)
+        t = None
+        x = y = None
+
+        if "speed" in predicates:
+            min_speed, max_speed = predicates["speed"]
+            speed = df[SPEED].to_numpy(dtype=np.float64, na_value=np.nan)
+            mask &= ~np.isnan(speed)
+            if min_speed is not None:
+                mask &= speed >= min_speed
+            if max_speed is not None:
+                mask &= speed <= max_speed
+        if "bbox" in predicates:
+            min_x, min_y, max_x, max_y = predicates["bbox"]
+            x, y = self.data._get_x_y_arrays()
+            mask &= (x >= min_x) & (x <= max_x) & (y >= min_y) & (y <= max_y)
+        if "time_range" in predicates:
+            t = pd.DatetimeIndex(df[TIMESTAMP]).as_unit("ns").asi8
+            start, end = predicates["time_range"]
+            if start is not None:
+                mask &= t >= pd.Timestamp(start).as_unit("ns").value
+            if end is not None:
+                mask &= t <= pd.Timestamp(end).as_unit("ns").value
+
+        traj_predicates = {"min_pts", "max_pts", "min_duration", "min_length"}
+        if not traj_predicates & predicates.keys():
+            return mask
+
+        codes, ids = pd.factorize(df[TRAJ_ID])
+        mask &= codes >= 0
+        rows = np.flatnonzero(mask)
+        if len(rows) == 0:
+            # no trajectory left, e.g. all points failed the point predicates
+            return mask
+        counts = np.bincount(codes[rows], minlength=len(ids))
+        keep = counts > 0
+        if "min_pts" in predicates:
+            keep &= counts >= predicates["min_pts"]
+        if "max_pts" in predicates:
+            keep &= counts <= predicates["max_pts"]
+
+        if {"min_duration", "min_length"} & predicates.keys():
+            # remaining points ordered by trajectory and timestamp
+            if t is None:
+                t = pd.DatetimeIndex(df[TIMESTAMP]).as_unit("ns").asi8
+            row_codes, row_t = codes[rows], t[rows]
+            if not is_sorted(row_codes, row_t):
+                order = np.lexsort((row_t, row_codes))
+                rows, row_codes, row_t = rows[order], row_codes[order], row_t[order]
+            starts = np.flatnonzero(np.diff(row_codes, prepend=-1))
+            ends = np.append(starts[1:], len(rows)) - 1
+            segment_codes = row_codes[starts]
+            if "min_duration" in predicates:
+                duration = predicates["min_duration"] / timedelta(microseconds=1)
+                durations = np.zeros(len(ids), dtype=np.int64)
+                durations[segment_codes] = row_t[ends] - row_t[starts]
+                keep &= durations >= duration * 1000
+            if "min_length" in predicates:
+                if x is None:
+                    x, y = self.data._get_x_y_arrays()
+                rx, ry = x[rows], y[rows]
+                steps = np.zeros(len(rows))
+                steps[1:] = measure_distances(
+                    rx[:-1], ry[:-1], rx[1:], ry[1:], is_latlon(self.data.crs)
+                )
+                steps[starts] = 0
+                lengths = np.zeros(len(ids))
+                lengths[segment_codes] = np.add.reduceat(steps, starts)
+                keep &= lengths >= predicates["min_length"]
+
+        mask &= keep[np.maximum(codes, 0)]
+        return mask
+
+    def apply(self) -> Dataset:
+        """
+        Drop the rows failing any predicate and reset the predicates.
+
+        The frame is not copied if all rows pass.
+        """
+        df = self.data.df
+        with stage(
+            "TrajectoryFilter.apply", rows_in=len(df), **self.predicates
+        ) as record:
+            mask = self.mask()
+            if not mask.all():
+                self.data.df = df[mask]
+            record["rows_out"] = len(self.data.df)
+        self.predicates = {}
         return self.data
 
+    @instrument()
+    def filter_min_pts(self, min_pts=10) -> Dataset:
+        return self.min_pts(min_pts).apply()
+
+    @instrument()
     def filter_speed(self, min_speed=None, max_speed=None) -> Dataset:
-        filtered = self.data.df.drop(
-            self.data.df.loc[
-                ~self.data.df[SPEED].between(min_speed, max_speed, inclusive="both")
-            ].index,
-            axis=0,
-        ).copy()
-        self.data.df = filtered
-        return self.data
+        return self.speed(min_speed, max_speed).apply()
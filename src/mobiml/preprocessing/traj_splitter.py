@@ -1,22 +1,63 @@
-from movingpandas import ObservationGapSplitter, TemporalSplitter
-from mobiml.datasets import Dataset
-from .utils import trajectorycollection_to_df
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from mobiml.datasets import Dataset, MOVER_ID, TIMESTAMP, TRAJ_ID
+from mobiml.datasets._index import TrajectoryIndex, segmented_cumsum
+from mobiml.instrumentation import instrument
+from .utils import (
+    chain_mask,
+    is_latlon,
+    is_sorted,
+    measure_distances,
+    resolve_engine,
+    trajectorycollection_to_df,
+)
+
+TEMPORAL_UNITS = {"hour": "h", "day": "D", "month": "M", "year": "Y"}
 
 
 class TrajectorySplitter:
     def __init__(self, data: Dataset) -> None:
         self.data = data
 
+    @instrument()
     def split(self, **kwargs) -> Dataset:
         """
         Split trajectories by different rules.
 
+        With ``engine="native"``, a new piece starts wherever any
+        rule applies, found in one pass over the rows sorted by trajectory
+        and timestamp. Pieces are numbered per trajectory by the cumulative
+        sum of these starts and get movingpandas-style ids
+        ``f"{traj_id}_{number}"``. As in movingpandas, pieces with less than
+        two points or without movement are dropped, and temporal pieces end
+        with the first point of the next period. If both ``observation_gap``
+        and ``temporal_split_mode`` are given, pieces are numbered in one
+        sequence rather than nested (``f"{traj_id}_{i}_{j}"``). When a rule is
+        given, a change of mover within a trajectory also starts a new piece.
+        Without any rule, the dataset is returned unchanged.
+
+        ``engine="movingpandas"`` splits a movingpandas TrajectoryCollection
+        instead. It is still the default, with a FutureWarning, unless
+        ``max_duration`` or ``max_distance`` is given; the default will change
+        to ``"native"`` in a future release.
+
         Parameters
         ----------
         observation_gap : datetime.timedelta
             Time gap threshold.
         temporal_split_mode : string
             Split mode. ('hour', 'day', 'month' or 'year')
+        max_duration : datetime.timedelta
+            Maximum duration of a piece (native engine only)
+        max_distance : float
+            Maximum length of a piece, in meters for lon/lat coordinates and
+            in CRS units otherwise (native engine only)
+        engine : str
+            "native" or "movingpandas" (default, unless a native-only rule is
+            given)
 
         Examples
         --------
@@ -24,10 +65,39 @@ class TrajectorySplitter:
         >>> TrajectorySlitter(dataset).split(observation_gap=timedelta(hours=1))
 
         >>> TrajectorySlitter(dataset).split(temporal_split_mode='day')
+
+        >>> TrajectorySlitter(dataset).split(max_duration=timedelta(hours=6))
         """
 
         split_by_observation_gap = kwargs.pop("observation_gap", None)
         split_temporally = kwargs.pop("temporal_split_mode", None)
+        max_duration = kwargs.pop("max_duration", None)
+        max_distance = kwargs.pop("max_distance", None)
+        engine = kwargs.pop("engine", None)
+        if engine is None and (max_duration is not None or max_distance is not None):
+            engine = "native"
+        engine = resolve_engine(engine, "TrajectorySplitter.split")
+        if split_temporally and split_temporally not in TEMPORAL_UNITS:
+            raise ValueError(f"Unknown temporal_split_mode {split_temporally!r}")
+
+        if engine == "native":
+            if not any(
+                rule is not None
+                for rule in [
+                    split_by_observation_gap,
+                    split_temporally,
+                    max_duration,
+                    max_distance,
+                ]
+            ):
+                return self.data
+            return self._split_native(
+                split_by_observation_gap, split_temporally, max_duration, max_distance
+            )
+        if max_duration or max_distance:
+            raise ValueError("max_duration and max_distance require the native engine")
+
+        from movingpandas import ObservationGapSplitter, TemporalSplitter
 
         trajs = self.data.to_trajs()
 
@@ -37,5 +107,84 @@ class TrajectorySplitter:
             trajs = TemporalSplitter(trajs).split(mode=split_temporally)
 
         df = trajectorycollection_to_df(trajs)
-        self.data.df = df
+        self.data.df = self.data.match_dtypes(df)
+        return self.data
+
+    def _split_native(
+        self, observation_gap, temporal_split_mode, max_duration, max_distance
+    ) -> Dataset:
+        df = self.data.df
+        if df[TRAJ_ID].hasnans:
+            df = df[df[TRAJ_ID].notna()]
+        times = pd.DatetimeIndex(df[TIMESTAMP])
+        if not is_sorted(df[TRAJ_ID].to_numpy(), times.as_unit("ns").asi8):
+            df = df.sort_values([TRAJ_ID, TIMESTAMP], kind="mergesort")
+            times = pd.DatetimeIndex(df[TIMESTAMP])
+        t = times.as_unit("ns").asi8
+        n = len(df)
+        traj_index = TrajectoryIndex(df)
+        x, y = self.data._get_x_y_arrays(df)
+
+        # starts of the pieces, before the max duration and distance rules
+        starts = np.zeros(n, dtype=bool)
+        starts[traj_index.starts] = True
+        if MOVER_ID in df.columns:
+            # factorize codes, so that missing mover ids compare equal
+            movers = pd.factorize(df[MOVER_ID])[0]
+            starts[1:] |= movers[1:] != movers[:-1]
+        if observation_gap is not None:
+            starts[1:] |= np.diff(t) > pd.Timedelta(observation_gap).value
+        temporal = np.zeros(n, dtype=bool)
+        if temporal_split_mode:
+            # calendar periods of the local wall time, like pandas' Grouper
+            unit = TEMPORAL_UNITS[temporal_split_mode]
+            wall = times.tz_localize(None) if times.tz is not None else times
+            periods = wall.to_numpy().astype(f"datetime64[{unit}]").view(np.int64)
+            temporal[1:] = (periods[1:] != periods[:-1]) & ~starts[1:]
+            starts |= temporal
+
+        if max_duration is not None or max_distance is not None:
+            offsets = np.append(np.flatnonzero(starts), n)
+            keys, steps = [], []
+            if max_duration is not None:
+                if not isinstance(max_duration, timedelta):
+                    max_duration = timedelta(seconds=max_duration)
+                keys.append(t)
+                steps.append(pd.Timedelta(max_duration).value)
+            if max_distance is not None:
+                steps_to_prev = np.zeros(n)
+                if n > 1:
+                    steps_to_prev[1:] = measure_distances(
+                        x[:-1], y[:-1], x[1:], y[1:], is_latlon(self.data.crs)
+                    )
+                steps_to_prev[starts] = 0.0
+                keys.append(segmented_cumsum(steps_to_prev, offsets[:-1]))
+                steps.append(max_distance)
+            starts |= chain_mask(offsets, keys, steps, strict=True)
+
+        # piece of every row, numbered per trajectory; rows starting a temporal
+        # piece are also appended to the previous piece
+        piece = np.cumsum(starts) - 1
+        overlap = np.flatnonzero(temporal & starts)
+        rows = np.insert(np.arange(n), overlap, overlap)
+        piece = np.insert(piece, overlap, piece[overlap] - 1)
+
+        # drop pieces with less than two points or without movement
+        counts = np.bincount(piece, minlength=int(piece[-1]) + 1 if n else 0)
+        moves = np.zeros(len(rows), dtype=bool)
+        moves[1:] = (x[rows[1:]] != x[rows[:-1]]) | (y[rows[1:]] != y[rows[:-1]])
+        moves[1:] &= piece[1:] == piece[:-1]
+        moving = np.bincount(piece, weights=moves, minlength=len(counts)) > 0
+        keep = ((counts > 1) & moving)[piece]
+        rows, piece = rows[keep], piece[keep]
+
+        piece_starts = np.flatnonzero(starts)
+        piece_traj = traj_index.segment_ids()[piece_starts]
+        first_piece = np.searchsorted(piece_starts, traj_index.starts)
+        number = np.arange(len(piece_starts)) - first_piece[piece_traj]
+        traj_ids = df[TRAJ_ID].to_numpy()[piece_starts].astype(str)
+        names = np.char.add(np.char.add(traj_ids, "_"), number.astype(str))
+
+        df = df.iloc[rows].assign(**{TRAJ_ID: names.astype(object)[piece]})
+        self.data.df = self.data.match_dtypes(df)
         return self.data
@@ -1,6 +1,11 @@
+import warnings
+
+import numpy as np
 from pandas import DataFrame
 from mobiml.datasets.utils import TIMESTAMP
 
+ENGINES = ("native", "movingpandas")
+
 
 def trajectorycollection_to_df(trajs):
     gdf = trajs.to_point_gdf()
@@ -10,3 +15,140 @@ def trajectorycollection_to_df(trajs):
     df = DataFrame(gdf.drop(columns="geometry")).reset_index(level=0, drop=True)
 
     return df
+
+
+def resolve_engine(engine, owner) -> str:
+    """
+    Validate the ``engine`` argument of ``owner``.
+
+    Without an engine, movingpandas is used and a FutureWarning announces
+    that the default will change to the native engine.
+    """
+    if engine is None:
+        warnings.warn(
+            f"The default engine of {owner} will change from 'movingpandas' to "
+            "'native' in a future release. Pass engine='native' or "
+            "engine='movingpandas' to silence this warning.",
+            FutureWarning,
+            stacklevel=4,
+        )
+        return "movingpandas"
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+    return engine
+
+
+def is_latlon(crs) -> bool:
+    """Whether coordinates in ``crs`` are geographic (longitude/latitude)"""
+    if crs is None:
+        return False
+    if crs in (4326, "4326", "EPSG:4326", "epsg:4326"):
+        return True
+    from pyproj import CRS
+
+    return CRS.from_user_input(crs).is_geographic
+
+
+def measure_distances(x0, y0, x1, y1, latlon=False) -> np.ndarray:
+    """
+    Distances between the points (x0, y0) and (x1, y1).
+
+    Like movingpandas, distances between longitude/latitude coordinates are
+    geodesic meters on the WGS84 ellipsoid, other distances are euclidean in
+    CRS units.
+    """
+    if latlon:
+        from pyproj import Geod
+
+        x0, y0, x1, y1 = (np.asarray(v, dtype=np.float64) for v in (x0, y0, x1, y1))
+        return np.asarray(Geod(ellps="WGS84").inv(x0, y0, x1, y1)[2])
+    return np.hypot(np.subtract(x1, x0), np.subtract(y1, y0))
+
+
+def is_sorted(ids, t) -> bool:
+    """Whether rows are sorted by id and, within ids, by timestamp"""
+    if len(ids) < 2:
+        return True
+    try:
+        same = ids[1:] == ids[:-1]
+        return bool(np.all(same | (ids[1:] > ids[:-1]))) and bool(
+            np.all(t[1:][same] >= t[:-1][same])
+        )
+    except TypeError:
+        return False
+
+
+def chain_mask(offsets, keys, steps, strict=False) -> np.ndarray:
+    """
+    Rows of a greedy chain through every segment.
+
+    The chain starts at the first row of every segment and jumps to the first
+    later row where any of the ``keys`` has advanced by at least its step
+    (by more than its step if ``strict``). Jumps are found by binary search
+    and all segments advance together, so the number of numpy calls is the
+    largest number of chain rows of a segment, not the number of rows.
+
+    Parameters
+    ----------
+    offsets : numpy.ndarray
+        Segment offsets, the rows of segment i are ``offsets[i]:offsets[i + 1]``
+    keys : list
+        Arrays of int64 or float values, nondecreasing within every segment
+    steps : list
+        Step of every key, in the units of the key
+    strict : bool
+        Jump only when a key has advanced by more than its step
+
+    Returns
+    -------
+    numpy.ndarray
+        Boolean mask of the chain rows
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    mask = np.zeros(offsets[-1] if len(offsets) else 0, dtype=bool)
+    starts, ends = offsets[:-1], offsets[1:]
+    nonempty = ends > starts
+    starts, ends = starts[nonempty], ends[nonempty]
+    if len(starts) == 0:
+        return mask
+    lengths = ends - starts
+    lo, hi = starts[0], ends[-1]
+
+    # make the keys increase across segments: values relative to the segment
+    # start, with segments more than a step apart
+    rels, spans = [], []
+    new_block = np.zeros(len(starts), dtype=bool)
+    new_block[0] = True
+    for key, step in zip(keys, steps):
+        key = np.asarray(key)[lo:hi]
+        rel = key - np.repeat(key[starts - lo], lengths)
+        span = rel[ends - 1 - lo] + max(step, 0) + 1
+        if np.issubdtype(rel.dtype, np.integer):
+            # segments are processed in blocks whose total span fits into int64
+            block = (np.cumsum(span, dtype=np.float64) // 2.0**61).astype(np.int64)
+            new_block[1:] |= block[1:] != block[:-1]
+        rels.append(rel)
+        spans.append(span)
+    bounds = np.append(np.flatnonzero(new_block), len(starts))
+    side = "right" if strict else "left"
+
+    for first, last in zip(bounds[:-1], bounds[1:]):
+        row0, row1 = starts[first], ends[last - 1]
+        block_keys = []
+        for rel, span in zip(rels, spans):
+            shift = np.cumsum(span[first:last]) - span[first:last]
+            block_keys.append(
+                rel[row0 - lo : row1 - lo] + np.repeat(shift, lengths[first:last])
+            )
+        pos = starts[first:last] - row0
+        end = ends[first:last] - row0
+        while len(pos):
+            mask[row0 + pos] = True
+            jumps = [
+                np.searchsorted(key, key[pos] + step, side)
+                for key, step in zip(block_keys, steps)
+            ]
+            pos = np.maximum(np.minimum.reduce(jumps), pos + 1)
+            inside = pos < end
+            pos, end = pos[inside], end[inside]
+    return mask
@@ -1,11 +1,10 @@
-import warnings
+from mobiml._lazy import attach
 
-from .mover_splitter import MoverSplitter  # noqa F401
-from .random_sampler import RandomTrajSampler  # noqa F401
-
-try:
-    from .temporal_splitter import (  # noqa F401
-        TemporalSplitter,
-    )  # requires torch
-except ImportError as e:
-    warnings.warn(e.msg, UserWarning)
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "MoverSplitter": ".mover_splitter",  # requires scikit-learn
+        "RandomTrajSampler": ".random_sampler",
+        "TemporalSplitter": ".temporal_splitter",  # requires scikit-learn
+    },
+)
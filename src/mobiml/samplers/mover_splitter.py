@@ -1,7 +1,12 @@
+import logging
+
 import pandas as pd
-from datetime import datetime
 from sklearn.model_selection import train_test_split
 
+from mobiml.instrumentation import instrument
+
+logger = logging.getLogger(__name__)
+
 
 class MoverSplitter:
     def __init__(self, trajs, mover_id, mover_class) -> None:
@@ -10,6 +15,7 @@ class MoverSplitter:
         self.mover_class = mover_class
         self.movers = self.get_labelled_mover_list()
 
+    @instrument()
     def split(self, test_size, features, label_col):
         """
         Split dataset ensuring that trajectories of test_size % of the movers are
@@ -34,7 +40,7 @@ class MoverSplitter:
         X_cols = features
         y_col = label_col
 
-        print(f"{datetime.now()} Splitting dataset ...")
+        logger.info("Splitting dataset ...")
         X = self.movers[self.mover_id]
         y = self.movers[label_col]
         movers_train, movers_test, _, _ = train_test_split(
@@ -45,18 +51,20 @@ class MoverSplitter:
             stratify=self.movers[self.mover_class],
         )
 
-        print(
-            f"Using {len(movers_train.index)} movers for training and "
-            + f"{len(movers_test.index)} for testing ..."
+        logger.info(
+            "Using %d movers for training and %d for testing ...",
+            len(movers_train.index),
+            len(movers_test.index),
         )
 
         tmp = self.trajs.sample(frac=1).reset_index(drop=True)
 
         trajs_train = tmp[tmp[self.mover_id].isin(movers_train)]
         trajs_test = tmp[tmp[self.mover_id].isin(movers_test)]
-        print(
-            f"({len(trajs_train.index)} trajectories for training and "
-            + f"{len(trajs_test.index)} for testing)"
+        logger.info(
+            "(%d trajectories for training and %d for testing)",
+            len(trajs_train.index),
+            len(trajs_test.index),
         )
 
         X_train = trajs_train[X_cols]
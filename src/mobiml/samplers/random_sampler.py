@@ -1,3 +1,4 @@
+import logging
 import numpy as np
 import geopandas as gpd
 import shapely
@@ -5,6 +6,9 @@ import math
 import warnings
 
 from mobiml.datasets import Dataset, TRAJ_ID
+from mobiml.instrumentation import instrument
+
+logger = logging.getLogger(__name__)
 
 
 class RandomTrajSampler:
@@ -12,6 +16,7 @@ class RandomTrajSampler:
     def __init__(self, data: Dataset) -> None:
         self.data = data
 
+    @instrument()
     def split(
         self, n_cells, n_sample=None, percent_sample=None, random_state=None
     ) -> Dataset:
@@ -45,12 +50,10 @@ class RandomTrajSampler:
         >>> sample = RandomTrajSampler(data).random_sample(n_cells=2, n_sample=100)
         """
 
-        trajs = self.data.to_trajs()
-        start_pts = trajs.get_start_locations()
-        start_pts.set_crs(trajs.get_crs(), inplace=True)
+        start_pts = self._get_start_locations()
 
         xmin, ymin, xmax, ymax = start_pts.total_bounds
-        grid = self._create_grid(n_cells, xmin, ymin, xmax, ymax, trajs.get_crs())
+        grid = self._create_grid(n_cells, xmin, ymin, xmax, ymax, self.data.crs)
 
         joined = gpd.sjoin(start_pts, grid, how="left", predicate="within")
         joined = joined.drop(columns="index_right")
@@ -60,14 +63,14 @@ class RandomTrajSampler:
         diff = [cell for cell in all_cells if cell not in filled_cells]
 
         if not diff:
-            print("All cells can be used for sampling.")
+            logger.info("All cells can be used for sampling.")
         else:
             warnings.warn(
                 "There are empty cells that will not be used for sampling.", UserWarning
             )
-            print(f"Empty cells: {diff}")
+            logger.info("Empty cells: %s", diff)
 
-        print(f"Number of cells used for sampling: {len(filled_cells)}")
+        logger.info("Number of cells used for sampling: %d", len(filled_cells))
 
         if percent_sample:
             n_sample = math.ceil(percent_sample * len(joined))
@@ -84,6 +87,7 @@ class RandomTrajSampler:
         result["split"] = result["split"].fillna(1)
         return Dataset(result)
 
+    @instrument()
     def sample(
         self, n_cells, n_sample=None, percent_sample=None, random_state=None
     ) -> Dataset:
@@ -93,11 +97,27 @@ class RandomTrajSampler:
 
         df_sample = gdf.loc[gdf["split"] == 2]
         df_sample = df_sample.drop(columns="split")
-        print(f"Your sample contains {len(df_sample)} records.")
+        logger.info("Your sample contains %d records.", len(df_sample))
 
         dataset = Dataset(df_sample)
         return dataset
 
+    def _get_start_locations(self) -> gpd.GeoDataFrame:
+        data = self.data.copy()
+        data.sort_trajectories()
+        index = data.trajectory_index
+        df = data.to_df()
+        # like TrajectoryCollection: ordered by id, without single points
+        order = index.ids.argsort()
+        order = order[index.lengths[order] > 1]
+        return gpd.GeoDataFrame(
+            {TRAJ_ID: index.ids[order]},
+            geometry=gpd.points_from_xy(
+                index.first(df["x"])[order], index.first(df["y"])[order]
+            ),
+            crs=self.data.crs,
+        )
+
     def _create_grid(self, n_cells, xmin, ymin, xmax, ymax, crs, buffer=0.1):
         xmin -= buffer
         ymin -= buffer
@@ -121,14 +141,15 @@ class RandomTrajSampler:
             try:
                 raise ValueError("Sample too big.")
             except ValueError:
-                print(
-                    f"Your sample of {n_sample} ",
-                    f"cannot be greater than the dataset: {len(merged)}",
+                logger.error(
+                    "Your sample of %d cannot be greater than the dataset: %d",
+                    n_sample,
+                    len(merged),
                 )
                 raise
 
         n_per_cell = math.ceil(n_sample / len(filled_cells))
-        print("Number of samples per cell:", n_per_cell)
+        logger.info("Number of samples per cell: %d", n_per_cell)
 
         if n_per_cell > merged.cell.value_counts().min():
             num = merged["cell"].value_counts()
@@ -142,9 +163,9 @@ class RandomTrajSampler:
                 "Not enough points in some cells.",
                 UserWarning,
             )
-            print(
-                f"Not enough points in {count} cell(s). ",
-                "All points used in these cells.",
+            logger.info(
+                "Not enough points in %d cell(s). All points used in these cells.",
+                count,
             )
 
         df_sample = merged.groupby(["cell"], as_index=False, group_keys=False).apply(
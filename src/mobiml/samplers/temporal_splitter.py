@@ -1,15 +1,20 @@
+import logging
+
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-from sklearn.model_selection import train_test_split
-from torch.utils.data import Dataset
+from datetime import timedelta
+
+from mobiml.datasets import Dataset, TIMESTAMP
+from mobiml.instrumentation import instrument
 
-from mobiml.datasets import TIMESTAMP
+logger = logging.getLogger(__name__)
 
 
 class TemporalSplitter:
     def __init__(self, data: Dataset) -> None:
         self.data = data
 
+    @instrument()
     def split(
         self, dev_size=0.2, test_size=0.1, seed=100, stratify=None, **kwargs
     ) -> Dataset:
@@ -28,33 +33,38 @@ class TemporalSplitter:
         self.seed = seed
         self.stratify = stratify
 
-        print(f"{datetime.now()} Splitting dataset ...")
+        logger.info("Splitting dataset ...")
 
         trajectories_dates = self.data.df[TIMESTAMP].dt.date.sort_values().unique()
-        print(trajectories_dates)
+        logger.debug("%s", trajectories_dates)
 
         train_indices, dev_indices, test_indices = self._train_test_split(
             trajectories_dates, shuffle=False, **kwargs
         )
-        print(f"train: {train_indices}, dev: {dev_indices}, test: {test_indices}")
+        logger.debug(
+            "train: %s, dev: %s, test: %s", train_indices, dev_indices, test_indices
+        )
         train_dates, dev_dates, test_dates = (
             trajectories_dates[train_indices],
             trajectories_dates[dev_indices],
             trajectories_dates[test_indices],
         )
 
-        print(
-            f"Train @{(min(train_dates), max(train_dates))=}, "
-            + f"\nDev @{(min(dev_dates), max(dev_dates))=}, "
-            + f"\nTest @{(min(test_dates), max(test_dates))=}"
+        logger.info(
+            "Train @%s, \nDev @%s, \nTest @%s",
+            (min(train_dates), max(train_dates)),
+            (min(dev_dates), max(dev_dates)),
+            (min(test_dates), max(test_dates)),
         )
 
         self.data.df.loc[self.data.df[TIMESTAMP].dt.date.isin(train_dates), "split"] = 1
         self.data.df.loc[self.data.df[TIMESTAMP].dt.date.isin(dev_dates), "split"] = 2
         self.data.df.loc[self.data.df[TIMESTAMP].dt.date.isin(test_dates), "split"] = 3
+        self.data.invalidate()
 
         return self.data
 
+    @instrument()
     def split_hr(
         self, dev_size=0.2, test_size=0.1, seed=100, stratify=None, **kwargs
     ) -> Dataset:
@@ -70,34 +80,40 @@ class TemporalSplitter:
         self.seed = seed
         self.stratify = stratify
 
-        print(f"{datetime.now()} Splitting dataset by hours ...")
+        logger.info("Splitting dataset by hours ...")
 
         trajectories_hr = self.data.df[TIMESTAMP].dt.hour.sort_values().unique()
-        print(trajectories_hr)
+        logger.debug("%s", trajectories_hr)
 
         train_indices, dev_indices, test_indices = self._train_test_split(
             trajectories_hr, shuffle=False, **kwargs
         )
-        print(f"train: {train_indices}, dev: {dev_indices}, test: {test_indices}")
+        logger.debug(
+            "train: %s, dev: %s, test: %s", train_indices, dev_indices, test_indices
+        )
         train_hr, dev_hr, test_hr = (
             trajectories_hr[train_indices],
             trajectories_hr[dev_indices],
             trajectories_hr[test_indices],
         )
 
-        print(
-            f"Train @{(min(train_hr), max(train_hr))=}, "
-            + f"\nDev @{(min(dev_hr), max(dev_hr))=}, "
-            + f"\nTest @{(min(test_hr), max(test_hr))=}"
+        logger.info(
+            "Train @%s, \nDev @%s, \nTest @%s",
+            (min(train_hr), max(train_hr)),
+            (min(dev_hr), max(dev_hr)),
+            (min(test_hr), max(test_hr)),
         )
 
         self.data.df.loc[self.data.df[TIMESTAMP].dt.hour.isin(train_hr), "split"] = 1
         self.data.df.loc[self.data.df[TIMESTAMP].dt.hour.isin(dev_hr), "split"] = 2
         self.data.df.loc[self.data.df[TIMESTAMP].dt.hour.isin(test_hr), "split"] = 3
+        self.data.invalidate()
 
         return self.data
 
     def _train_test_split(self, dataset, **kwargs):
+        from sklearn.model_selection import train_test_split
+
         # Creating data indices for training and validation splits:
         dataset_size = len(dataset)
         indices = list(range(dataset_size))
@@ -122,6 +138,7 @@ class TemporalSplitter:
 
         return train_indices, dev_indices, test_indices
 
+    @instrument()
     def split_at_timestamp(self, timestamp=None, timestamp_2=None, **kwargs) -> Dataset:
         """
         Split dataset temporally at timestamp into train/dev,
@@ -138,28 +155,14 @@ class TemporalSplitter:
             t_train_max = pd.to_datetime(t_train_max)
             t_dev_min = pd.to_datetime(timestamp)
             t_dev_max = pd.to_datetime(t_max)
-            print(
-                "t_train_min:",
+            logger.info(
+                "t_train_min: %s \nt_train_max: %s \nt_dev_min: %s \nt_dev_max: %s",
                 t_train_min,
-                "\nt_train_max:",
                 t_train_max,
-                "\nt_dev_min:",
                 t_dev_min,
-                "\nt_dev_max:",
                 t_dev_max,
             )
-            self.data.df = self.data.df[self.data.df[TIMESTAMP] >= t_min]
-            self.data.df = self.data.df[self.data.df[TIMESTAMP] <= t_max]
-            self.data.df.loc[
-                (self.data.df[TIMESTAMP] >= t_train_min)
-                & (self.data.df[TIMESTAMP] <= t_train_max),
-                "split",
-            ] = 1
-            self.data.df.loc[
-                (self.data.df[TIMESTAMP] >= t_dev_min)
-                & (self.data.df[TIMESTAMP] <= t_dev_max),
-                "split",
-            ] = 2
+            ranges = [(t_train_min, t_train_max), (t_dev_min, t_dev_max)]
         else:
             t_dev_max = timestamp_2 - timedelta(seconds=1)
             t_train_min = pd.to_datetime(t_min)
@@ -168,36 +171,43 @@ class TemporalSplitter:
             t_dev_max = pd.to_datetime(t_dev_max)
             t_test_min = pd.to_datetime(timestamp_2)
             t_test_max = pd.to_datetime(t_max)
-            print(
-                "t_train_min:",
+            logger.info(
+                "t_train_min: %s \nt_train_max: %s \nt_dev_min: %s \nt_dev_max: %s "
+                "\nt_test_min %s \nt_test_max %s",
                 t_train_min,
-                "\nt_train_max:",
                 t_train_max,
-                "\nt_dev_min:",
                 t_dev_min,
-                "\nt_dev_max:",
                 t_dev_max,
-                "\nt_test_min",
                 t_test_min,
-                "\nt_test_max",
                 t_test_max,
             )
-            self.data.df = self.data.df[self.data.df[TIMESTAMP] >= t_min]
-            self.data.df = self.data.df[self.data.df[TIMESTAMP] <= t_max]
-            self.data.df.loc[
-                (self.data.df[TIMESTAMP] >= t_train_min)
-                & (self.data.df[TIMESTAMP] <= t_train_max),
-                "split",
-            ] = 1
-            self.data.df.loc[
-                (self.data.df[TIMESTAMP] >= t_dev_min)
-                & (self.data.df[TIMESTAMP] <= t_dev_max),
-                "split",
-            ] = 2
-            self.data.df.loc[
-                (self.data.df[TIMESTAMP] >= t_test_min)
-                & (self.data.df[TIMESTAMP] <= t_test_max),
-                "split",
-            ] = 3
+            ranges = [
+                (t_train_min, t_train_max),
+                (t_dev_min, t_dev_max),
+                (t_test_min, t_test_max),
+            ]
+
+        if self.data.df[TIMESTAMP].isna().any():
+            self.data.df = self.data.df[self.data.df[TIMESTAMP].notna()]
+        if "split" in self.data.df.columns:
+            split = self.data.df["split"].to_numpy(dtype=float, copy=True)
+        else:
+            split = np.full(len(self.data.df), np.nan)
+        # a few time ranges are cheaper to mask directly than to index
+        index = self.data._peek_cached("point_index")
+        if index is None:
+            t = pd.DatetimeIndex(self.data.df[TIMESTAMP]).as_unit("ns").asi8
+        for label, time_range in enumerate(ranges, start=1):
+            t0, t1 = _as_ns(time_range)
+            if index is None:
+                split[(t >= t0) & (t <= t1)] = label
+            else:
+                split[index.query(time=(t0, t1))] = label
+        self.data.df["split"] = split
+        self.data.invalidate()
 
         return self.data
+
+
+def _as_ns(time_range):
+    return tuple(pd.Timestamp(t).as_unit("ns").value for t in time_range)
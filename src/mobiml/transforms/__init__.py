@@ -1,18 +1,12 @@
-import warnings
-
-from .traj_creator import TrajectoryCreator  # noqa F401
-from .delta_dataset_creator import DeltaDatasetCreator  # noqa F401
-
-
-try:
-    from .traj_aggregator import (  # noqa F401
-        TrajectoryAggregator,
-        traj_to_h3_sequence,
-    )  # requires h3
-except ImportError as e:
-    warnings.warn(e.msg, UserWarning)
-
-try:
-    from .od_aggregator import ODAggregator  # requires h3  # noqa F401
-except ImportError as e:
-    warnings.warn(e.msg, UserWarning)
+from mobiml._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    {
+        "TrajectoryCreator": ".traj_creator",  # requires movingpandas
+        "DeltaDatasetCreator": ".delta_dataset_creator",
+        "TrajectoryAggregator": ".traj_aggregator",  # requires h3
+        "traj_to_h3_sequence": ".traj_aggregator",  # requires h3
+        "ODAggregator": ".od_aggregator",  # requires h3
+    },
+)
@@ -7,7 +7,15 @@ Learning. In Proceedings of the 25th Conference on Mobile Data Management (MDM).
 """
 
 from pandas import DataFrame, merge, Series
-from mobiml.datasets import Dataset, SPEED, DIRECTION, TIMESTAMP, TRAJ_ID
+from mobiml.datasets import (
+    Dataset,
+    TrajectoryIndex,
+    SPEED,
+    DIRECTION,
+    TIMESTAMP,
+    TRAJ_ID,
+)
+from mobiml.instrumentation import instrument
 from mobiml.utils import applyParallel, shapely_coords_numpy
 
 
@@ -17,9 +25,15 @@ class DeltaDatasetCreator:
         self.input_feats = ["dx_curr", "dy_curr", "dt_curr", "dt_next"]
         self.output_feats = ["dx_next", "dy_next"]
 
+    @instrument()
     def get_delta_dataset(self, col=None, njobs=50) -> DataFrame:
+        keys = _group_keys(col)
+        gdf = self.data.to_gdf()
+        # like groupby, rows with missing keys belong to no group
+        gdf = gdf.dropna(subset=keys)
+        gdf = gdf.sort_values(keys + [TIMESTAMP], kind="mergesort")
         traj_delta = applyParallel(
-            self.data.to_gdf().groupby([TRAJ_ID, col], group_keys=True),
+            TrajectoryIndex(gdf, keys),
             lambda l: self.create_delta_dataset(l),
             n_jobs=njobs,
         )
@@ -69,21 +83,23 @@ class DeltaDatasetCreator:
 
         return delta_curr
 
+    @instrument()
     def get_windowed_dataset(self, col=None, njobs=50):
         """
         Get constant-length windows of delta values for ML model training
         """
 
+        keys = _group_keys(col)
         traj_delta = self.get_delta_dataset(col=col, njobs=njobs)
 
         traj_delta_windows = (
             applyParallel(
-                traj_delta.reset_index().groupby([TRAJ_ID, col]),
+                traj_delta.reset_index().groupby(keys),
                 lambda l: self.traj_windowing(l),
                 n_jobs=njobs,
             )
             .reset_index(level=-1)
-            .pivot(columns=["level_2"])
+            .pivot(columns=[f"level_{len(keys)}"])
             .rename_axis([None, None], axis=1)
             .sort_index(axis=1, ascending=False)
         )
@@ -110,3 +126,8 @@ class DeltaDatasetCreator:
             traj_labels.append(segment_window.iloc[-1, output_feats_idx].values)
 
         return Series([traj_inputs, traj_labels], index=["samples", "labels"])
+
+
+def _group_keys(col) -> list:
+    """Trajectory id, plus ``col`` if given"""
+    return [TRAJ_ID] if col is None else [TRAJ_ID, col]
@@ -1,8 +1,10 @@
+import logging
+
 import pandas as pd
 import movingpandas as mpd
-from datetime import datetime
 
 from mobiml.datasets import Dataset, MOVER_ID, TIMESTAMP, TRAJ_ID
+from mobiml.instrumentation import instrument
 
 try:
     import h3
@@ -13,10 +15,14 @@ except ImportError as error:
     ) from error
 
 
+logger = logging.getLogger(__name__)
+
+
 class ODAggregator:
     def __init__(self, data: Dataset) -> None:
         self.data = data
 
+    @instrument()
     def get_od_for_h3(self, res, freq) -> pd.DataFrame:
         """
         Extract start and end points (OD) for trajectories from a Dataset and aggregate
@@ -46,7 +52,7 @@ class ODAggregator:
         gdf["x"] = gdf.geometry.x
         gdf["y"] = gdf.geometry.y
 
-        print(f"{datetime.now()} Identifying h3 cell id ...")
+        logger.info("Identifying h3 cell id ...")
 
         def get_cell(row):
             # Updated for h3 > 4.0 https://github.com/uber/h3-py/issues/100
@@ -68,7 +74,7 @@ class ODAggregator:
             y="y",
         )
 
-        print(f"{datetime.now()} Getting start locations ...")
+        logger.info("Getting start locations ...")
         start = tc.get_start_locations()
         start = start.rename(
             columns={
@@ -84,7 +90,7 @@ class ODAggregator:
         df = df.origin
         df = df.reset_index()
 
-        print(f"{datetime.now()} Getting end locations ...")
+        logger.info("Getting end locations ...")
         end = tc.get_end_locations()
         end = end.rename(
             columns={
@@ -1,10 +1,11 @@
-from datetime import datetime
+import logging
 from itertools import groupby
 
 import pandas as pd
 
 from mobiml.datasets import SPEED, DIRECTION, MOVER_ID
 from mobiml.datasets.aisdk import SHIPTYPE
+from mobiml.instrumentation import instrument
 
 try:
     import h3  # noqa F401
@@ -15,13 +16,17 @@ except ImportError as error:
     ) from error
 
 
+logger = logging.getLogger(__name__)
+
+
 class TrajectoryAggregator:
     def __init__(self, trajs, vessels) -> None:
         self.trajs = trajs
         self.vessels = vessels
 
+    @instrument()
     def aggregate_trajs(self, h3_resolution) -> pd.DataFrame:
-        print(f"{datetime.now()} Enriching trajectories ...")
+        logger.info("Enriching trajectories ...")
         traj_gdf = self.trajs.to_traj_gdf(
             agg={"client": "mode", MOVER_ID: "mode", SPEED: ["max", "median"]}
         )
@@ -52,7 +57,7 @@ class TrajectoryAggregator:
         dataset = dataset[cols]
         dataset.dropna(inplace=True)
 
-        print(f"Enriched dataset columns: {dataset.columns}")
+        logger.info("Enriched dataset columns: %s", dataset.columns)
         return dataset
 
 
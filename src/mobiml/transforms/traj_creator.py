@@ -1,45 +1,59 @@
+import logging
+
 import geopandas as gpd
 import movingpandas as mpd
 from datetime import timedelta
 from mobiml.datasets import Dataset, SPEED, TIMESTAMP, TRAJ_ID
+from mobiml.instrumentation import count_rows, instrument, stage
+
+logger = logging.getLogger(__name__)
 
 
 class TrajectoryCreator:
     def __init__(self, data, min_length=100, min_duration=timedelta(minutes=0)) -> None:
-        if isinstance(data, gpd.GeoDataFrame):
-            gdf = data
-            print(f"Original Dataframe size: {len(gdf)} rows")
-            try:
-                gdf = gdf[gdf[SPEED] > 0]
-            except KeyError:
-                pass
-            print(f"   Reduced to: {len(gdf)} rows after removing records with speed=0")
-            print("Creating TrajectoryCollection ...")
-            self.tc = mpd.TrajectoryCollection(
-                gdf,
-                TRAJ_ID,
-                t=TIMESTAMP,
-                min_length=min_length,
-                min_duration=min_duration,
-            )
-        elif isinstance(data, mpd.TrajectoryCollection):
-            self.tc = data
-        elif isinstance(data, Dataset):
-            self.tc = data.to_trajs()
-        else:
-            raise TypeError(f"Invalid input data {data}")
-        print(f"   Created: {self.tc}")
+        with stage(
+            "TrajectoryCreator.create", rows_in=count_rows(data), min_length=min_length
+        ) as record:
+            if isinstance(data, gpd.GeoDataFrame):
+                gdf = data
+                logger.info("Original Dataframe size: %d rows", len(gdf))
+                try:
+                    gdf = gdf[gdf[SPEED] > 0]
+                except KeyError:
+                    pass
+                logger.info(
+                    "   Reduced to: %d rows after removing records with speed=0",
+                    len(gdf),
+                )
+                logger.info("Creating TrajectoryCollection ...")
+                self.tc = mpd.TrajectoryCollection(
+                    gdf,
+                    TRAJ_ID,
+                    t=TIMESTAMP,
+                    min_length=min_length,
+                    min_duration=min_duration,
+                )
+            elif isinstance(data, mpd.TrajectoryCollection):
+                self.tc = data
+            elif isinstance(data, Dataset):
+                self.tc = data.to_trajs()
+            else:
+                raise TypeError(f"Invalid input data {data}")
+            record["rows_out"] = count_rows(self.tc)
+            record["n_trajs"] = len(self.tc)
+        logger.info("   Created: %s", self.tc)
 
+    @instrument()
     def get_trajs(
         self,
         gap_duration=timedelta(minutes=15),
         generalization_tolerance=timedelta(minutes=1),
     ) -> mpd.TrajectoryCollection:
-        print("Generalizing ...")
+        logger.info("Generalizing ...")
         self.tc = mpd.MinTimeDeltaGeneralizer(self.tc).generalize(
             tolerance=generalization_tolerance
         )
-        print(f"Splitting at observation gaps ({gap_duration}) ...")
+        logger.info("Splitting at observation gaps (%s) ...", gap_duration)
         self.tc = mpd.ObservationGapSplitter(self.tc).split(gap=gap_duration)
-        print(f"   Split: {self.tc}")
+        logger.info("   Split: %s", self.tc)
         return self.tc
@@ -1,7 +1,10 @@
+import logging
 from typing import Tuple, List
 import numpy as np
 import math
 
+logger = logging.getLogger(__name__)
+
 
 # Get the coordinates of a Shapely Geometry (e.g. Point, Polygon, etc.) as NumPy array
 def shapely_coords_numpy(geom):
@@ -29,18 +32,25 @@ class XYList(List):
 
 
 def applyParallel(df_grouped, fun, n_jobs=-1, **kwargs):
+    """
+    Forked from: https://stackoverflow.com/a/27027632
+
+    df_grouped may be a DataFrameGroupBy or a TrajectoryIndex.
+    """
     from pandas import concat
     import tqdm
     import multiprocessing
     from joblib import delayed, Parallel
 
-    """
-    Forked from: https://stackoverflow.com/a/27027632
-    """
+    from mobiml.datasets import TrajectoryIndex
+
     n_jobs = multiprocessing.cpu_count() if n_jobs == -1 else n_jobs
-    print(f"Scaling {fun} to {n_jobs} CPUs")
+    logger.info("Scaling %s to %d CPUs", fun, n_jobs)
 
-    df_grouped_names = df_grouped.grouper.names
+    if isinstance(df_grouped, TrajectoryIndex):
+        df_grouped_names = df_grouped.names
+    else:
+        df_grouped_names = df_grouped.grouper.names
 
     def _fun(name, group):
         return (
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from mobiml.datasets import Dataset, SPEED, DIRECTION
+from mobiml.datasets.utils import mid_mask, mmsi_to_mid
+from mobiml.preprocessing import AISValidator
+
+
+class TestAISValidator:
+    def setup_method(self):
+        t = pd.Timestamp("2018-01-01 12:00:00")
+        s = pd.Timedelta("1s")
+        self.df = pd.DataFrame(
+            {
+                "mmsi": [227705102, 227705102, 227705102, 227705102, 123456789]
+                + [227705103, 227705103, 227705103],
+                "t": [t, t + s, t + s, t + 1.5 * s, t, t, t + 2 * s, t + 3 * s],
+                "x": [-4.5, -4.4, -4.4, -4.3, -4.2, 181.0, -4.1, -4.0],
+                "y": [48.1, 48.2, 48.2, 48.3, 48.4, 48.5, 48.6, 48.7],
+                SPEED: [5.0, 5.0, 5.0, 5.0, 5.0, 5.0, 102.3, 5.0],
+                DIRECTION: [90.0, 90.0, 90.0, 90.0, 90.0, 90.0, 90.0, 360.0],
+            }
+        )
+
+    def test_mmsi_to_mid(self):
+        mmsi = [227705102, 2190001, 2579999999, None, -5]
+        assert mmsi_to_mid(mmsi).tolist() == [227, 2, 257, -1, -1]
+        assert mmsi_to_mid(np.array([227705102], dtype="uint32")).tolist() == [227]
+        assert mid_mask(mmsi).tolist() == [True, False, True, False, False]
+
+    def test_validate(self):
+        data = Dataset(self.df, traj_id="mmsi", mover_id="mmsi", timestamp="t")
+        validator = AISValidator(data)
+        data = validator.validate(min_dt_sec=1)
+        assert validator.report.to_dict() == {
+            "rows": 8,
+            "mid": 1,
+            "x": 1,
+            "y": 0,
+            "speed": 1,
+            "direction": 1,
+            "duplicate": 1,
+            "near_duplicate": 1,
+            "dropped": 6,
+        }
+        assert data.df["x"].tolist() == [-4.5, -4.4]
+
+    def test_validate_keeps_valid_duplicate(self):
+        df = self.df.iloc[[5, 1, 0]].copy()
+        df["mmsi"] = 227705102
+        df["t"] = df["t"].iloc[0]
+        data = Dataset(df, traj_id="mmsi", mover_id="mmsi", timestamp="t")
+        data = AISValidator(data).validate()
+        assert data.df["x"].tolist() == [-4.4]
+
+    def test_validate_near_duplicate_chain(self):
+        t = pd.Timestamp("2018-01-01 12:00:00")
+        df = pd.DataFrame(
+            {
+                "mmsi": [227705102] * 5,
+                "t": [t + pd.Timedelta(seconds=s) for s in [0, 0.6, 1.2, 1.8, 2.4]],
+                "x": [-4.5, -4.4, -4.3, -4.2, -4.1],
+                "y": [48.1, 48.2, 48.3, 48.4, 48.5],
+            }
+        )
+        data = Dataset(df, traj_id="mmsi", mover_id="mmsi", timestamp="t")
+        data = AISValidator(data).validate(min_dt_sec=1)
+        assert data.df["x"].tolist() == [-4.5, -4.3, -4.1]
+
+    def test_validate_keeps_compact_dtypes(self):
+        data = Dataset(
+            self.df, traj_id="mmsi", mover_id="mmsi", timestamp="t", compact=True
+        )
+        dtypes = data.df.dtypes
+        data = AISValidator(data).validate(min_dt_sec=1)
+        assert data.df[SPEED].dtype == "float32"
+        assert data.df.dtypes.equals(dtypes)
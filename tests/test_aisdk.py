@@ -1,5 +1,7 @@
 import os
 import pandas as pd
+import pytest
+from zipfile import ZipFile
 from geopandas import GeoDataFrame
 from movingpandas import TrajectoryCollection
 from shapely.geometry import Point
@@ -80,6 +82,113 @@ class TestAISDK:
         assert isinstance(trajs, TrajectoryCollection)
         assert len(data.df) == 4
 
+    def test_records_are_filtered_once(self, tmp_path, monkeypatch):
+        from mobiml.datasets import aisdk
+
+        calls = []
+
+        def filter_ais_records(df, *args):
+            calls.append(len(df))
+            return original(df, *args)
+
+        original = aisdk.filter_ais_records
+        monkeypatch.setattr(aisdk, "filter_ais_records", filter_ais_records)
+        csv_path = os.path.join(self.test_dir, "data/test_aisdk_20180208_sample.csv")
+        zip_path = str(tmp_path / "aisdk_sample.zip")
+        with ZipFile(zip_path, "w") as zip_file:
+            zip_file.write(csv_path, "a.csv")
+            zip_file.write(csv_path, "b.csv")
+        for path, n_parts in [(csv_path, 1), (zip_path, 2)]:
+            calls.clear()
+            AISDK(path)
+            assert len(calls) == n_parts
+
+    def test_data_from_csv_with_arrow_engine(self):
+        path = os.path.join(self.test_dir, "data/test_aisdk_20180208_sample.csv")
+        data = AISDK(path, engine="arrow")
+        expected = AISDK(path)
+        assert data.df[TRAJ_ID].dtype == "uint32"
+        assert data.df[SPEED].dtype == "float32"
+        assert data.df["nav_status"].dtype == "category"
+        assert data.df[TIMESTAMP].tolist() == expected.df[TIMESTAMP].tolist()
+        assert data.df["x"].tolist() == expected.df["x"].tolist()
+        assert data.df["Name"].isna().all()
+        trajs = data.to_trajs()
+        assert isinstance(trajs, TrajectoryCollection)
+
+    def test_data_from_csv_parts_keeps_categories(self, tmp_path):
+        path = os.path.join(self.test_dir, "data/test_aisdk_20180208_sample.csv")
+        with open(path) as f:
+            header, *lines = f.readlines()
+        for i, part in enumerate([lines[:5], lines[5:]]):
+            with open(tmp_path / f"part_{i}.csv", "w") as f:
+                f.writelines([header] + part)
+        data = AISDK(str(tmp_path / "part_*.csv"), engine="arrow")
+        expected = AISDK(path, engine="arrow")
+        assert data.df["nav_status"].dtype == "category"
+        assert data.df["nav_status"].tolist() == expected.df["nav_status"].tolist()
+
+    def test_iter_chunks_from_zip(self, tmp_path):
+        csv_path = os.path.join(self.test_dir, "data/test_aisdk_20180208_sample.csv")
+        zip_path = str(tmp_path / "aisdk_sample.zip")
+        with ZipFile(zip_path, "w") as zip_file:
+            zip_file.write(csv_path, "a.csv")
+            zip_file.write(csv_path, "b.csv")
+        batches = list(AISDK.iter_chunks(zip_path, chunksize=3))
+        assert all(isinstance(batch, AISDK) for batch in batches)
+        assert all(len(batch.df) <= 3 for batch in batches)
+        assert sum(len(batch.df) for batch in batches) == 8
+        assert TIMESTAMP in batches[0].df.columns
+        assert "x" in batches[0].df.columns
+
+    def test_iter_chunks_from_glob(self, tmp_path):
+        csv_path = os.path.join(self.test_dir, "data/test_aisdk_20180208_sample.csv")
+        for name in ["aisdk-2018-02-08.zip", "aisdk-2018-02-09.zip"]:
+            with ZipFile(str(tmp_path / name), "w") as zip_file:
+                zip_file.write(csv_path, "a.csv")
+        batches = list(AISDK.iter_chunks(str(tmp_path / "aisdk-*.zip"), chunksize=3))
+        assert sum(len(batch.df) for batch in batches) == 8
+        with pytest.raises(ValueError, match="Error reading from"):
+            list(AISDK.iter_chunks(str(tmp_path / "missing-*.zip")))
+
+    def test_iter_chunks_filters_once(self, monkeypatch):
+        from mobiml.datasets import aisdk
+
+        path = os.path.join(self.test_dir, "data/test_aisdk_20180208_sample.csv")
+        calls = []
+        filter_ais_records = aisdk.filter_ais_records
+
+        def counting_filter(df, *args):
+            calls.append(len(df))
+            return filter_ais_records(df, *args)
+
+        monkeypatch.setattr(aisdk, "filter_ais_records", counting_filter)
+        batches = list(AISDK.iter_chunks(path, chunksize=100))
+        assert len(calls) == len(batches) == 1
+
+    def test_data_from_zip_in_parallel(self, tmp_path):
+        csv_path = os.path.join(self.test_dir, "data/test_aisdk_20180208_sample.csv")
+        for name in ["aisdk-2018-02-08.zip", "aisdk-2018-02-09.zip"]:
+            with ZipFile(str(tmp_path / name), "w") as zip_file:
+                zip_file.write(csv_path, "a.csv")
+                zip_file.write(csv_path, "b.csv")
+        data = AISDK(str(tmp_path / "aisdk-2018-02-*.zip"), n_jobs=2)
+        assert isinstance(data, AISDK)
+        assert len(data.df) == 16
+        single = AISDK(csv_path)
+        assert data.df[TRAJ_ID].tolist() == single.df[TRAJ_ID].tolist() * 4
+
+    def test_iter_chunks_with_bbox(self):
+        path = os.path.join(self.test_dir, "data/test_aisdk_20180208_sample.csv")
+        data = AISDK(path)
+        x, y = data.df.x.iloc[0], data.df.y.iloc[0]
+        bbox = (x - 0.001, y - 0.001, x + 0.001, y + 0.001)
+        batches = list(AISDK.iter_chunks(path, chunksize=2, bbox=bbox))
+        n = sum(len(batch.df) for batch in batches)
+        expected = AISDK(path, *bbox)
+        assert n == len(expected.df)
+        assert n >= 1
+
 
 class TestPreprocessedAISDK:
     test_dir = os.path.dirname(os.path.realpath(__file__))
@@ -0,0 +1,33 @@
+from benchmarks import runner
+from benchmarks.data import ais_frame
+
+
+class TestBenchmarks:
+    def test_registry(self):
+        names = [bench.name for bench in runner.select()]
+        assert "datasets.load_aisdk" in names
+        assert "preprocessing.downsampler_subsample" in names
+        assert [b.name for b in runner.select(["filter_"])] == [
+            "preprocessing.filter_min_pts",
+            "preprocessing.filter_speed",
+        ]
+
+    def test_run_and_compare(self):
+        bench = runner.select(["filter_min_pts"])[0]
+        result = runner.run_benchmark(bench, 2_000, repeat=2)
+        assert result["status"] == "ok"
+        assert result["repeat"] == 2
+        assert result["peak_memory"] > 0
+        skipped = runner.Benchmark("slow", bench.func, bench.setup, max_rows=1_000)
+        assert runner.run_benchmark(skipped, 2_000)["status"] == "skipped"
+
+        base = {"results": [result]}
+        slower = {"results": [dict(result, time=result["time"] * 2)]}
+        assert not runner.compare(base, base)[0]["regression"]
+        assert runner.compare(base, slower)[0]["regression"]
+
+    def test_ais_frame(self):
+        df = ais_frame(1_000, points_per_traj=100)
+        assert len(df) == 1_000
+        assert df["traj_id"].nunique() == 10
+        assert df.groupby("traj_id")["timestamp"].is_monotonic_increasing.all()
@@ -29,7 +29,10 @@ class TestCopenhagenCyclists:
         assert isinstance(data, CopenhagenCyclists)
         assert TRAJ_ID in data.df.columns
         assert TIMESTAMP in data.df.columns
-        assert COORDS in data.df.columns
+        assert COORDS not in data.df.columns
+        assert "x" in data.df.columns
+        assert "y" in data.df.columns
+        assert data.df["x"].dtype == "float64"
         assert ROWNUM in data.df.columns
         assert MOVER_ID not in data.df.columns
         trajs = data.to_trajs()
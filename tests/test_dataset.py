@@ -1,11 +1,13 @@
 import os
+import numpy as np
 import pandas as pd
+import pytest
 from geopandas import GeoDataFrame
 from movingpandas import TrajectoryCollection
 from shapely.geometry import Point
 from datetime import datetime
 
-from mobiml.datasets import Dataset, MOVER_ID, TRAJ_ID
+from mobiml.datasets import Dataset, DatasetStatistics, MOVER_ID, TIMESTAMP, TRAJ_ID
 
 
 class TestDataset:
@@ -91,9 +93,349 @@ class TestDataset:
         trajs = data.to_trajs()
         assert isinstance(trajs, TrajectoryCollection)
 
+    def test_dataset_from_glob_in_parallel(self):
+        path = os.path.join(self.test_dir, "data/test.*")
+        kwargs = dict(traj_id="tid", mover_id="mid", timestamp="t", crs=31256)
+        data = Dataset(path, n_jobs=2, **kwargs)
+        expected = Dataset(path, **kwargs)
+        csv = Dataset(os.path.join(self.test_dir, "data/test.csv"), **kwargs)
+        assert len(data.df) == 2 * len(csv.df)
+        pd.testing.assert_frame_equal(data.df, expected.df)
+
+    def test_dataset_from_glob_without_matches(self):
+        path = os.path.join(self.test_dir, "data/missing_*.csv")
+        with pytest.raises(ValueError, match="Error reading from"):
+            Dataset(path, traj_id="tid", mover_id="mid", timestamp="t")
+
+    def test_dataset_from_zipped_csv_with_arrow_engine(self):
+        path = os.path.join(self.test_dir, "data/test.zip")
+        kwargs = dict(traj_id="tid", mover_id="mid", timestamp="t", crs=31256)
+        data = Dataset(path, engine="arrow", **kwargs)
+        expected = Dataset(path, **kwargs)
+        assert data.df[TIMESTAMP].tolist() == expected.df[TIMESTAMP].tolist()
+        assert data.df[TRAJ_ID].tolist() == expected.df[TRAJ_ID].tolist()
+
+    def test_parquet_store_round_trip(self, tmp_path):
+        data = Dataset(self.gdf, name="test", traj_id="tid", mover_id="mid")
+        data.df[TIMESTAMP] = data.df.index
+        data.df = data.df.reset_index(drop=True)
+        data.df.loc[3, TIMESTAMP] = datetime(2018, 1, 2, 12, 0, 0)
+        out_path = str(tmp_path / "store")
+        data.to_parquet(out_path, partition_by=["date"], row_group_size=2)
+        assert sorted(os.listdir(out_path)) == ["date=2018-01-01", "date=2018-01-02"]
+        restored = Dataset(out_path)
+        assert restored.name == "test"
+        assert len(restored.df) == 4
+        assert "geometry" not in restored.df.columns
+        assert restored.get_bounds() == data.get_bounds()
+        assert isinstance(restored.to_trajs(), TrajectoryCollection)
+
+    def test_parquet_store_with_filters(self, tmp_path):
+        data = Dataset(self.gdf, name="test", traj_id="tid", mover_id="mid", crs=3857)
+        data.df[TIMESTAMP] = data.df.index
+        out_path = str(tmp_path / "store.parquet")
+        data.to_parquet(out_path)
+        restored = Dataset(
+            out_path, time=(datetime(2018, 1, 1, 12, 5), datetime(2018, 1, 1, 13))
+        )
+        assert restored.crs == 3857
+        assert len(restored.df) == 3
+        restored = Dataset(out_path, bbox=(5, 2, 7, 7), movers=["a"])
+        assert restored.df["y"].tolist() == [3, 6]
+        restored = Dataset(out_path, movers=["b"])
+        assert len(restored.df) == 0
+
     def test_get_bounds(self):
         data = Dataset(self.gdf, name="test", traj_id="tid", mover_id="mid")
         assert isinstance(data, Dataset)
         bounds = data.get_bounds()
         min_x, min_y, max_x, max_y = 0, 3, 6, 9
         assert (min_x, min_y, max_x, max_y) == bounds
+
+    def test_coordinates_stored_as_x_y_columns(self):
+        df = pd.DataFrame(
+            [
+                {"tid": 1, "coordinates": [(0, 3), (6, 3)]},
+                {"tid": 2, "coordinates": [(6, 6)]},
+            ]
+        )
+        data = Dataset(df, traj_id="tid", coord_dtype="float32")
+        data.explode_coordinate_list()
+        assert "coordinates" not in data.df.columns
+        assert data.df["x"].dtype == "float32"
+        assert data.df["y"].tolist() == [3, 3, 6]
+        gdf = data.to_gdf()
+        assert isinstance(gdf, GeoDataFrame)
+        assert gdf.geometry.iloc[1] == Point(6, 3)
+        assert data.get_bounds() == (0, 3, 6, 6)
+
+    def test_explode_coordinate_lists(self):
+        df = pd.DataFrame(
+            {
+                "tid": [1, 2, 3],
+                "xs": [[0, 6], "[]", [1]],
+                "ys": [[3, 4], [], [5]],
+            }
+        )
+        data = Dataset(df, traj_id="tid")
+        data.explode_coordinate_lists("xs", "ys")
+        assert data.df["traj_id"].tolist() == [1, 1, 2, 3]
+        assert data.df["running_number"].tolist() == [0, 1, 0, 0]
+        assert data.df["x"].tolist()[:2] == [0, 6]
+        assert data.df["y"].isna().tolist() == [False, False, True, False]
+        assert "xs" not in data.df.columns
+
+    def test_explode_coordinate_lists_length_mismatch(self):
+        df = pd.DataFrame({"tid": [1], "xs": [[0, 6]], "ys": [[3]]})
+        data = Dataset(df, traj_id="tid")
+        with pytest.raises(ValueError):
+            data.explode_coordinate_lists("xs", "ys")
+
+    def test_derived_representations_are_cached(self):
+        data = Dataset(self.gdf, name="test", traj_id="tid", mover_id="mid")
+        data.df[TIMESTAMP] = data.df.index
+        trajs = data.to_trajs()
+        trajs.add_speed()
+        traj = trajs.trajectories[0]
+        traj.df.drop(index=traj.df.index[0], inplace=True)
+        fresh = data.to_trajs()
+        assert fresh is not trajs
+        assert "speed" not in fresh.trajectories[0].df.columns
+        assert len(fresh.trajectories[0].df) == len(traj.df) + 1
+        gdf = data.to_gdf()
+        gdf["extra"] = 1
+        assert "extra" not in data.to_gdf().columns
+        data.df = data.df.iloc[:2].copy()
+        assert data.get_bounds() == (0, 3, 6, 3)
+        data.df.drop(columns=[MOVER_ID], inplace=True)
+        assert MOVER_ID not in data.to_df().columns
+
+    def test_invalidate_after_in_place_edit(self):
+        df = pd.DataFrame({"tid": [1, 1], "x": [0.0, 1.0], "y": [0.0, 1.0]})
+        data = Dataset(df, traj_id="tid")
+        assert data.get_bounds() == (0, 0, 1, 1)
+        data.df.loc[1, "x"] = 5.0
+        data.invalidate()
+        assert data.get_bounds() == (0, 0, 5, 1)
+
+    def test_copy_shares_column_buffers(self):
+        df = pd.DataFrame({"tid": [1, 1], "x": [0.0, 1.0], "y": [0.0, 1.0]})
+        data = Dataset(df, traj_id="tid", name="test")
+        copy = data.copy()
+        assert copy.df is not data.df
+        assert np.shares_memory(copy.df["x"].to_numpy(), data.df["x"].to_numpy())
+        copy.name = "copy"
+        copy.df["x"] = copy.df["x"] + 1
+        copy.df["speed"] = 1.0
+        assert data.name == "test"
+        assert data.df["x"].tolist() == [0, 1]
+        assert "speed" not in data.df.columns
+        deep = data.copy(deep=True)
+        assert not np.shares_memory(deep.df["y"].to_numpy(), data.df["y"].to_numpy())
+
+    def test_stats(self):
+        data = Dataset(self.gdf, name="test", traj_id="tid", mover_id="mid")
+        data.df[TIMESTAMP] = data.df.index
+        stats = data.stats
+        assert stats.bounds == (0, 3, 6, 9)
+        assert stats.time_range == (
+            pd.Timestamp(2018, 1, 1, 12, 0),
+            pd.Timestamp(2018, 1, 1, 12, 15),
+        )
+        assert (stats.n_rows, stats.n_trajs, stats.n_movers) == (4, 1, 1)
+        assert stats.columns[TRAJ_ID] == (1, 1)
+        data.df = data.df.iloc[:2]
+        assert data.stats.n_rows == 2
+        merged = data.stats.merge(stats)
+        assert merged.n_rows == 6
+        assert merged.n_trajs == 1
+        assert merged.bounds == (0, 3, 6, 9)
+
+    def test_stats_stored_with_outputs(self, tmp_path, monkeypatch):
+        data = Dataset(self.gdf, name="test", traj_id="tid", mover_id="mid")
+        data.df[TIMESTAMP] = data.df.index
+        parquet_path = str(tmp_path / "store")
+        data.to_parquet(parquet_path, partition_by=["date"])
+        feather_path = str(tmp_path / "data.feather")
+        data.to_feather(feather_path)
+        assert os.path.exists(feather_path + ".stats.json")
+
+        def fail(*args, **kwargs):
+            raise AssertionError("statistics were computed from the data")
+
+        monkeypatch.setattr(DatasetStatistics, "from_df", fail)
+        for path in [parquet_path, feather_path]:
+            restored = Dataset(path)
+            assert restored.get_bounds() == (0, 3, 6, 9)
+            assert restored.stats.time_range == data.stats.time_range
+            assert restored.stats.n_movers == 1
+
+    def test_trajectory_index(self):
+        df = pd.DataFrame(
+            {
+                "tid": [2, 1, 2, 1, 3],
+                "mid": ["b", "a", "b", "a", "a"],
+                "t": pd.to_datetime(
+                    ["12:02", "12:01", "12:01", "12:00", "12:00"], format="%H:%M"
+                ),
+                "x": [4.0, 1.0, 3.0, 0.0, 9.0],
+                "y": [0.0, 0.0, 0.0, 0.0, 0.0],
+            }
+        )
+        data = Dataset(df, traj_id="tid", mover_id="mid", timestamp="t")
+        with pytest.raises(ValueError):
+            data.trajectory_index
+        assert data.df["x"].tolist() == [4, 1, 3, 0, 9]
+        data.sort_trajectories()
+        index = data.trajectory_index
+        assert index.ids.tolist() == [1, 3, 2]
+        assert index.lengths.tolist() == [2, 1, 2]
+        assert data.trajectory(2)["x"].tolist() == [3, 4]
+        assert index.reduce(data.df["x"], np.maximum).tolist() == [1, 9, 4]
+        assert index.first(data.df["x"]).tolist() == [0, 9, 3]
+        assert index.last(data.df["x"]).tolist() == [1, 9, 4]
+        assert [tid for tid, _ in data.iter_trajectories()] == [1, 3, 2]
+        assert data.mover_index.ids.tolist() == ["a", "b"]
+        assert data.trajectory_index is index
+        data.df = data.df.iloc[:3]
+        assert data.trajectory_index is not index
+
+    def test_query(self):
+        rng = np.random.default_rng(0)
+        n = 5000
+        df = pd.DataFrame(
+            {
+                "tid": rng.integers(0, 50, n),
+                "t": pd.Timestamp("2018-01-01")
+                + pd.to_timedelta(rng.integers(0, 86400, n), unit="s"),
+                "x": rng.uniform(0, 100, n),
+                "y": rng.uniform(0, 10, n),
+            }
+        )
+        df["mid"] = df["tid"] % 7
+        data = Dataset(df, traj_id="tid", mover_id="mid", timestamp="t")
+        bbox = (20, 2, 30.5, 4)
+        t0, t1 = pd.Timestamp("2018-01-01 06:00"), pd.Timestamp("2018-01-01 12:00")
+        result = data.query(bbox=bbox, time=(t0, t1), movers=[1, 3])
+        expected = data.df[
+            data.df["x"].between(20, 30.5)
+            & data.df["y"].between(2, 4)
+            & data.df[TIMESTAMP].between(t0, t1)
+            & data.df[MOVER_ID].isin([1, 3])
+        ]
+        assert len(expected) > 0
+        pd.testing.assert_frame_equal(result.df, expected)
+        assert len(data.query(bbox=(200, 200, 300, 300)).df) == 0
+        assert len(data.query().df) == n
+
+    def test_point_index_stored_with_feather(self, tmp_path, monkeypatch):
+        data = Dataset(self.gdf, name="test", traj_id="tid", mover_id="mid")
+        data.df[TIMESTAMP] = data.df.index
+        path = str(tmp_path / "data.feather")
+        data.to_feather(path, index=True)
+        assert os.path.exists(path + ".index.npz")
+
+        def fail(*args, **kwargs):
+            raise AssertionError("index was rebuilt")
+
+        monkeypatch.setattr(Dataset, "_build_point_index", fail)
+        restored = Dataset(path)
+        assert len(restored.query(bbox=(5, 2, 7, 7), movers=["a"]).df) == 2
+        assert len(restored.query(movers=["ab"]).df) == 0
+
+    def test_append(self):
+        t = pd.date_range("2018-01-01 23:58", periods=4, freq="1min")
+        day1 = pd.DataFrame(
+            {"tid": [1, 1, 1, 2], "t": t, "x": [0.0, 1, 2, 5], "y": [0.0, 0, 0, 5]}
+        )
+        day2 = pd.DataFrame(
+            {"tid": [1, 1, 3], "t": t[2:].append(t[:1]), "x": [2.5, 3, 9], "y": 0.0}
+        )
+        data = Dataset(day1, traj_id="tid", mover_id="tid", timestamp="t")
+        assert data.stats.n_rows == 4
+        batch = Dataset(day2, traj_id="tid", mover_id="tid", timestamp="t")
+        data.append(batch)
+        assert len(data.df) == 6
+        assert data.df[data.df[TRAJ_ID] == 1]["x"].tolist() == [0, 1, 2.5, 3]
+        assert data.dirty == {1, 3}
+        assert data.stats.n_rows == 6
+        assert data.stats.n_trajs == 3
+        assert data.dirty_trajectories().df[TRAJ_ID].unique().tolist() == [1, 3]
+        data.mark_clean()
+        assert len(data.dirty) == 0
+
+        day3 = pd.DataFrame(
+            {"tid": [2], "t": [t[3] + pd.Timedelta("1min")], "x": [-1.0], "y": [0.0]}
+        )
+        data.append(Dataset(day3, traj_id="tid", mover_id="tid", timestamp="t"))
+        assert len(data.df) == 7
+        assert data.dirty == {2}
+        assert data.stats.bounds == (-1, 0, 9, 5)
+        assert data.df.index.is_unique
+
+    def test_compact(self):
+        df = pd.DataFrame(
+            {
+                "tid": [1, 1, 2, 2],
+                "mmsi": [219000001, 219000001, 219000002, 219000002],
+                "status": ["moving", "moving", "moored", "moving"],
+                "sog": [1.5, 2.0, 0.0, 3.5],
+                "x": [10.0, 10.1, 10.2, 10.3],
+                "y": [55.0, 55.1, 55.2, 55.3],
+            }
+        )
+        data = Dataset(df, traj_id="tid")
+        report = data.compact()
+        assert data.df["mmsi"].dtype == "uint32"
+        assert data.df["status"].dtype == "category"
+        assert data.df["sog"].dtype == "float32"
+        assert data.df["x"].dtype == "float64"
+        assert report.loc["mmsi", "dtype_before"] == "int64"
+        assert report.loc["sog", "bytes_after"] < report.loc["sog", "bytes_before"]
+        data.compact(coordinates=True)
+        assert data.df["x"].dtype == "float32"
+
+    def test_ingest_cache(self, tmp_path, monkeypatch):
+        path = os.path.join(self.test_dir, "data/test.csv")
+        cache_dir = str(tmp_path / "cache")
+        kwargs = dict(traj_id="tid", mover_id="mid", timestamp="t", crs=31256)
+        data = Dataset(path, cache_dir=cache_dir, **kwargs)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("source file was parsed again")
+
+        monkeypatch.setattr(Dataset, "load_from_path", fail)
+        cached = Dataset(path, cache_dir=cache_dir, **kwargs)
+        pd.testing.assert_frame_equal(cached.df, data.df)
+        assert cached.crs == 31256
+        assert isinstance(cached.to_trajs(), TrajectoryCollection)
+        with pytest.raises(AssertionError):
+            Dataset(path, cache_dir=cache_dir, nrows=2, **kwargs)
+
+    def test_ingest_cache_writable(self, tmp_path):
+        path = os.path.join(self.test_dir, "data/test.csv")
+        cache_dir = str(tmp_path / "cache")
+        kwargs = dict(traj_id="tid", mover_id="mid", timestamp="t")
+        Dataset(path, cache_dir=cache_dir, **kwargs)
+        cached = Dataset(path, cache_dir=cache_dir, **kwargs)
+        assert not cached.df["x"].to_numpy().flags.writeable
+        data = Dataset(path, cache_dir=cache_dir, cache_writable=True, **kwargs)
+        data.df.loc[data.df.index[0], "x"] = 5
+        assert data.df["x"].iloc[0] == 5
+
+    def test_ingest_cache_key_includes_parser(self, tmp_path, monkeypatch):
+        from mobiml.datasets import _cache
+
+        cache = _cache.IngestCache(str(tmp_path / "cache"))
+        path = os.path.join(self.test_dir, "data/test.csv")
+        key = cache.key(Dataset, path, (), {})
+        monkeypatch.setattr(_cache, "_parser_digest", lambda cls: "changed")
+        assert cache.key(Dataset, path, (), {}) != key
+
+    def test_ingest_cache_eviction(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        kwargs = dict(traj_id="tid", mover_id="mid", timestamp="t")
+        for file_name in ["test.csv", "test.zip"]:
+            path = os.path.join(self.test_dir, "data", file_name)
+            Dataset(path, cache_dir=cache_dir, cache_max_bytes=1, **kwargs)
+        assert not [f for f in os.listdir(cache_dir) if f.endswith(".arrow")]
@@ -57,3 +57,32 @@ class TestDeltaDatasetCreator:
         assert len(samples) == len(labels) == 1
         samples, labels = delta_dataset_creator.traj_windowing(delta_dataset, 10, 2, 10)
         assert len(samples) == len(labels) == 10
+
+    def test_get_delta_dataset_without_col(self):
+        path = os.path.join(
+            self.test_dir,
+            "data/test_nautilus_trajectories_preprocessed_100.csv",
+        )
+        dataset = PreprocessedBrestAIS(path)
+        delta_dataset_creator = DeltaDatasetCreator(dataset)
+        delta_dataset = delta_dataset_creator.get_delta_dataset(njobs=1)
+        assert delta_dataset.index.names[0] == "traj_id"
+        assert delta_dataset.dt_curr.tolist()[:3] == [259, 80, 91]
+        windowed_dataset = delta_dataset_creator.get_windowed_dataset(njobs=1)
+        assert len(windowed_dataset) == 1
+
+    def test_get_delta_dataset_drops_missing_keys(self):
+        path = os.path.join(
+            self.test_dir,
+            "data/test_nautilus_trajectories_preprocessed_100.csv",
+        )
+        dataset = PreprocessedBrestAIS(path)
+        split_dataset = TemporalSplitter(dataset).split(dev_size=0.25, test_size=0.25)
+        split = split_dataset.df["split"].astype(object)
+        split.iloc[:10] = None
+        split_dataset.df = split_dataset.df.assign(split=split)
+        delta_dataset_creator = DeltaDatasetCreator(split_dataset)
+        delta_dataset = delta_dataset_creator.get_delta_dataset("split", njobs=1)
+        assert not delta_dataset.index.get_level_values("split").isna().any()
+        dropped = split_dataset.df.index[:10]
+        assert not delta_dataset.index.get_level_values(-1).isin(dropped).any()
@@ -0,0 +1,51 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = [
+    "geopandas",
+    "shapely",
+    "pyproj",
+    "movingpandas",
+    "sklearn",
+    "torch",
+    "h3",
+    "pymeos",
+    "matplotlib",
+]
+
+
+def imported_modules(statement):
+    """Heavy modules loaded by a statement in a fresh interpreter"""
+    code = (
+        "import json, sys\n"
+        f"{statement}\n"
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+class TestImports:
+    def test_datasets_import_is_light(self):
+        assert imported_modules("from mobiml.datasets import AISDK, Dataset") == []
+
+    def test_subpackages_import_lazily(self):
+        statement = (
+            "import mobiml.preprocessing, mobiml.samplers, mobiml.transforms\n"
+            "from mobiml.preprocessing import AISValidator, TrajectoryFilter\n"
+            "from mobiml.samplers import TemporalSplitter"
+        )
+        assert imported_modules(statement) == []
+
+    def test_lazy_attributes(self):
+        import mobiml.preprocessing
+
+        assert "TrajectoryEnricher" in dir(mobiml.preprocessing)
+        assert mobiml.preprocessing.TrajectoryEnricher.__name__ == "TrajectoryEnricher"
+        with pytest.raises(AttributeError):
+            mobiml.preprocessing.Missing
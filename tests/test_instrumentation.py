@@ -0,0 +1,113 @@
+import json
+import logging
+import os
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from mobiml import instrumentation
+from mobiml.datasets import Dataset
+from mobiml.preprocessing import TrajectoryFilter
+
+
+class TestInstrumentation:
+    def setup_method(self):
+        self.records = []
+        instrumentation.add_hook(self.records.append)
+        self.df = pd.DataFrame(
+            {
+                "tid": [1, 1, 1, 2],
+                "t": [datetime(2018, 1, 1, 12, 0, s) for s in range(4)],
+                "x": [0.0, 1.0, 2.0, 3.0],
+                "y": [0.0, 0.0, 0.0, 0.0],
+            }
+        )
+
+    def teardown_method(self):
+        instrumentation.remove_hook(self.records.append)
+        instrumentation.enable()
+
+    def test_instrumented_stage(self):
+        data = Dataset(self.df, traj_id="tid", timestamp="t")
+        TrajectoryFilter(data).filter_min_pts(min_pts=2)
+        record = self.records[-1]
+        assert record["stage"] == "TrajectoryFilter.filter_min_pts"
+        assert record["params"] == {"min_pts": 2}
+        assert record["rows_in"] == 4
+        assert record["rows_out"] == 3
+        assert record["status"] == "ok"
+        assert record["wall_time"] >= 0 and record["cpu_time"] >= 0
+
+    def test_nested_stages(self):
+        with instrumentation.stage("outer", rows_in=1):
+            with instrumentation.stage("inner") as record:
+                record["rows_out"] = 2
+        assert [r["stage"] for r in self.records] == ["inner", "outer"]
+        assert self.records[0]["parent"] == "outer"
+        assert self.records[0]["rows_out"] == 2
+
+    def test_stage_with_name_parameter(self):
+        @instrumentation.instrument("rename")
+        def rename(df, name="speed"):
+            return df
+
+        rename(self.df, name="sog")
+        assert self.records[-1]["stage"] == "rename"
+        assert self.records[-1]["params"] == {"name": "sog"}
+
+    def test_disable(self, caplog):
+        instrumentation.disable()
+        data = Dataset(self.df, traj_id="tid", timestamp="t")
+        with caplog.at_level(logging.INFO):
+            TrajectoryFilter(data).filter_min_pts(min_pts=2)
+            logging.getLogger("mobiml.datasets").info("hidden")
+        assert self.records == []
+        assert caplog.records == []
+
+    def test_writers(self, tmp_path):
+        jsonl = os.path.join(tmp_path, "stages.jsonl")
+        prom = os.path.join(tmp_path, "stages.prom")
+        writers = [
+            instrumentation.JsonLinesWriter(jsonl),
+            instrumentation.PrometheusTextfileWriter(prom),
+        ]
+        for writer in writers:
+            instrumentation.add_hook(writer)
+        try:
+            for _ in range(2):
+                with instrumentation.stage("load", rows_in=10) as record:
+                    record["rows_out"] = 5
+        finally:
+            for writer in writers:
+                instrumentation.remove_hook(writer)
+
+        with open(jsonl) as f:
+            lines = [json.loads(line) for line in f]
+        assert len(lines) == 2 and lines[0]["stage"] == "load"
+        with open(prom) as f:
+            text = f.read()
+        assert 'mobiml_stage_calls_total{stage="load"} 2' in text
+        assert 'mobiml_stage_rows_out_total{stage="load"} 10' in text
+        assert "# TYPE mobiml_stage_max_rss_bytes gauge" in text
+        assert "# TYPE mobiml_stage_rss_delta_bytes gauge" in text
+
+    def test_rss_delta(self):
+        with instrumentation.stage("allocate") as record:
+            values = np.ones(2**25)  # 256 MiB
+            values[:] = 2
+        if record["rss_delta"] is not None:
+            assert record["rss_delta"] > 2**27
+        assert record["max_rss"] is None or record["max_rss"] >= 2**28
+
+    def test_log_to_console_twice(self):
+        logger = logging.getLogger("mobiml")
+        level = logger.level
+        try:
+            instrumentation.log_to_console()
+            instrumentation.log_to_console()
+            handlers = [h for h in logger.handlers if type(h) is logging.StreamHandler]
+            assert len(handlers) == 1
+        finally:
+            logger.removeHandler(instrumentation._console_handler)
+            instrumentation._console_handler = None
+            logger.setLevel(level)
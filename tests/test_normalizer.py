@@ -103,6 +103,12 @@ class TestNormalizer:
         speed = [0.6, 0.4, 0.2, 1]
         assert data.df["speed"].tolist() == speed
 
+    def test_max_speed_replace_false(self):
+        dataset = Dataset(self.gdf)
+        data = Normalizer(dataset).normalize(speed_max=5.0)
+        assert data.df["norm_speed"].tolist() == [0.6, 0.4, 0.2, 2.0]
+        assert data.df["speed"].tolist() == [3.0, 2.0, 1.0, 10.0]
+
     def test_no_speed(self):
         dataset = Dataset(self.gdf)
         assert isinstance(dataset, Dataset)
@@ -132,3 +138,11 @@ class TestNormalizer:
         assert len(data.df) == 4
         assert DIRECTION not in data.df.columns
         assert len(data.df.columns) == 6
+
+    def test_normalize_keeps_compact_dtypes(self):
+        dataset = Dataset(self.gdf, compact=True)
+        dtypes = dataset.df.dtypes
+        data = Normalizer(dataset).normalize(speed_max=5.0)
+        assert data.df[SPEED].dtype == "float32"
+        assert data.df["norm_speed"].dtype == "float32"
+        assert data.df[dtypes.index].dtypes.equals(dtypes)
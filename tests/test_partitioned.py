@@ -0,0 +1,119 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from mobiml.datasets import (
+    Dataset,
+    PartitionedDataset,
+    MOVER_ID,
+    TIMESTAMP,
+    TRAJ_ID,
+)
+from mobiml.preprocessing import Normalizer, TrajectoryFilter
+
+
+class TestPartitionedDataset:
+    def setup_method(self):
+        rng = np.random.default_rng(0)
+        n = 1000
+        df = pd.DataFrame(
+            {
+                "tid": rng.integers(0, 40, n),
+                "t": pd.Timestamp("2018-01-01")
+                + pd.to_timedelta(rng.permutation(n), unit="s"),
+                "x": rng.uniform(0, 10, n),
+                "y": rng.uniform(50, 55, n),
+                "speed": rng.uniform(0, 20, n),
+            }
+        )
+        df["mid"] = df["tid"] % 13
+        self.data = Dataset(
+            df, name="test", traj_id="tid", mover_id="mid", timestamp="t", crs=4326
+        )
+
+    def _sorted(self, df):
+        df = df[[TRAJ_ID, MOVER_ID, TIMESTAMP, "x", "y", "speed"]]
+        return df.sort_values([TRAJ_ID, TIMESTAMP]).reset_index(drop=True)
+
+    def test_from_dataset(self, tmp_path):
+        pds = PartitionedDataset.from_dataset(self.data, str(tmp_path), n_partitions=4)
+        assert len(pds) == 4
+        movers = [set(part.df[MOVER_ID]) for part in pds]
+        assert sum(len(m) for m in movers) == 13
+        assert set.union(*movers) == set(range(13))
+        assert pds.partition(0).crs == 4326
+        assert pds.stats.n_rows == 1000
+        assert pds.get_bounds() == self.data.get_bounds()
+        pd.testing.assert_frame_equal(
+            self._sorted(pds.to_dataset().df), self._sorted(self.data.df)
+        )
+
+    def test_from_chunks(self, tmp_path):
+        chunks = []
+        for i in range(3):
+            chunk = self.data.copy()
+            chunk.df = self.data.df.iloc[i * 400 : (i + 1) * 400]
+            chunks.append(chunk)
+        pds = PartitionedDataset.from_chunks(chunks, str(tmp_path), n_partitions=4)
+        assert pds.stats.n_rows == 1000
+        assert pds.stats.n_movers == 13
+        pd.testing.assert_frame_equal(
+            self._sorted(pds.to_dataset().df), self._sorted(self.data.df)
+        )
+
+    def test_map_partitions(self, tmp_path):
+        pds = PartitionedDataset.from_dataset(
+            self.data, str(tmp_path / "in"), n_partitions=4
+        )
+        out = pds.map_partitions(
+            TrajectoryFilter,
+            "filter_min_pts",
+            min_pts=26,
+            out_path=str(tmp_path / "out"),
+            n_jobs=2,
+        )
+        expected = TrajectoryFilter(self.data.copy()).filter_min_pts(min_pts=26)
+        pd.testing.assert_frame_equal(
+            self._sorted(out.to_dataset().df), self._sorted(expected.df)
+        )
+        assert pds.stats.n_rows == 1000
+
+        bounds = pds.get_bounds()
+        normalized = pds.map_partitions(
+            Normalizer, "normalize", bounds=bounds, speed_max=20, replace=True
+        )
+        assert normalized.path == pds.path
+        df = normalized.to_dataset().df
+        assert df["x"].min() >= 0 and df["x"].max() <= 1
+        assert len(df) == 1000
+
+    def test_append_and_incremental_map(self, tmp_path):
+        day1 = self.data.copy()
+        day1.df = self.data.df.iloc[:800]
+        day2 = self.data.copy()
+        day2.df = self.data.df[(self.data.df[MOVER_ID] == 5)].iloc[-30:]
+        pds = PartitionedDataset.from_dataset(day1, str(tmp_path / "in"), 4)
+        out_path = str(tmp_path / "out")
+        out = pds.map_partitions(
+            TrajectoryFilter, "filter_min_pts", 1, out_path=out_path
+        )
+        out_files = {part: os.path.getmtime(part) for part in out.partition_paths}
+
+        changed = pds.append(day2)
+        assert len(changed) == 1
+        merged = pd.concat([day1.df, day2.df]).drop_duplicates([MOVER_ID, TIMESTAMP])
+        assert pds.stats.n_rows == len(merged)
+
+        out = pds.map_partitions(
+            TrajectoryFilter, "filter_min_pts", 1, out_path=out_path, incremental=True
+        )
+        recomputed = [
+            part
+            for part in out.partition_paths
+            if os.path.getmtime(part) != out_files[part]
+        ]
+        assert recomputed == [os.path.join(out_path, f"part-{changed[0]:05d}")]
+        pd.testing.assert_frame_equal(
+            self._sorted(out.to_dataset().df), self._sorted(merged)
+        )
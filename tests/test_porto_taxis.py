@@ -1,4 +1,7 @@
+import json
 import os
+import pandas as pd
+from datetime import timedelta
 from movingpandas import TrajectoryCollection
 
 from mobiml.datasets import (
@@ -8,6 +11,7 @@ from mobiml.datasets import (
     TIMESTAMP,
     COORDS,
     ROWNUM,
+    unixtime_to_datetime,
 )
 
 
@@ -21,8 +25,26 @@ class TestPortoTaxis:
         assert TRAJ_ID in data.df.columns
         assert MOVER_ID in data.df.columns
         assert TIMESTAMP in data.df.columns
-        assert COORDS in data.df.columns
+        assert COORDS not in data.df.columns
+        assert "x" in data.df.columns
+        assert "y" in data.df.columns
+        assert data.df["x"].dtype == "float64"
         assert ROWNUM in data.df.columns
         trajs = data.to_trajs()
         assert isinstance(trajs, TrajectoryCollection)
         assert len(data.df) == 332
+
+    def test_timestamps_and_running_numbers(self):
+        path = os.path.join(self.test_dir, "data/test_train.csv")
+        data = PortoTaxis(path)
+        raw = pd.read_csv(path)
+        first = data.df[data.df[TRAJ_ID] == raw.TRIP_ID[0]]
+        polyline = json.loads(raw.POLYLINE[0])
+        assert first[ROWNUM].tolist() == list(range(len(polyline)))
+        assert first["x"].tolist() == [xy[0] for xy in polyline]
+        assert first["y"].tolist() == [xy[1] for xy in polyline]
+        t0 = unixtime_to_datetime(raw.TIMESTAMP[0])
+        assert first[TIMESTAMP].iloc[0] == t0
+        assert first[TIMESTAMP].iloc[-1] == t0 + (len(polyline) - 1) * timedelta(
+            seconds=15
+        )
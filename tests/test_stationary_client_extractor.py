@@ -3,10 +3,10 @@ import pandas as pd
 import geopandas as gpd
 from geopandas import GeoDataFrame
 from datetime import datetime
-from shapely.geometry import Point
+from shapely.geometry import Point, box
 
 from mobiml.utils import convert_wgs_to_utm
-from mobiml.datasets import AISDK
+from mobiml.datasets import AISDK, SPEED
 from mobiml.preprocessing import StationaryClientExtractor
 
 
@@ -112,3 +112,12 @@ class TestStationaryClientExtractor:
         client_data = extractor.extract(buffered_antennas)
         assert isinstance(client_data, AISDK)
         assert len(client_data.df) == 0
+
+    def test_extract_keeps_compact_dtypes(self):
+        antennas = gpd.GeoDataFrame(geometry=[box(-1, -1, 4, 4)], crs=4326)
+        aisdk = AISDK(self.dataset, -1, -1, 7, 7, compact=True)
+        dtypes = aisdk.df.dtypes
+        client_data = StationaryClientExtractor(aisdk).extract(antennas)
+        assert len(client_data.df) == 4
+        assert client_data.df[SPEED].dtype == "uint8"
+        assert client_data.df[dtypes.index].dtypes.equals(dtypes)
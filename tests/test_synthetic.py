@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mobiml.datasets import (
+    MOVER_ID,
+    TIMESTAMP,
+    TRAJ_ID,
+    SyntheticAIS,
+    SyntheticCyclists,
+    SyntheticTaxis,
+)
+
+
+class TestSynthetic:
+    def test_ais(self):
+        data = SyntheticAIS(points_per_traj=100).generate(1_050)
+        df = data.df
+        assert len(df) == 1_050
+        assert data.crs == 4326
+        assert df[TRAJ_ID].nunique() == 11
+        assert df[MOVER_ID].nunique() == 6
+        assert df[MOVER_ID].min() == 219_000_000
+        assert df.groupby(MOVER_ID)[TIMESTAMP].is_monotonic_increasing.all()
+        min_x, min_y, max_x, max_y = SyntheticAIS.bbox
+        assert df["x"].between(min_x, max_x).all()
+        assert df["y"].between(min_y, max_y).all()
+        dt = df.groupby(TRAJ_ID)[TIMESTAMP].diff().dt.total_seconds().dropna()
+        assert dt.between(5, 3600).all()
+
+    def test_options(self):
+        generator = SyntheticTaxis(
+            seed=3, bbox=(0.0, 40.0, 1.0, 41.0), interval=(30, 30), outlier_ratio=0.1
+        )
+        df = generator.generate(1_000).df
+        dt = df.groupby(TRAJ_ID)[TIMESTAMP].diff().dt.total_seconds().dropna()
+        assert (dt % 30 == 0).all()
+        outside = ~(df["x"].between(0, 1) & df["y"].between(40, 41))
+        assert 0 < outside.sum() < 250
+        with pytest.raises(TypeError):
+            SyntheticTaxis(unknown=1)
+
+    def test_cyclists(self):
+        df = SyntheticCyclists().generate(300).df
+        assert MOVER_ID not in df.columns
+        assert df["x"].between(0, 640).all() and df["y"].between(0, 360).all()
+
+    def test_deterministic_chunks(self):
+        generator = SyntheticAIS(seed=5, points_per_traj=50)
+        df = generator.frame(2_000, chunk_size=300)
+        pd.testing.assert_frame_equal(df, generator.frame(2_000, chunk_size=300))
+        chunks = list(generator.iter_chunks(2_000, chunk_size=300))
+        assert len(chunks) == 7
+        assert sum(len(chunk.df) for chunk in chunks) == 2_000
+        assert not np.array_equal(
+            df["x"], SyntheticAIS(seed=6, points_per_traj=50).frame(2_000)["x"]
+        )
+
+    def test_to_parquet(self, tmp_path):
+        generator = SyntheticAIS(points_per_traj=50)
+        path = str(tmp_path / "store")
+        pds = generator.to_parquet(path, 3_000, chunk_size=500, n_partitions=4)
+        assert pds.stats.n_rows == 3_000
+        assert pds.stats.n_movers == 30
+        expected = generator.frame(3_000, chunk_size=500)
+        stored = pds.to_dataset().df.sort_values([TRAJ_ID, TIMESTAMP])
+        np.testing.assert_allclose(stored["x"], expected["x"])
+        with pytest.raises(ValueError):
+            generator.to_parquet(path, 100)
@@ -175,6 +175,13 @@ class TestTemporalSplitter:
         result = data.df["split"].tolist()
         assert result == expected
 
+        indexed = Dataset(self.gdf)
+        indexed.point_index
+        data = TemporalSplitter(indexed).split_at_timestamp(
+            timestamp=datetime(2018, 1, 2, 3, 0, 0)
+        )
+        assert data.df["split"].tolist() == expected
+
     def test_split_at_timestamp_2(self):
         df = pd.DataFrame(
             [
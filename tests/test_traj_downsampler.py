@@ -1,4 +1,6 @@
 import os
+import warnings
+import numpy as np
 import pandas as pd
 from geopandas import GeoDataFrame
 from datetime import datetime
@@ -8,6 +10,17 @@ from mobiml.datasets import Dataset, MOVER_ID, TIMESTAMP, TRAJ_ID
 from mobiml.preprocessing import TrajectoryDownsampler
 
 
+def accumulate_subsample(df, min_dt_sec):
+    """Reference implementation with a Python accumulate per trajectory"""
+    sumlm = np.frompyfunc(lambda a, b: a + b if a < min_dt_sec else b, 2, 1)
+    kept = []
+    for _, traj_df in df.sort_values(TIMESTAMP, kind="mergesort").groupby(TRAJ_ID):
+        with warnings.catch_warnings(record=True):
+            acc = sumlm.accumulate(traj_df[TIMESTAMP].diff().dt.total_seconds())
+        kept.append(traj_df[~(acc < min_dt_sec).to_numpy(dtype=bool)])
+    return pd.concat(kept)
+
+
 class TestTrajectoryDownsampler:
     test_dir = os.path.dirname(os.path.realpath(__file__))
 
@@ -83,3 +96,36 @@ class TestTrajectoryDownsampler:
         assert MOVER_ID in data.columns
         assert TIMESTAMP in data.columns
         assert len(data) == 4
+
+    def test_subsample_matches_accumulate(self):
+        rng = np.random.default_rng(0)
+        n = 500
+        df = pd.DataFrame(
+            {
+                TRAJ_ID: rng.integers(0, 8, n),
+                TIMESTAMP: pd.Timestamp("2018-01-01")
+                + pd.to_timedelta(rng.integers(0, 4000, n) / 4, unit="s"),
+                "x": rng.random(n),
+            },
+            index=rng.permutation(n),
+        )
+        for min_dt_sec in [0, 1, 10, 12.5]:
+            expected = accumulate_subsample(df, min_dt_sec)
+            data = TrajectoryDownsampler(Dataset(df.copy())).subsample(min_dt_sec)
+            pd.testing.assert_frame_equal(data.df, expected)
+
+    def test_subsample_duplicate_index(self):
+        df = self.gdf.set_index(pd.Index([0, 0, 1, 1, 2, 2, 3]))
+        dataset = Dataset(df, traj_id="tid", mover_id="mid", timestamp="txx")
+        data = TrajectoryDownsampler(dataset).subsample(min_dt_sec=10)
+        assert data.df[TRAJ_ID].tolist() == [1, 1, 2, 2, 3]
+        assert data.df.index.tolist() == [0, 1, 1, 2, 2]
+
+    def test_subsample_keeps_compact_dtypes(self):
+        dataset = Dataset(
+            self.gdf, traj_id="tid", mover_id="mid", timestamp="txx", compact=True
+        )
+        dtypes = dataset.df.dtypes
+        data = TrajectoryDownsampler(dataset).subsample(min_dt_sec=10)
+        assert data.df[TRAJ_ID].dtype == "uint8"
+        assert data.df.dtypes.equals(dtypes)
@@ -1,5 +1,8 @@
 import os
+import warnings
+import numpy as np
 import pandas as pd
+import pytest
 from geopandas import GeoDataFrame
 from datetime import datetime
 from shapely.geometry import Point
@@ -54,7 +57,7 @@ class TestTrajectoryEnricher:
         dataset = Dataset(self.gdf, traj_id="tid", mover_id="mid", timestamp="txx")
         enricher = TrajectoryEnricher(dataset)
         assert isinstance(enricher, TrajectoryEnricher)
-        data = enricher.add_speed()
+        data = enricher.add_speed(engine="native")
         assert TRAJ_ID in data.df.columns
         assert MOVER_ID in data.df.columns
         assert TIMESTAMP in data.df.columns
@@ -66,10 +69,82 @@ class TestTrajectoryEnricher:
         dataset = Dataset(self.gdf, traj_id="tid", mover_id="mid", timestamp="txx")
         enricher = TrajectoryEnricher(dataset)
         assert isinstance(enricher, TrajectoryEnricher)
-        data = enricher.add_direction()
+        data = enricher.add_direction(engine="native")
         assert TRAJ_ID in data.df.columns
         assert MOVER_ID in data.df.columns
         assert TIMESTAMP in data.df.columns
         assert DIRECTION in data.df.columns
         direction_list = data.df[DIRECTION].to_list()
         assert direction_list == [90.0, 90.0, 0.0, 270.0]
+
+    def test_add_speed_keeps_compact_dtypes(self):
+        df = pd.DataFrame(self.gdf.drop(columns="geometry"))
+        df["x"] = self.gdf.geometry.x
+        df["y"] = self.gdf.geometry.y
+        df["status"] = "moving"
+        dataset = Dataset(
+            df, traj_id="tid", mover_id="mid", timestamp="txx", crs=31256, compact=True
+        )
+        dtypes = dataset.df.dtypes
+        data = TrajectoryEnricher(dataset).add_speed(engine="native")
+        assert data.df[TRAJ_ID].dtype == dtypes[TRAJ_ID] == "uint8"
+        assert data.df["status"].dtype == "category"
+        assert data.df["x"].dtype == "float64"
+        assert data.df[SPEED].dtype == "float32"
+        assert data.df[SPEED].to_list() == [6, 6, 6, 6]
+
+    def test_engines_match(self):
+        df = pd.DataFrame(
+            {
+                "tid": [1, 1, 1, 1, 2, 2, 2],
+                "t": pd.to_datetime(["2018-01-01 12:00:00"] * 7)
+                + pd.to_timedelta([0, 10, 25, 30, 0, 60, 90], unit="s"),
+                "x": [11.0, 11.001, 11.003, 11.003, 12.0, 12.01, 12.0],
+                "y": [55.0, 55.001, 55.001, 55.002, 56.0, 56.0, 56.01],
+            }
+        )
+        kwargs = dict(
+            speed=True,
+            direction=True,
+            acceleration=True,
+            speed_units=("km", "h"),
+            acceleration_units=("km", "h", "s"),
+        )
+        expected = TrajectoryEnricher(
+            Dataset(df.copy(), traj_id="tid", timestamp="t", crs=4326)
+        ).add_features(engine="movingpandas", **kwargs)
+        data = TrajectoryEnricher(
+            Dataset(df.copy(), traj_id="tid", timestamp="t", crs=4326)
+        ).add_features(engine="native", **kwargs)
+        for col in [SPEED, DIRECTION, "acceleration"]:
+            np.testing.assert_allclose(data.df[col], expected.df[col], rtol=1e-9)
+
+    def test_add_features_native(self):
+        dataset = Dataset(self.gdf, traj_id="tid", mover_id="mid", timestamp="txx")
+        data = TrajectoryEnricher(dataset).add_features(
+            distance=True, timedelta=True, angular_difference=True, turn_rate=True
+        )
+        assert data.df["distance"].to_list() == [0, 6, 6, 6]
+        assert data.df["timedelta"].isna().to_list() == [True, False, False, False]
+        assert data.df["angular_difference"].to_list() == [0, 0, 90, 90]
+        assert data.df["turn_rate"].to_list() == [0, 0, 90, 90]
+        with pytest.raises(RuntimeError):
+            TrajectoryEnricher(data).add_features(distance=True)
+        with pytest.raises(ValueError):
+            TrajectoryEnricher(data).add_features(
+                distance=True, overwrite=True, engine="movingpandas"
+            )
+
+    def test_default_engine(self):
+        dataset = Dataset(self.gdf, traj_id="tid", mover_id="mid", timestamp="txx")
+        with pytest.warns(FutureWarning, match="default engine"):
+            data = TrajectoryEnricher(dataset).add_speed(name="v")
+        assert data.df["v"].to_list() == [6, 6, 6, 6]
+        with pytest.raises(TypeError):
+            TrajectoryEnricher(data).add_speed(
+                overwrite=True, name="v", engine="native", unknown=1
+            )
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", FutureWarning)
+            data = TrajectoryEnricher(data).add_features(distance=True)
+        assert data.df["distance"].to_list() == [0, 6, 6, 6]
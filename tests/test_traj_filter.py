@@ -1,7 +1,7 @@
 import os
 import pandas as pd
 from geopandas import GeoDataFrame
-from datetime import datetime
+from datetime import datetime, timedelta
 from shapely.geometry import Point
 
 from mobiml.datasets import Dataset, SPEED, MOVER_ID, TIMESTAMP, TRAJ_ID
@@ -104,3 +104,57 @@ class TestTrajectoryFilter:
         assert TIMESTAMP in data.df.columns
         assert SPEED in data.df.columns
         assert len(data.to_trajs()) == 2
+
+    def test_filter_speed_duplicate_index(self):
+        gdf = self.gdf.set_index(pd.Index([0, 0, 1, 1, 2, 2, 3]))
+        dataset = Dataset(gdf, traj_id="tid", mover_id="mid", timestamp="txx")
+        data = TrajectoryFilter(dataset).filter_speed(min_speed=1, max_speed=10)
+        assert data.df[SPEED].tolist() == [1, 4, 7, 6, 9]
+
+    def test_builder(self):
+        dataset = Dataset(self.gdf, traj_id="tid", mover_id="mid", timestamp="txx")
+        data = (
+            TrajectoryFilter(dataset)
+            .speed(max_speed=10)
+            .time_range(end=datetime(2018, 1, 1, 12, 0, 10))
+            .min_pts(2)
+            .max_pts(2)
+            .apply()
+        )
+        assert data.df[TRAJ_ID].tolist() == [2, 2]
+
+    def test_builder_duration_and_length(self):
+        dataset = Dataset(self.gdf, traj_id="tid", mover_id="mid", timestamp="txx")
+        filter = TrajectoryFilter(dataset).min_duration(timedelta(seconds=2))
+        assert filter.mask().tolist() == [True] * 3 + [False] * 4
+        filter = TrajectoryFilter(dataset).bbox((0, 0, 10, 10)).min_length(3)
+        assert filter.mask().tolist() == [True] * 5 + [False] * 2
+        data = filter.apply()
+        assert len(data.df) == 5
+        assert filter.predicates == {}
+
+    def test_builder_without_traj_ids(self):
+        gdf = self.gdf.assign(tid=float("nan"))
+        dataset = Dataset(gdf, traj_id="tid", mover_id="mid", timestamp="txx")
+        data = TrajectoryFilter(dataset).min_pts(2).apply()
+        assert len(data.df) == 0
+
+    def test_builder_keeps_compact_dtypes(self):
+        dataset = Dataset(
+            self.gdf, traj_id="tid", mover_id="mid", timestamp="txx", compact=True
+        )
+        dtypes = dataset.df.dtypes
+        data = TrajectoryFilter(dataset).speed(max_speed=10).min_pts(2).apply()
+        assert data.df[TRAJ_ID].dtype == "uint8"
+        assert data.df.dtypes.equals(dtypes)
+
+    def test_builder_without_points_left(self):
+        dataset = Dataset(self.gdf, traj_id="tid", mover_id="mid", timestamp="txx")
+        filter = (
+            TrajectoryFilter(dataset)
+            .speed(100, 200)
+            .min_duration(timedelta(seconds=10))
+            .min_length(1)
+        )
+        assert not filter.mask().any()
+        assert len(filter.apply().df) == 0
@@ -1,4 +1,6 @@
 import os
+import warnings
+import pytest
 import pandas as pd
 from geopandas import GeoDataFrame
 from datetime import datetime, timedelta
@@ -58,13 +60,97 @@ class TestTrajectorySplitter:
         dataset = Dataset(self.gdf, traj_id="tid", mover_id="mid", timestamp="txx")
         splitter = TrajectorySplitter(dataset)
         assert isinstance(splitter, TrajectorySplitter)
-        data = splitter.split(observation_gap=timedelta(hours=10))
+        data = splitter.split(observation_gap=timedelta(hours=10), engine="native")
         assert TRAJ_ID in data.df.columns
         assert MOVER_ID in data.df.columns
         assert TIMESTAMP in data.df.columns
         trajs = data.to_trajs()
         assert len(trajs) == 2
         splitter = TrajectorySplitter(data)
-        data = splitter.split(observation_gap=timedelta(hours=2))
+        data = splitter.split(observation_gap=timedelta(hours=2), engine="native")
         trajs = data.to_trajs()
         assert len(trajs) == 3
+
+    def test_split_engines_match(self):
+        for kwargs in [
+            {"observation_gap": timedelta(hours=2)},
+            {"temporal_split_mode": "day"},
+        ]:
+            native = TrajectorySplitter(
+                Dataset(self.gdf, traj_id="tid", mover_id="mid", timestamp="txx")
+            ).split(engine="native", **kwargs)
+            reference = TrajectorySplitter(
+                Dataset(self.gdf, traj_id="tid", mover_id="mid", timestamp="txx")
+            ).split(engine="movingpandas", **kwargs)
+            assert list(native.df[TRAJ_ID]) == list(reference.df[TRAJ_ID])
+            assert list(native.df[TIMESTAMP]) == list(reference.df[TIMESTAMP])
+
+    def test_split_temporal_overlap(self):
+        dataset = Dataset(self.gdf, traj_id="tid", mover_id="mid", timestamp="txx")
+        data = TrajectorySplitter(dataset).split(
+            temporal_split_mode="day", engine="native"
+        )
+        assert list(data.df[TRAJ_ID]) == ["1_0"] * 3 + ["1_1"] * 4
+
+    def test_split_max_duration(self):
+        dataset = Dataset(self.gdf, traj_id="tid", mover_id="mid", timestamp="txx")
+        data = TrajectorySplitter(dataset).split(max_duration=timedelta(hours=3))
+        assert list(data.df[TRAJ_ID]) == ["1_0", "1_0", "1_1", "1_1", "1_2", "1_2"]
+
+    def test_split_max_distance(self):
+        dataset = Dataset(self.gdf, traj_id="tid", mover_id="mid", timestamp="txx")
+        data = TrajectorySplitter(dataset).split(max_distance=7)
+        assert list(data.df[TRAJ_ID]) == ["1_0", "1_0", "1_1", "1_1", "1_1"]
+        with pytest.raises(ValueError):
+            TrajectorySplitter(dataset).split(max_distance=7, engine="movingpandas")
+
+    def test_split_mover_change(self):
+        gdf = self.gdf.copy()
+        gdf.loc[3:, "mid"] = "b"
+        dataset = Dataset(gdf, traj_id="tid", mover_id="mid", timestamp="txx")
+        data = TrajectorySplitter(dataset).split(
+            observation_gap=timedelta(days=2), engine="native"
+        )
+        assert list(data.df[TRAJ_ID]) == ["1_0"] * 3 + ["1_1"] * 3
+
+    def test_split_missing_mover_ids(self):
+        gdf = self.gdf.copy()
+        gdf["mid"] = None
+        dataset = Dataset(gdf, traj_id="tid", mover_id="mid", timestamp="txx")
+        data = TrajectorySplitter(dataset).split(
+            observation_gap=timedelta(hours=10), engine="native"
+        )
+        assert list(data.df[TRAJ_ID]) == ["1_0", "1_0", "1_1", "1_1", "1_1", "1_1"]
+
+    def test_split_without_rules(self):
+        dataset = Dataset(self.gdf, traj_id="tid", mover_id="mid", timestamp="txx")
+        df = dataset.df
+        assert TrajectorySplitter(dataset).split(engine="native").df is df
+
+    def test_split_keeps_compact_dtypes(self):
+        gdf = self.gdf.assign(sog=[1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+        dataset = Dataset(
+            gdf, traj_id="tid", mover_id="mid", timestamp="txx", compact=True
+        )
+        dtypes = dataset.df.dtypes.drop(TRAJ_ID)
+        data = TrajectorySplitter(dataset).split(
+            observation_gap=timedelta(hours=2), engine="native"
+        )
+        assert data.df["sog"].dtype == "float32"
+        assert data.df.dtypes.drop(TRAJ_ID).equals(dtypes)
+
+    def test_split_default_engine(self):
+        dataset = Dataset(self.gdf, traj_id="tid", mover_id="mid", timestamp="txx")
+        with pytest.warns(FutureWarning, match="default engine"):
+            data = TrajectorySplitter(dataset).split(temporal_split_mode="day")
+        reference = TrajectorySplitter(
+            Dataset(self.gdf, traj_id="tid", mover_id="mid", timestamp="txx")
+        ).split(temporal_split_mode="day", engine="movingpandas")
+        assert list(data.df[TRAJ_ID]) == list(reference.df[TRAJ_ID])
+        assert list(data.df[TIMESTAMP]) == list(reference.df[TIMESTAMP])
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", FutureWarning)
+            data = TrajectorySplitter(
+                Dataset(self.gdf, traj_id="tid", mover_id="mid", timestamp="txx")
+            ).split(max_duration=timedelta(hours=3))
+        assert list(data.df[TRAJ_ID]) == ["1_0", "1_0", "1_1", "1_1", "1_2", "1_2"]